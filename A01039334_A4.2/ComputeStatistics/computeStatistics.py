@@ -5,6 +5,15 @@ Este script lee un archivo que contiene datos numéricos, con los cuales calcula
 descriptivas de estos datos (media, mediana, moda, varianza y desviación estándar). 
 Al finalizar, se imprimen los resultados en la consola y se crea un archivo llamado 
 StatisticsResults.txt.
+
+Con la opción --profile (o la variable SCRIPT_PROFILE) se miden por separado la
+lectura, cada cálculo, la impresión y la escritura de resultados, y se escribe
+StatisticsResults.profile.json (ver tools/profiler.py).
+
+El archivo se lee por bloques y cada bloque se convierte de una sola vez; las
+líneas que no son números se cuentan y solo se muestran las primeras, con su
+número de línea. Con --workers N los archivos grandes se dividen en rangos de
+bytes que se convierten en N procesos (ver tools/numberParser.py).
 """
 
 #!/usr/bin/env python
@@ -14,29 +23,27 @@ StatisticsResults.txt.
 # In[1]:
 
 
+import argparse
+import os
 import sys
 import time
 
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools")
+sys.path.insert(0, TOOLS_DIR)
+import numberParser  # pylint: disable=wrong-import-position
+
 # In[2]:
 
 
-def open_file(path):
+def open_file(path, workers=1):
     """
-    Apertura y lectura de los datos numéricos del archivo. Si el valor no es numérico, se despliega
-    un error y se lo salta.
+    Apertura y lectura de los datos numéricos del archivo (ver
+    tools/numberParser.py). Las líneas que no son numéricas se saltan y se
+    despliega un resumen de ellas.
     """
-    with open(path, 'r', encoding='utf-8') as file:
-        data = []
-        for line in file.readlines():
-            stripped_data = line.strip()
-            if stripped_data:
-                try:
-                    float_number = float(stripped_data)
-                    data.append(float_number)
-                except ValueError:
-                    print(f"Warning: {stripped_data} is not a number and "
-                          "will not be taken into account for the conversion.")
-        return data
+    data, report = numberParser.parse_file(path, float, workers)
+    numberParser.print_invalid(report)
+    return data
 
 
 # In[3]:
@@ -110,6 +117,48 @@ def calculate_sd(var):
 
 # In[8]:
 
+def format_results(amount, mean, median, mode, variance, st_dev):
+    """
+    Formato de los resultados como líneas de texto.
+    """
+    return ["Results:",
+            f"Count: {amount}, Mean: {mean}, Median: {median}, Mode: {mode}, "
+            f"Variance: {variance}, Standard Deviation: {st_dev}"]
+
+
+def print_results(lines):
+    """
+    Impresión de los resultados en la consola.
+    """
+    for line in lines:
+        print(line)
+
+
+def write_results(path, lines):
+    """
+    Escritura de los resultados en el archivo de resultados.
+    """
+    with open(path, 'w', encoding='utf-8') as result_file:
+        result_file.write("\n".join(lines) + "\n")
+
+
+def start_profiler():
+    """
+    Activación del perfilado opcional (--profile o SCRIPT_PROFILE). El módulo
+    tools/profiler.py solo se importa cuando se pide.
+    """
+    if not (os.environ.get("SCRIPT_PROFILE")
+            or any(arg.startswith("--profile") for arg in sys.argv)):
+        return None
+    import profiler  # pylint: disable=import-outside-toplevel
+    return profiler.start(
+        "computeStatistics", sys.argv, globals(),
+        phases=("open_file", "calculate_mean", "calculate_mode", "calculate_median",
+                "calculate_variance", "calculate_sd", "print_results", "write_results"))
+
+
+# In[9]:
+
 def main():
     """
     Operación principal cuando se ejecuta el script. Se realiza el conteo de los datos
@@ -118,32 +167,29 @@ def main():
     escriben en un archivo llamado "StatisticsResults.txt".
     """
     start_time = time.time()
-    if len(sys.argv) != 2:
-        print("Usage: python computeStatistics.py input.txt")
-        sys.exit(1)
-    file_path = sys.argv[1]
-    data = open_file(file_path)
+    profiler = start_profiler()
+    parser = argparse.ArgumentParser(
+        usage="python computeStatistics.py input.txt [--workers N]")
+    parser.add_argument("input")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    data = open_file(args.input, args.workers)
     amount=len(data)
     mean=calculate_mean(data, amount)
     mode=calculate_mode(data)
     median=calculate_median(data, amount)
     variance=calculate_variance(data, mean, amount)
     st_dev=calculate_sd(variance)
-    print("Results:")
-    print(f"Count: {amount}, Mean: {mean}, Median: {median}, Mode: {mode}, "
-    f"Variance: {variance}, Standard Deviation: {st_dev}")
+    lines = format_results(amount, mean, median, mode, variance, st_dev)
+    print_results(lines)
     end_time = time.time()
     elapsed_time = end_time - start_time
     print(f"Time Elapsed: {elapsed_time} seconds\n")
-    with open("StatisticsResults.txt", 'w', encoding='utf-8') as result_file:
-        # Redirect stdout to the file
-        sys.stdout = result_file
-        print("Results:")
-        print(f"Count: {amount}, Mean: {mean}, Median: {median}, Mode: {mode}, "
-        f"Variance: {variance}, Standard Deviation: {st_dev}")
-        sys.stdout = sys.__stdout__
+    write_results("StatisticsResults.txt", lines)
+    if profiler is not None:
+        print(f"Profile: {profiler.finish('StatisticsResults.txt')}")
 
 if __name__ == "__main__":
     main()
 
-# In[9]:
+# In[10]:
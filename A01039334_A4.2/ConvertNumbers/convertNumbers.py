@@ -4,6 +4,15 @@ convertNumbers.py - Script que convierte números decimales a binario y hexadeci
 Este script lee un archivo que contiene datos numéricos, descarta los valores que no son números
 y convierte los números a su notación binaria y hexadecimal. Al finalizar, se imprimen los
 resultados en la consola y se crea un archivo llamado ConvertionResults.txt.
+
+Con la opción --profile (o la variable SCRIPT_PROFILE) se miden por separado la
+lectura, la conversión, la impresión y la escritura de resultados, y se escribe
+ConvertionResults.profile.json (ver tools/profiler.py).
+
+El archivo se lee por bloques y cada bloque se convierte de una sola vez; las
+líneas que no son números se cuentan y solo se muestran las primeras, con su
+número de línea. Con --workers N los archivos grandes se dividen en rangos de
+bytes que se convierten en N procesos (ver tools/numberParser.py).
 """
 
 #!/usr/bin/env python
@@ -13,29 +22,27 @@ resultados en la consola y se crea un archivo llamado ConvertionResults.txt.
 # In[1]:
 
 
+import argparse
+import os
 import sys
 import time
 
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools")
+sys.path.insert(0, TOOLS_DIR)
+import numberParser  # pylint: disable=wrong-import-position
+
 # In[2]:
 
 
-def open_file(path):
+def open_file(path, workers=1):
     """
-    Apertura y lectura de los datos numéricos del archivo. Si el valor no es numérico, se despliega
-    un error y se lo salta.
+    Apertura y lectura de los datos numéricos del archivo (ver
+    tools/numberParser.py). Las líneas que no son numéricas se saltan y se
+    despliega un resumen de ellas.
     """
-    with open(path, 'r', encoding='utf-8') as file:
-        data = []
-        for line in file.readlines():
-            stripped_data = line.strip()
-            if stripped_data:
-                try:
-                    int_number = int(stripped_data)
-                    data.append(int_number)
-                except ValueError:
-                    print(f"Warning: {stripped_data} is not a number and "
-                          "will not be taken into account for the conversion.")
-        return data
+    data, report = numberParser.parse_file(path, int, workers)
+    numberParser.print_invalid(report)
+    return data
 
 
 # In[3]:
@@ -121,6 +128,63 @@ def decimal_hexadecimal(bin_number, sign):
 
 # In[6]:
 
+def convert_all(data, num_bits):
+    """
+    Conversión de todos los números a binario y hexadecimal. Regresa las
+    tuplas (decimal, binario, hexadecimal).
+    """
+    conversion_results = []
+    for number in data:
+        decimal = decimal_binary(number, num_bits)
+        hexadecimal = decimal_hexadecimal(decimal[0], decimal[1])
+        conversion_results.extend([(number, decimal[0], hexadecimal)])
+    return conversion_results
+
+
+def format_results(conversion_results):
+    """
+    Formato de los resultados como líneas de texto.
+    """
+    lines = ["Results:"]
+    for index, (decimal, binary, hexadecimal) in enumerate(conversion_results, start=1):
+        lines.append(f"{index} Decimal: {decimal}, Binary: {binary}, Hexadecimal: {hexadecimal}")
+    return lines
+
+
+def print_results(lines):
+    """
+    Impresión de los resultados en la consola.
+    """
+    for line in lines:
+        print(line)
+
+
+def write_results(path, lines):
+    """
+    Escritura de los resultados en el archivo de resultados.
+    """
+    with open(path, 'w', encoding='utf-8') as result_file:
+        result_file.write("\n".join(lines) + "\n")
+
+
+def start_profiler():
+    """
+    Activación del perfilado opcional (--profile o SCRIPT_PROFILE). El módulo
+    tools/profiler.py solo se importa cuando se pide.
+    """
+    if not (os.environ.get("SCRIPT_PROFILE")
+            or any(arg.startswith("--profile") for arg in sys.argv)):
+        return None
+    import profiler  # pylint: disable=import-outside-toplevel
+    return profiler.start(
+        "convertNumbers", sys.argv, globals(),
+        phases=("open_file", "find_max_bit", "convert_all", "format_results",
+                "print_results", "write_results"),
+        calls=("decimal_binary", "decimal_hexadecimal"))
+
+
+# In[7]:
+
 def main():
     """
     Operación principal cuando se ejecuta el script. Se realiza la conversión
@@ -129,32 +193,25 @@ def main():
     estos resultados se escriben en un archivo llamado "ConvertionResults.txt".
     """
     start_time = time.time()
-    if len(sys.argv) != 2:
-        print("Usage: python convertNumbers.py input.txt")
-        sys.exit(1)
-    path = sys.argv[1]
-    data = open_file(path)
+    profiler = start_profiler()
+    parser = argparse.ArgumentParser(
+        usage="python convertNumbers.py input.txt [--workers N]")
+    parser.add_argument("input")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    data = open_file(args.input, args.workers)
     num_bits = find_max_bit(data)
-    conversion_results = []
-    for number in data:
-        decimal = decimal_binary(number, num_bits)
-        hexadecimal = decimal_hexadecimal(decimal[0], decimal[1])
-        conversion_results.extend([(number, decimal[0], hexadecimal)])
-    print("Results:")
-    for index, (decimal, binary, hexadecimal) in enumerate(conversion_results, start=1):
-        print(f"{index} Decimal: {decimal}, Binary: {binary}, Hexadecimal: {hexadecimal}")
+    conversion_results = convert_all(data, num_bits)
+    lines = format_results(conversion_results)
+    print_results(lines)
     end_time = time.time()
     elapsed_time = end_time - start_time
     print(f"Time Elapsed: {elapsed_time} seconds\n")
-    with open("ConvertionResults.txt", 'w', encoding='utf-8') as result_file:
-        # Redirect stdout to the file
-        sys.stdout = result_file
-        print("Results:")
-        for index, (decimal, binary, hexadecimal) in enumerate(conversion_results, start=1):
-            print(f"{index} Decimal: {decimal}, Binary: {binary}, Hexadecimal: {hexadecimal}")
-        sys.stdout = sys.__stdout__
+    write_results("ConvertionResults.txt", lines)
+    if profiler is not None:
+        print(f"Profile: {profiler.finish('ConvertionResults.txt')}")
 
 if __name__ == "__main__":
     main()
 
-# In[7]:
+# In[8]:
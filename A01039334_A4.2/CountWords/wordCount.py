@@ -4,6 +4,10 @@ wordCount.py - Script que cuenta el número de apariciones de una palabra dentro
 Este script lee un archivo que contiene palabras, descartando los valores que no son palabras
 (o solamente letras).
 Después se imprimen los resultados en la consola y se crea un archivo llamado "WordCountResults.txt" 
+
+Con la opción --profile (o la variable SCRIPT_PROFILE) se miden por separado la
+lectura, el conteo, la impresión y la escritura de resultados, y se escribe
+WordCountResults.profile.json (ver tools/profiler.py).
 """
 
 #!/usr/bin/env python
@@ -13,6 +17,7 @@ Después se imprimen los resultados en la consola y se crea un archivo llamado "
 # In[1]:
 
 
+import os
 import sys
 import time
 
@@ -58,6 +63,66 @@ def count_occurrences(words, curr_word):
 
 # In[4]:
 
+def count_words(data):
+    """
+    Conteo de las apariciones de cada palabra, en el orden de su primera
+    aparición.
+    """
+    occurrences = {}
+    while data:
+        current_word = data[0]
+        count = count_occurrences(data, current_word)
+        occurrences[current_word] = count
+        data = data[1:]
+    return occurrences
+
+
+def format_results(occurrences):
+    """
+    Formato de los resultados como líneas de texto.
+    """
+    lines = ["Results:"]
+    for index, (word, count) in enumerate(occurrences.items(), start=1):
+        lines.append(f"{index} Word: {word}, Occurrences: {count}")
+    return lines
+
+
+def print_results(lines):
+    """
+    Impresión de los resultados en la consola.
+    """
+    for line in lines:
+        print(line)
+
+
+def write_results(path, lines):
+    """
+    Escritura de los resultados en el archivo de resultados.
+    """
+    with open(path, 'w', encoding='utf-8') as result_file:
+        result_file.write("\n".join(lines) + "\n")
+
+
+def start_profiler():
+    """
+    Activación del perfilado opcional (--profile o SCRIPT_PROFILE). El módulo
+    tools/profiler.py solo se importa cuando se pide.
+    """
+    if not (os.environ.get("SCRIPT_PROFILE")
+            or any(arg.startswith("--profile") for arg in sys.argv)):
+        return None
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "..", "..", "tools"))
+    import profiler  # pylint: disable=import-outside-toplevel
+    return profiler.start(
+        "wordCount", sys.argv, globals(),
+        phases=("open_file", "count_words", "format_results", "print_results",
+                "write_results"),
+        calls=("count_occurrences",))
+
+
+# In[5]:
+
 def main():
     """
     Función principal cuando se ejecuta el script. Cuenta la cantidad de apariciones
@@ -65,32 +130,23 @@ def main():
     Después se escriben en un archivo llamado "WordCountResults.txt".
     """
     start_time = time.time()
+    profiler = start_profiler()
     if len(sys.argv) != 2:
         print("Usage: python wordCount.py input.txt")
         sys.exit(1)
     path = sys.argv[1]
     data = open_file(path)
-    occurrences = {}
-    while data:
-        current_word = data[0]
-        count = count_occurrences(data, current_word)
-        occurrences[current_word] = count
-        data = data[1:]
-    print("Results:")
-    for index, (word, count) in enumerate(occurrences.items(), start=1):
-        print(f"{index} Word: {word}, Occurrences: {count}")
+    occurrences = count_words(data)
+    lines = format_results(occurrences)
+    print_results(lines)
     end_time = time.time()
     elapsed_time = end_time - start_time
     print(f"Time Elapsed: {elapsed_time} seconds\n")
-    with open("WordCountResults.txt", 'w', encoding='utf-8') as result_file:
-        # Redirect stdout to the file
-        sys.stdout = result_file
-        print("Results:")
-        for index, (word, count) in enumerate(occurrences.items(), start=1):
-            print(f"{index} Word: {word}, Occurrences: {count}")
-        sys.stdout = sys.__stdout__
+    write_results("WordCountResults.txt", lines)
+    if profiler is not None:
+        print(f"Profile: {profiler.finish('WordCountResults.txt')}")
 
 if __name__ == "__main__":
     main()
 
-# In[5]:
+# In[6]:
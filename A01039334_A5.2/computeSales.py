@@ -10,6 +10,24 @@ mensaje en la consola.
 
 Al finalizar, se imprimen los resultados en la consola y se crea un archivo llamado 
 "SalesResults.txt".
+
+También acepta varios archivos de ventas o directorios completos (por ejemplo, los
+archivos diarios de un cierre de mes), así como archivos JSON Lines (.jsonl) que se
+dividen en fragmentos por rango de bytes. En ese caso, los totales se calculan en un
+conjunto de procesos y los resultados parciales se combinan al final:
+
+    python computeSales.py priceCatalogue.json ventas/ --workers 8 --shards 4
+
+El catálogo se compila a un caché binario (priceCatalogue.json.idx) que solo guarda
+el índice título -> precio junto con el mtime, tamaño y hash SHA-256 del catálogo. En
+las siguientes ejecuciones el caché se lee con mmap; si está desactualizado se vuelve
+a leer el JSON y se regenera. También se puede compilar sin procesar ventas:
+
+    python computeSales.py priceCatalogue.json --compile
+
+Con la opción --profile (o la variable SCRIPT_PROFILE) se miden por separado la
+lectura del catálogo y de las ventas, la suma y la escritura de resultados, y se
+escribe SalesResults.profile.json (ver tools/profiler.py).
 """
 
 #!/usr/bin/env python
@@ -19,9 +37,17 @@ Al finalizar, se imprimen los resultados en la consola y se crea un archivo llam
 # In[1]:
 
 
+import argparse
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import struct
 import sys
 import time
-import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 # In[2]:
 
@@ -47,24 +73,292 @@ def open_file(file_path):
 def sum_cost(products_list, sales_list):
     """
     Análisis de las ventas en "sales_list" para encontrar el precio de los
-    productos en "products_list". Después de eso, se multiplica el precio
+    productos en "products_list" (lista del catálogo o índice ya construido con
+    build_index). Después de eso, se multiplica el precio
     por la cantidad de la venta. Finalmente, suma todos los valores de cada
     venta para obtener el costo total del archivo.
     """
+    if isinstance(products_list, dict):
+        index = products_list
+    else:
+        index = build_index(products_list)
     tot=0
     for sale in sales_list:
         name = sale.get("Product")
         quantity = sale.get("Quantity")
         print(f"Processing sale: {name}, Quantity: {quantity}")
-        product = next((product for product in products_list if product["title"] == name), None)
-        if product:
-            tot += product["price"] * quantity
+        price = index.get(name)
+        if price is not None:
+            tot += price * quantity
         else:
             print(f"Product '{name}' not found in products_list")
     return tot
 
 # In[4]:
 
+
+def build_index(products_list):
+    """
+    Construcción de un índice título -> precio a partir del catálogo. Si un título
+    aparece repetido se conserva el primero, igual que la búsqueda lineal original.
+    Los productos sin precio o con un precio que no es un número se reportan y se
+    omiten, así que sus ventas cuentan como productos no encontrados.
+    """
+    index = {}
+    for product in products_list:
+        title = product["title"]
+        if title in index:
+            continue
+        price = product.get("price")
+        if isinstance(price, bool) or not isinstance(price, (int, float)):
+            print(f"Error: Invalid price for product '{title}'. ")
+            continue
+        index[title] = price
+    return index
+
+
+# Formato del caché: encabezado (magic, mtime_ns, tamaño, número de productos,
+# SHA-256 del catálogo) seguido de registros (precio, longitud del título, título).
+CACHE_MAGIC = b"SQCAT001"
+CACHE_HEADER = struct.Struct("<8sqqI32s")
+CACHE_ENTRY = struct.Struct("<dI")
+
+
+def _file_digest(path):
+    """Cálculo del hash SHA-256 de un archivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def compile_catalogue(catalogue_path, cache_path=None):
+    """
+    Compilación del catálogo a un caché binario con el índice título -> precio. Regresa
+    el índice, o None si el catálogo no se puede leer. Si el caché no se puede escribir
+    (por ejemplo, en un directorio de solo lectura) o el catálogo tiene títulos que no
+    se pueden guardar en él, solo se regresa el índice.
+    """
+    cache_path = cache_path or catalogue_path + ".idx"
+    stat = os.stat(catalogue_path) if os.path.exists(catalogue_path) else None
+    products_list = open_file(catalogue_path)
+    if products_list is None:
+        return None
+    index = build_index(products_list)
+    chunks = [CACHE_HEADER.pack(CACHE_MAGIC, stat.st_mtime_ns, stat.st_size,
+                                len(index), _file_digest(catalogue_path))]
+    try:
+        for title, price in index.items():
+            encoded = title.encode('utf-8')
+            chunks.append(CACHE_ENTRY.pack(price, len(encoded)))
+            chunks.append(encoded)
+    except (AttributeError, UnicodeEncodeError, struct.error):
+        # Títulos que no son texto o no se pueden codificar: se usa el índice en
+        # memoria, como con --no-cache.
+        return index
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(b"".join(chunks))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return index
+
+
+def _read_cache(catalogue_path, cache_path):
+    """
+    Lectura del caché binario con mmap. Regresa None si no existe, está dañado o no
+    corresponde al catálogo actual (se compara mtime y tamaño, y si difieren, el hash).
+    """
+    try:
+        stat = os.stat(catalogue_path)
+        with open(cache_path, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            magic, mtime_ns, size, count, digest = CACHE_HEADER.unpack_from(buffer)
+            if magic != CACHE_MAGIC:
+                return None
+            if (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size) and \
+                    (size != stat.st_size or digest != _file_digest(catalogue_path)):
+                return None
+            index = {}
+            offset = CACHE_HEADER.size
+            for _ in range(count):
+                price, length = CACHE_ENTRY.unpack_from(buffer, offset)
+                offset += CACHE_ENTRY.size
+                index[buffer[offset:offset + length].decode('utf-8')] = price
+                offset += length
+            return index
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def load_catalogue_index(catalogue_path, cache_path=None):
+    """
+    Carga del índice del catálogo desde el caché binario. Si el caché no existe o está
+    desactualizado, se lee el JSON y se vuelve a compilar.
+    """
+    cache_path = cache_path or catalogue_path + ".idx"
+    index = _read_cache(catalogue_path, cache_path)
+    if index is None:
+        index = compile_catalogue(catalogue_path, cache_path)
+    return index
+
+
+def collect_sales_paths(paths):
+    """
+    Expansión de la lista de archivos y directorios de ventas. De cada directorio se
+    toman los archivos .json y .jsonl en orden alfabético.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith((".json", ".jsonl"))
+            ))
+        else:
+            files.append(path)
+    return files
+
+
+def plan_tasks(paths, shards=1):
+    """
+    División del trabajo en tareas (archivo, inicio, fin). Los archivos JSON Lines se
+    dividen en "shards" rangos de bytes; los archivos JSON se procesan completos.
+    """
+    tasks = []
+    for path in paths:
+        if shards > 1 and path.endswith(".jsonl") and os.path.exists(path):
+            size = os.path.getsize(path)
+            step = max(1, -(-size // shards))
+            tasks.extend((path, start, min(start + step, size))
+                         for start in range(0, size, step))
+        else:
+            tasks.append((path, None, None))
+    return tasks
+
+
+def read_sales(path, start=None, end=None):
+    """
+    Lectura de las ventas de un archivo. Para JSON Lines con rango de bytes, cada
+    fragmento procesa las líneas que comienzan dentro de [start, end).
+    """
+    if not path.endswith(".jsonl"):
+        with open(path, 'r', encoding='utf-8') as file:
+            yield from json.load(file)
+        return
+    with open(path, 'rb') as file:
+        if start:
+            file.seek(start - 1)
+            file.readline()
+        while end is None or file.tell() < end:
+            line = file.readline()
+            if not line:
+                break
+            if line.strip():
+                yield json.loads(line)
+
+
+def total_sales(sales, index):
+    """
+    Suma del costo de las ventas sin imprimir cada una. Regresa el total y el número
+    de ventas cuyo producto no está en el catálogo, agrupado por producto.
+    """
+    tot = 0
+    unknown = Counter()
+    for sale in sales:
+        name = sale.get("Product")
+        price = index.get(name)
+        if price is not None:
+            tot += price * sale.get("Quantity")
+        else:
+            unknown[name] += 1
+    return tot, unknown
+
+
+# Índice del catálogo compartido con los procesos del pool. Con "fork" los hijos
+# lo heredan (copy-on-write); con otros métodos se envía una copia al iniciar.
+_CATALOGUE_INDEX = {}
+
+
+def _init_worker(index):
+    """Inicialización de un proceso del pool con la copia del índice."""
+    global _CATALOGUE_INDEX  # pylint: disable=global-statement
+    _CATALOGUE_INDEX = index
+
+
+def _process_task(task):
+    """Cálculo del total parcial de una tarea dentro de un proceso del pool."""
+    path, start, end = task
+    try:
+        tot, unknown = total_sales(read_sales(path, start, end), _CATALOGUE_INDEX)
+    except FileNotFoundError:
+        return 0, Counter(), f"Error: {path} not found. "
+    except json.JSONDecodeError:
+        return 0, Counter(), f"Error: Invalid format in {path}. "
+    return tot, unknown, None
+
+
+def parallel_sum_cost(index, tasks, workers=None):
+    """
+    Cálculo de los totales de todas las tareas en un conjunto de procesos. Los totales
+    parciales y los productos desconocidos se combinan al final. Regresa el total, los
+    productos no encontrados y los errores de lectura.
+    """
+    global _CATALOGUE_INDEX  # pylint: disable=global-statement
+    context = multiprocessing.get_context()
+    if context.get_start_method() == "fork":
+        _CATALOGUE_INDEX = index
+        initializer, initargs = None, ()
+    else:
+        initializer, initargs = _init_worker, (index,)
+    tot = 0
+    unknown = Counter()
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=initializer, initargs=initargs) as pool:
+        for part_tot, part_unknown, error in pool.map(_process_task, tasks):
+            tot += part_tot
+            unknown.update(part_unknown)
+            if error:
+                errors.append(error)
+    return tot, unknown, errors
+
+# In[5]:
+
+def write_results(path, tot_cost, unknown, elapsed_time):
+    """
+    Escritura del total y del número de ventas de productos desconocidos en el
+    archivo de resultados.
+    """
+    with open(path, 'w', encoding='utf-8') as result_file:
+        result_file.write(f"Total Cost: ${tot_cost:.2f}\n")
+        if unknown:
+            result_file.write(f"Unknown products: {sum(unknown.values())} sales\n")
+        result_file.write(f"Time Elapsed: {elapsed_time} seconds\n")
+
+
+def start_profiler():
+    """
+    Activación del perfilado opcional (--profile o SCRIPT_PROFILE). El módulo
+    tools/profiler.py solo se importa cuando se pide.
+    """
+    if not (os.environ.get("SCRIPT_PROFILE")
+            or any(arg.startswith("--profile") for arg in sys.argv)):
+        return None
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "..", "tools"))
+    import profiler  # pylint: disable=import-outside-toplevel
+    return profiler.start(
+        "computeSales", sys.argv, globals(),
+        phases=("open_file", "build_index", "load_catalogue_index", "compile_catalogue",
+                "collect_sales_paths", "plan_tasks", "sum_cost", "parallel_sum_cost",
+                "write_results"))
+
+
 def main():
     """
     Operación principal cuando se ejecuta el script. Se realiza la suma del costo total
@@ -72,31 +366,61 @@ def main():
     y se escriben en un archivo llamado "SalesResults.txt".
     """
     start_time = time.time()
+    profiler = start_profiler()
     #Input of JSON files
-    if len(sys.argv) != 3:
-        print("Usage: python computeSales.py"
-              "priceCatalogue.json salesRecord.json")
-        sys.exit(1)
-    catalogue_path = sys.argv[1]
-    sales_path = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        usage="python computeSales.py priceCatalogue.json salesRecord.json "
+              "[salesRecord.json | salesDir ...] [--workers N] [--shards N] "
+              "[--compile] [--no-cache]")
+    parser.add_argument("catalogue")
+    parser.add_argument("sales", nargs="*")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--compile", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+    if args.compile:
+        if compile_catalogue(args.catalogue) is not None:
+            print(f"Catalogue compiled to {args.catalogue}.idx")
+        return
+    if not args.sales:
+        parser.error("the following arguments are required: sales")
+    sales_paths = collect_sales_paths(args.sales)
     #Read JSON files
-    price_catalogue = open_file(catalogue_path)
-    sales_record = open_file(sales_path)
-    if price_catalogue is None or sales_record is None:
+    if args.no_cache:
+        price_catalogue = open_file(args.catalogue)
+        price_catalogue = None if price_catalogue is None else build_index(price_catalogue)
+    else:
+        price_catalogue = load_catalogue_index(args.catalogue)
+    if price_catalogue is None:
         return
-    #Calculate total cost
-    tot_cost = sum_cost(price_catalogue, sales_record)
+    unknown = Counter()
+    # Un solo archivo JSON se procesa como antes; los archivos JSON Lines se leen
+    # línea por línea con read_sales.
+    if (len(sales_paths) == 1 and not sales_paths[0].endswith(".jsonl")
+            and args.shards == 1 and args.workers is None):
+        sales_record = open_file(sales_paths[0])
+        if sales_record is None:
+            return
+        #Calculate total cost
+        tot_cost = sum_cost(price_catalogue, sales_record)
+    else:
+        tasks = plan_tasks(sales_paths, args.shards)
+        tot_cost, unknown, errors = parallel_sum_cost(
+            price_catalogue, tasks, args.workers)
+        for error in errors:
+            print(error)
+        for name, count in unknown.items():
+            print(f"Product '{name}' not found in products_list ({count} sales)")
     end_time = time.time()
     elapsed_time = end_time - start_time
     print(f"Total Cost: ${tot_cost:.2f}")
     print(f"Time Elapsed: {elapsed_time} seconds\n")
-    with open("SalesResults.txt", 'w', encoding='utf-8') as result_file:
-        sys.stdout = result_file
-        result_file.write(f"Total Cost: ${tot_cost:.2f}\n")
-        result_file.write(f"Time Elapsed: {elapsed_time} seconds\n")
-        sys.stdout = sys.__stdout__
+    write_results("SalesResults.txt", tot_cost, unknown, elapsed_time)
+    if profiler is not None:
+        print(f"Profile: {profiler.finish('SalesResults.txt')}")
 
 if __name__ == "__main__":
     main()
 
-# In[5]:
+# In[6]:
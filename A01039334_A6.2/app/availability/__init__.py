@@ -0,0 +1 @@
+from .availability import IntervalIndex, to_date, to_range
@@ -0,0 +1,116 @@
+"""
+Module for answering date-range availability queries in the hotel reservation
+system.
+
+Each room keeps an IntervalIndex with the date ranges of its reservations. The
+ranges are half-open, [start_date, end_date), so a stay may start on the day a
+previous one ends. Dates are datetime.date objects or ISO strings (YYYY-MM-DD).
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import bisect
+import datetime
+
+
+# In[2]:
+
+
+def to_date(value):
+    """Converts an ISO string (YYYY-MM-DD) or a datetime into a date."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+def to_range(start_date, end_date):
+    """Converts a pair of dates, checking that the range is not empty."""
+    start, end = to_date(start_date), to_date(end_date)
+    if start >= end:
+        raise ValueError(f"Invalid date range: {start_date} to {end_date}")
+    return start, end
+
+
+class IntervalIndex:
+    """
+    Sorted, non-overlapping date ranges of the reservations of a room.
+
+    Lookups and overlap checks use binary search, so they take logarithmic time
+    in the number of reservations. Since ranges do not overlap, each start date
+    identifies a single reservation.
+    """
+
+    def __init__(self):
+        """Initialization of an empty index."""
+        self._starts = []
+        self._ends = []
+        self._rez_ids = []
+        self._start_by_rez = {}
+
+    def __len__(self):
+        """Returns the number of reservations in the index."""
+        return len(self._starts)
+
+    def __contains__(self, rez_id):
+        """Checks whether a reservation is in the index."""
+        return rez_id in self._start_by_rez
+
+    def __iter__(self):
+        """Iterates over (start, end, rez_id) in date order."""
+        return iter(zip(self._starts, self._ends, self._rez_ids))
+
+    def is_free(self, start_date, end_date):
+        """Checks that no reservation overlaps the range."""
+        start, end = to_range(start_date, end_date)
+        pos = bisect.bisect_right(self._starts, start)
+        if pos > 0 and self._ends[pos - 1] > start:
+            return False
+        return pos == len(self._starts) or self._starts[pos] >= end
+
+    def add(self, start_date, end_date, rez_id):
+        """Adds the range of a reservation. Returns False, without adding it,
+        if it overlaps another reservation or the ID is already indexed."""
+        start, end = to_range(start_date, end_date)
+        if rez_id in self._start_by_rez or not self.is_free(start, end):
+            return False
+        pos = bisect.bisect_right(self._starts, start)
+        self._starts.insert(pos, start)
+        self._ends.insert(pos, end)
+        self._rez_ids.insert(pos, rez_id)
+        self._start_by_rez[rez_id] = start
+        return True
+
+    def remove(self, rez_id):
+        """Removes the range of a reservation. Returns False if it is not
+        in the index."""
+        start = self._start_by_rez.pop(rez_id, None)
+        if start is None:
+            return False
+        pos = bisect.bisect_left(self._starts, start)
+        del self._starts[pos], self._ends[pos], self._rez_ids[pos]
+        return True
+
+    def get(self, rez_id):
+        """Returns the (start, end) range of a reservation, or None."""
+        start = self._start_by_rez.get(rez_id)
+        if start is None:
+            return None
+        pos = bisect.bisect_left(self._starts, start)
+        return self._starts[pos], self._ends[pos]
+
+    def to_list(self):
+        """Returns the ranges as [start, end, rez_id] lists with ISO dates."""
+        return [[start.isoformat(), end.isoformat(), rez_id] for start, end, rez_id in self]
+
+    @classmethod
+    def from_list(cls, bookings):
+        """Creates an index from [start, end, rez_id] lists."""
+        index = cls()
+        for start, end, rez_id in bookings:
+            index.add(start, end, rez_id)
+        return index
@@ -1 +1 @@
-
+from .customer import Customer
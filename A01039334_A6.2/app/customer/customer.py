@@ -10,8 +10,7 @@ Last Edited: 18/February/2024
 # In[1]:
 
 
-import json
-import os
+from storage import CUSTOMER, get_backend
 
 
 # In[2]:
@@ -25,24 +24,45 @@ class Customer:
         name (str): The customer's who made the reservation name.
         email (str): The customer's who made the reservation email.
         customer_id (int): The customer's who made the reservation ID.
+        version (int): Stored version the customer was loaded with (None if
+            it was never loaded), checked by save_data.
     """
 
+    __slots__ = ('name', 'email', 'customer_id', 'version')
+
     def __init__(self, name, email, customer_id):
         """Initialization of a Customer object with ID, name, and email."""
         self.name = name
         self.email = email
         self.customer_id = customer_id
-        self.customer_file = f"customer_{customer_id}.json"
+        self.version = None
 
-    def save_data(self):
-        """Saving of customer information on a JSON file."""
-        data = {
+    @property
+    def customer_file(self):
+        """Name of the customer's file in the JSON storage."""
+        return f"customer_{self.customer_id}.json"
+
+    def to_dict(self):
+        """Returns the customer information as a dictionary."""
+        return {
             'name': self.name,
             'email': self.email,
             'customer_id': self.customer_id
         }
-        with open(self.customer_file, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a Customer instance from a dictionary."""
+        customer = cls(data['name'], data['email'], data['customer_id'])
+        customer.version = data.get('version', 0)
+        return customer
+
+    def save_data(self):
+        """Saving of customer information through the storage backend. Raises
+        VersionConflictError if the stored customer changed since it was
+        loaded."""
+        self.version = get_backend().save_versioned(
+            CUSTOMER, self.customer_id, self.to_dict(), self.version)
 
     def create_customer(self, name, email, customer_id):
         """Creation of a new customer and saving of the information into a file."""
@@ -58,13 +78,12 @@ class Customer:
         Customer ID: {self.customer_id}""")
 
     def delete_customer(self, customer_id):
-        """Deletion of a customer's information file."""
-        customer_file = f"customer_{customer_id}.json"
-        os.remove(customer_file)
+        """Deletion of a customer's stored information."""
+        get_backend().delete(CUSTOMER, customer_id)
         print("Customer has been deleted succesfully.")
 
     def modify_customer_information(self, name=None, email=None):
-        """Modification of customer's data in a file."""
+        """Modification of customer's stored data."""
         if name:
             self.name = name
         if email:
@@ -73,8 +92,6 @@ class Customer:
         print("Customer information has been updated.")
 
     def load_customer(self, customer_id):
-        """Loading of a customer's information from a file."""
-        customer_file = f"customer_{customer_id}.json"
-        with open(customer_file, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        return Customer(data['name'],data['email'],data['customer_id'])
+        """Loading of a customer's stored information."""
+        data = get_backend().load(CUSTOMER, customer_id)
+        return Customer.from_dict(data)
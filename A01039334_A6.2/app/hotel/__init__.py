@@ -1 +1 @@
-
+from .hotel import BulkReservationError, Hotel, Room
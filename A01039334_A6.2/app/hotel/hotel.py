@@ -10,28 +10,73 @@ Last Edited: 18/February/2024
 # In[1]:
 
 
-import json
-import os
-from reservation.Reservation import reserve
+import contextlib
+import itertools
+import threading
+
+from availability.availability import IntervalIndex, to_range
+from reservation.reservation import reserve
+from storage import HOTEL, RESERVATION, RecordNotFoundError, get_backend
 
 
 # In[2]:
 
 
 class Room:
-    """ Representation of a room from the hotel reservation system. """
+    """ Representation of a room from the hotel reservation system.
+
+    room_av is False while the room has any reservation. The date ranges of
+    the reservations are kept in bookings, an IntervalIndex, and decide whether
+    the room is free for a given stay. A room that is not available but has no
+    bookings (as saved before date ranges were tracked) is never free.
+
+    The room's lock guards its bookings: Hotel holds it while checking and
+    reserving the room, and to_dict holds it while copying them.
+    """
+    __slots__ = ('hotel', 'room_num', '_room_av', 'bookings', 'lock')
+
     def __init__(self, room_number, room_available=True):
         """ Initializing of Room instance. """
+        self.hotel = None
         self.room_num = room_number
-        self.room_av = room_available
+        self._room_av = room_available
+        self.bookings = IntervalIndex()
+        self.lock = threading.RLock()
 
-    def res_room(self):
-        """Marks the selected room as reserved (not available)."""
+    @property
+    def room_av(self):
+        """Availability status of the room."""
+        return self._room_av
+
+    @room_av.setter
+    def room_av(self, available):
+        """Changes the availability of the room and updates the free-room
+        index of the hotel that owns it."""
+        self._room_av = available
+        if self.hotel is not None:
+            self.hotel._update_free_room(self)  # pylint: disable=protected-access
+
+    def is_free(self, start_date, end_date):
+        """Checks whether the room can be reserved from start_date to end_date."""
+        if not self.room_av and not self.bookings:
+            return False
+        return self.bookings.is_free(start_date, end_date)
+
+    def res_room(self, rez_id=None, start_date=None, end_date=None):
+        """Marks the selected room as reserved (not available). If the dates
+        are given, the stay is added to the room's bookings."""
+        if start_date is not None and end_date is not None:
+            if self.bookings.add(start_date, end_date, rez_id) and self.hotel is not None:
+                self.hotel._rez_rooms[rez_id] = self  # pylint: disable=protected-access
         self.room_av = False
 
-    def cancel_room(self):
-        """Marks the selected room as available (cancels reservation)."""
-        self.room_av = True
+    def cancel_room(self, rez_id=None):
+        """Marks the selected room as available (cancels reservation). If the
+        reservation ID is given, only that stay is removed, and the room stays
+        reserved while it has other bookings."""
+        if rez_id is not None and self.bookings.remove(rez_id) and self.hotel is not None:
+            self.hotel._rez_rooms.pop(rez_id, None)  # pylint: disable=protected-access
+        self.room_av = not self.bookings
 
     @classmethod
     def from_dict(cls, room_data):
@@ -43,10 +88,12 @@ class Room:
         Returns:
             Room: An instance of the room class.
         """
-        return cls(
+        room = cls(
             room_number=room_data['room_number'],
             room_available=room_data.get('room_available', True)
         )
+        room.bookings = IntervalIndex.from_list(room_data.get('bookings', []))
+        return room
 
     def to_dict(self):
         """
@@ -59,15 +106,116 @@ class Room:
         Returns:
             dict: A dictionary containing the room's properties.
         """
-        return {
-            'room_number': self.room_num,
-            'room_available': self.room_av
-        }
+        with self.lock:
+            return {
+                'room_number': self.room_num,
+                'room_available': self.room_av,
+                'bookings': self.bookings.to_list()
+            }
+
+
+class RoomList(list):
+    """
+    List of the rooms of a hotel.
+
+    Keeps the hotel's room-number map and free-room index up to date when rooms
+    are added or removed through the usual list operations.
+    """
+    def __init__(self, hotel, rooms=()):
+        """Initialization of the list for a hotel."""
+        super().__init__()
+        self.hotel = hotel
+        self.extend(rooms)
+
+    def append(self, room):
+        """Adds a room to the hotel."""
+        super().append(room)
+        self.hotel._add_room(room)  # pylint: disable=protected-access
+
+    def extend(self, rooms):
+        """Adds several rooms to the hotel."""
+        for room in rooms:
+            self.append(room)
+
+    def __iadd__(self, rooms):
+        """Adds several rooms to the hotel."""
+        self.extend(rooms)
+        return self
+
+    def insert(self, index, room):
+        """Inserts a room in the hotel."""
+        super().insert(index, room)
+        self.hotel._add_room(room)  # pylint: disable=protected-access
+
+    def remove(self, room):
+        """Removes a room from the hotel."""
+        super().remove(room)
+        self.hotel._reindex()  # pylint: disable=protected-access
+
+    def pop(self, index=-1):
+        """Removes a room from the hotel and returns it."""
+        room = super().pop(index)
+        self.hotel._reindex()  # pylint: disable=protected-access
+        return room
+
+    def clear(self):
+        """Removes every room from the hotel."""
+        super().clear()
+        self.hotel._reindex()  # pylint: disable=protected-access
+
+    def __setitem__(self, index, value):
+        """Replaces one or more rooms of the hotel."""
+        super().__setitem__(index, value)
+        self.hotel._reindex()  # pylint: disable=protected-access
+
+    def __delitem__(self, index):
+        """Removes one or more rooms from the hotel."""
+        super().__delitem__(index)
+        self.hotel._reindex()  # pylint: disable=protected-access
+
+
+class BulkReservationError(ValueError):
+    """
+    Raised when a bulk operation is rejected.
+
+    Attributes:
+        errors (list): (rez_id, reason) pairs of the rejected requests.
+    """
+    def __init__(self, errors):
+        """Initialization of the error with the rejected requests."""
+        super().__init__(f"{len(errors)} request(s) rejected: {errors[:5]}")
+        self.errors = errors
+
+
+class HotelBatch:
+    """
+    Changes of a hotel collected by Hotel.batch() for one group commit.
+
+    Attributes:
+        saves (dict): Reservations to save, by reservation ID.
+        deletes (set): IDs of the stored reservations to delete.
+        rooms (dict): Changed rooms, by room number.
+        undo (list): Functions that revert the in-memory changes.
+    """
+    def __init__(self):
+        """Initialization of an empty batch."""
+        self.saves = {}
+        self.deletes = set()
+        self.rooms = {}
+        self.undo = []
 
 
 class Hotel:
     """
     Representation of a hotel from the hotel reservation system.
+
+    Reservations of different rooms run concurrently: each room is checked
+    and reserved under its own lock, and the hotel's write lock orders the
+    writes to storage. version is the stored version the hotel was loaded
+    with (None if it was never loaded), checked by save_data.
+
+    Reservations and cancellations made inside a batch() block are written
+    together when the block ends, with one hotel write in one transaction.
     
     Attributes:
         name (str): The hotel's name.
@@ -81,25 +229,144 @@ class Hotel:
         available and reads the room number to reserve."""
         self.name = name
         self.location = location
-        self.rooms = []
+        self._rooms_by_num = {}
+        self._free_rooms = {}
+        self._rez_rooms = {}
+        self._releasing = set()
+        self._rooms = RoomList(self)
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self.version = None
+        self.hotel_key = name
         self.hotel_file = f"{name}_data.json"
 
-    def save_data(self):
-        """Saving of hotel information on a JSON file."""
+    @property
+    def rooms(self):
+        """List of the rooms of the hotel."""
+        return self._rooms
+
+    @rooms.setter
+    def rooms(self, rooms):
+        """Replaces the rooms of the hotel."""
+        for room in self._rooms:
+            room.hotel = None
+        self._rooms_by_num = {}
+        self._free_rooms = {}
+        self._rez_rooms = {}
+        self._rooms = RoomList(self, rooms)
+
+    def _add_room(self, room):
+        """Adds a room to the room-number map, free-room index and
+        reservation index."""
+        room.hotel = self
+        self._rooms_by_num.setdefault(room.room_num, room)
+        self._update_free_room(room)
+        for _, _, rez_id in room.bookings:
+            self._rez_rooms[rez_id] = room
+
+    def _reindex(self):
+        """Rebuilds the room-number map, free-room index and reservation
+        index after rooms were removed."""
+        for room in self._rooms_by_num.values():
+            room.hotel = None
+        self._rooms_by_num = {}
+        self._free_rooms = {}
+        self._rez_rooms = {}
+        for room in self._rooms:
+            self._add_room(room)
+
+    def _update_free_room(self, room):
+        """Adds or removes a room from the free-room index, which holds the
+        available rooms without bookings."""
+        if self._rooms_by_num.get(room.room_num) is not room:
+            return
+        if room.room_av and not room.bookings:
+            self._free_rooms[room.room_num] = room
+        else:
+            self._free_rooms.pop(room.room_num, None)
+
+    def get_room(self, room_num):
+        """Returns the room with the given number, or None."""
+        return self._rooms_by_num.get(room_num)
+
+    def find_reservation_room(self, rez_id):
+        """Returns the room booked by a reservation, or None if the
+        reservation has no booking in this hotel."""
+        return self._rez_rooms.get(rez_id)
+
+    def available_rooms(self, count=None):
+        """Returns up to count rooms without any reservation (all of them by
+        default)."""
+        if count is None:
+            return list(self._free_rooms.values())
+        return list(itertools.islice(self._free_rooms.values(), count))
+
+    def available_count(self):
+        """Returns the number of rooms without any reservation."""
+        return len(self._free_rooms)
+
+    def is_room_free(self, room_num, start_date, end_date):
+        """Checks whether a room can be reserved from start_date to end_date."""
+        room = self._rooms_by_num.get(room_num)
+        return room is not None and room.is_free(start_date, end_date)
+
+    def free_rooms_between(self, start_date, end_date):
+        """Returns the rooms that can be reserved from start_date to end_date,
+        in room order. Rooms in the free-room index are free for any stay, so
+        only the rooms with bookings are checked against their interval index
+        (in logarithmic time each). The scan itself still takes time
+        proportional to the number of rooms of the hotel."""
+        start, end = to_range(start_date, end_date)
+        free = self._free_rooms
+        return [room for room in self._rooms_by_num.values()
+                if room.room_num in free or (room.bookings and room.is_free(start, end))]
+
+    def to_dict(self):
+        """Returns the hotel information, including its rooms, as a dictionary."""
         data = {
             'name': self.name,
             'location': self.location,
             'rooms': [room.to_dict() for room in self.rooms]
         }
-        with open(self.hotel_file, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2)
+        if self.version is not None:
+            data['version'] = self.version
+        return data
+
+    @classmethod
+    def from_dict(cls, data, hotel_key=None):
+        """Creates a Hotel instance from a dictionary. The storage key defaults
+        to the hotel's name."""
+        hotel = cls(hotel_key or data['name'], data['location'])
+        hotel.name = data['name']
+        hotel.version = data.get('version', 0)
+        hotel.rooms = [Room.from_dict(room_data) for room_data in data['rooms']]
+        return hotel
+
+    def save_data(self):
+        """Saving of hotel information through the storage backend. Raises
+        VersionConflictError if the stored hotel changed since it was loaded."""
+        with self._write_lock:
+            self.version = get_backend().save_versioned(
+                HOTEL, self.hotel_key, self.to_dict(), self.version)
+
+    def save_rooms(self, *rooms):
+        """Saving of the changes to some rooms. Backends that store rooms
+        separately only write those rooms. Raises VersionConflictError if the
+        stored hotel changed since it was loaded."""
+        self._save_room_dicts([room.to_dict() for room in rooms])
+
+    def _save_room_dicts(self, rooms):
+        """Saving of rooms already converted with Room.to_dict."""
+        with self._write_lock:
+            self.version = get_backend().update_versioned(
+                HOTEL, self.hotel_key, {'rooms': rooms}, self.to_dict, self.version)
 
     def load_from_file(self):
-        """Loading of hotel information from a JSON file."""
-        with open(self.hotel_file, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        """Loading of hotel information through the storage backend."""
+        data = get_backend().load(HOTEL, self.hotel_key)
         self.name = data['name']
         self.location = data['location']
+        self.version = data.get('version', 0)
         self.rooms = [Room.from_dict(room_data) for room_data in data['rooms']]  # pylint: disable=no-member
 
     def create_hotel(self, name, location):
@@ -111,8 +378,8 @@ class Hotel:
         return hotel
 
     def delete_hotel(self):
-        """Deletion of a hotel's information file."""
-        os.remove(self.hotel_file)
+        """Deletion of a hotel's stored information."""
+        get_backend().delete(HOTEL, self.hotel_key)
         print("Hotel has been deleted succesfully.")
 
     def display_hotel_information(self):
@@ -125,42 +392,244 @@ class Hotel:
             self.name = new_name
         if new_location:
             self.location = new_location
-        self.save_data()
+        with self._write_lock:
+            self.version = get_backend().update_versioned(
+                HOTEL, self.hotel_key, {'name': self.name, 'location': self.location},
+                self.to_dict, self.version)
         print("Hotel information has been updated.")
 
     def reserve_room(self, rez_id, customer_id, customer_sts,   # pylint: disable=too-many-arguments
                      room_num, start_date, end_date):
         """Reservation of a room if available."""
-        room = next((room for room in self.rooms if room.room_num == room_num
-        and room.room_av), None)
-        if room:
-            room.res_room()
-            reservation = reserve(
-                rez_id=rez_id,
-                customer_id=customer_id,
-                hotel_id=self.name,
-                customer_sts=customer_sts,
-                room_num=room_num,
-                start_date=start_date,
-                end_date=end_date
-            )
-            reservation.save_data()
-            self.save_data()
-            return True
-        return False
+        return self.book_room(rez_id, customer_id, customer_sts,
+                              room_num, start_date, end_date) is not None
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Context manager that groups the reservations and cancellations made
+        by this thread inside the block into one group commit at its end. If
+        the block or the commit fails, the in-memory changes are reverted.
+        Nested blocks join the outer one."""
+        if getattr(self._local, 'batch', None) is not None:
+            yield self
+            return
+        batch = self._local.batch = HotelBatch()
+        try:
+            try:
+                yield self
+            finally:
+                self._local.batch = None
+            self._commit(batch)
+        except BaseException:
+            for undo in reversed(batch.undo):
+                undo()
+            raise
+        finally:
+            self._releasing.difference_update(batch.deletes)
+
+    def _commit(self, batch):
+        """Writes the changes of a batch in one transaction. The rooms are
+        written first, so that a version conflict leaves nothing behind.
+        They are copied before the transaction starts: a backend's
+        transaction may hold its lock, and room locks must never be taken
+        after it."""
+        if not (batch.saves or batch.deletes or batch.rooms):
+            return
+        backend = get_backend()
+        with self._write_lock:
+            version = self.version
+            rooms = [room.to_dict() for room in batch.rooms.values()]
+            try:
+                with backend.transaction():
+                    if rooms:
+                        self._save_room_dicts(rooms)
+                    for rez_id in batch.deletes:
+                        with contextlib.suppress(RecordNotFoundError):
+                            backend.delete(RESERVATION, rez_id)
+                    for reservation in batch.saves.values():
+                        reservation.save_data()
+            except BaseException:
+                # The in-memory changes are reverted, so the hotel no longer
+                # matches a version written before the failure.
+                self.version = version
+                raise
+
+    def book_room(self, rez_id, customer_id, customer_sts,   # pylint: disable=too-many-arguments
+                  room_num, start_date, end_date):
+        """Reservation of a room if it is free for the whole stay. Returns the
+        saved Reservation, or None if the room does not exist, the stay
+        overlaps another reservation or the reservation ID is already booked
+        in this hotel."""
+        room = self._rooms_by_num.get(room_num)
+        if room is None:
+            return None
+        with self.batch():
+            with room.lock:
+                if self._rez_id_taken(rez_id) or not room.is_free(start_date, end_date):
+                    return None
+                return self._book(room, rez_id=rez_id, customer_id=customer_id,
+                                  customer_sts=customer_sts, start_date=start_date,
+                                  end_date=end_date)
+
+    def _rez_id_taken(self, rez_id):
+        """Checks whether a reservation ID has a booking in this hotel, or a
+        cancellation that is not committed yet."""
+        return rez_id in self._rez_rooms or rez_id in self._releasing
+
+    def _book(self, room, **details):
+        """Books a room, already checked to be free, for a reservation and
+        adds it to the current batch. Must be called inside batch() with the
+        room's lock held."""
+        room.res_room(details['rez_id'], details['start_date'], details['end_date'])
+        reservation = reserve(hotel_id=self.name, room_num=room.room_num, **details)
+        batch = self._local.batch
+        batch.undo.append(lambda: self._undo_booking(room, reservation.rez_id))
+        batch.saves[reservation.rez_id] = reservation
+        batch.rooms[room.room_num] = room
+        return reservation
+
+    @staticmethod
+    def _undo_booking(room, rez_id):
+        """Reverts a booking that could not be saved."""
+        with room.lock:
+            room.cancel_room(rez_id)
 
     def cancel_reservation(self, rez_id):
         """Canceling of a room reservation."""
+        room = self._rez_rooms.get(rez_id)
+        if room is not None:
+            return self.release_room(room.room_num, rez_id)
         try:
-            with open(f"reservation_{rez_id}.json", 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            room_num = data['room_num']
-            room = next((room for room in self.rooms if room.room_num == room_num), None)
-            if room:
-                room.cancel_room()
-                os.remove(f"reservation_{rez_id}.json")
-                self.save_data()
-                return True
+            data = get_backend().load(RESERVATION, rez_id)
         except FileNotFoundError:
-            pass
-        return False
+            return False
+        return self.release_room(data['room_num'], rez_id)
+
+    def release_room(self, room_num, rez_id):
+        """Marks a reserved room as available again and deletes the
+        reservation record. Returns False if the reservation does not exist
+        (for instance, if another thread canceled it first, even if that
+        cancellation is not committed yet). The storage is only checked
+        outside the room's lock."""
+        room = self._rooms_by_num.get(room_num)
+        if room is None:
+            return False
+        with self.batch():
+            with room.lock:
+                booked = room.bookings.get(rez_id) is not None
+            if not booked and (
+                    rez_id in self._releasing or not get_backend().exists(RESERVATION, rez_id)):
+                return False
+            with room.lock:
+                if booked and room.bookings.get(rez_id) is None:
+                    return False
+                self._release(room, rez_id)
+        return True
+
+    def _release(self, room, rez_id):
+        """Frees a room's booking for a reservation and adds the deletion to
+        the current batch. Must be called inside batch() with the room's
+        lock held."""
+        batch = self._local.batch
+        stay = room.bookings.get(rez_id)
+        available = room.room_av
+        room.cancel_room(rez_id)
+        batch.undo.append(lambda: self._undo_cancellation(room, rez_id, stay, available))
+        if batch.saves.pop(rez_id, None) is None:
+            batch.deletes.add(rez_id)
+            self._releasing.add(rez_id)
+        batch.rooms[room.room_num] = room
+
+    @staticmethod
+    def _undo_cancellation(room, rez_id, stay, available):
+        """Reverts a cancellation that could not be saved."""
+        with room.lock:
+            if stay is not None:
+                room.res_room(rez_id, stay[0], stay[1])
+            room.room_av = available
+
+    def _lock_rooms(self, stack, rooms):
+        """Acquires the locks of several rooms, in room-number order so that
+        concurrent bulk operations cannot deadlock."""
+        for room in sorted(set(rooms), key=lambda room: str(room.room_num)):
+            stack.enter_context(room.lock)
+
+    def reserve_rooms_bulk(self, requests):
+        """Reservation of several rooms at once, all or nothing.
+
+        Parameters:
+            requests (iterable): Dictionaries with rez_id, customer_id,
+                customer_sts, room_num, start_date and end_date.
+
+        Returns:
+            list: The saved reservations, in the order of the requests.
+
+        Raises:
+            BulkReservationError: If any request cannot be served; then no
+                room is reserved.
+        """
+        requests = list(requests)
+        errors = []
+        booked = []
+        seen = set()
+        stays = {}
+        for request in requests:
+            rez_id = request['rez_id']
+            room = self._rooms_by_num.get(request['room_num'])
+            try:
+                stay = to_range(request['start_date'], request['end_date'])
+            except ValueError as error:
+                errors.append((rez_id, str(error)))
+                continue
+            if room is None:
+                errors.append((rez_id, f"Room {request['room_num']} does not exist"))
+            elif self._rez_id_taken(rez_id) or rez_id in seen:
+                errors.append((rez_id, "Duplicated reservation ID"))
+            else:
+                seen.add(rez_id)
+                booked.append((request, room))
+                stays.setdefault(room.room_num, []).append((stay, rez_id))
+        for room_stays in stays.values():
+            room_stays.sort()
+            for ((_, end), _), ((start, _), rez_id) in zip(room_stays, room_stays[1:]):
+                if start < end:
+                    errors.append((rez_id, "Overlaps another stay of the batch"))
+        with self.batch(), contextlib.ExitStack() as stack:
+            self._lock_rooms(stack, [room for _, room in booked])
+            errors += [(request['rez_id'], "Room is not free for the stay")
+                       for request, room in booked
+                       if not room.is_free(request['start_date'], request['end_date'])]
+            if errors:
+                raise BulkReservationError(errors)
+            return [self._book(room, **{key: request[key] for key in (
+                'rez_id', 'customer_id', 'customer_sts', 'start_date', 'end_date')})
+                    for request, room in booked]
+
+    def cancel_reservations_bulk(self, rez_ids):
+        """Canceling of several reservations at once, all or nothing.
+
+        Raises:
+            BulkReservationError: If any reservation has no booking in this
+                hotel; then none is canceled.
+        """
+        rez_ids = list(rez_ids)
+        errors = []
+        seen = set()
+        for rez_id in rez_ids:
+            if rez_id in seen:
+                errors.append((rez_id, "Duplicated reservation ID"))
+            seen.add(rez_id)
+        rooms = [self._rez_rooms.get(rez_id) for rez_id in rez_ids]
+        errors += [(rez_id, "Reservation not found")
+                   for rez_id, room in zip(rez_ids, rooms) if room is None]
+        if errors:
+            raise BulkReservationError(errors)
+        with self.batch(), contextlib.ExitStack() as stack:
+            self._lock_rooms(stack, rooms)
+            missing = [(rez_id, "Reservation not found")
+                       for rez_id, room in zip(rez_ids, rooms) if rez_id not in room.bookings]
+            if missing:
+                raise BulkReservationError(missing)
+            for rez_id, room in zip(rez_ids, rooms):
+                self._release(room, rez_id)
+        return True
@@ -0,0 +1 @@
+from .reporting import ReportingEngine
@@ -0,0 +1,245 @@
+"""
+Module for reporting on the reservations of the hotel reservation system.
+
+The ReportingEngine keeps precomputed rollups (booked rooms per hotel per
+night, room nights per hotel, each customer's booking history, and
+cancellation and no-show counts per hotel and per customer), so reports are
+read from memory instead of opening every reservation file. The rollups are
+updated as reservations are created and canceled, and can be rebuilt from a
+storage backend with a streaming scan.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import datetime
+import threading
+from collections import Counter, defaultdict
+
+from availability.availability import to_date, to_range
+from storage import HOTEL, RESERVATION, get_backend
+
+
+# In[2]:
+
+
+BOOKED = 'booked'
+CANCELED = 'canceled'
+NO_SHOW = 'no_show'
+
+
+def _fields(reservation):
+    """Returns a reservation (Reservation or dictionary) as a dictionary."""
+    return reservation if isinstance(reservation, dict) else reservation.to_dict()
+
+
+def _nights(data):
+    """Returns the day ordinals of the nights of a stay, or an empty range if
+    the reservation has no valid dates."""
+    try:
+        start, end = to_range(data.get('start_date'), data.get('end_date'))
+    except (TypeError, ValueError):
+        return range(0)
+    return range(start.toordinal(), end.toordinal())
+
+
+class ReportingEngine:
+    """
+    Rollups of the reservations for occupancy and customer reports.
+
+    Occupancy rates need the number of rooms of each hotel, given with
+    set_capacity (the Repository does it for its hotels) or read from the
+    hotels of the backend by rebuild. Canceled reservations are deleted from
+    storage, so cancellation and no-show counts are only known from the
+    events the engine receives and are kept across rebuilds.
+    """
+
+    def __init__(self):
+        """Initialization of empty rollups."""
+        self._lock = threading.RLock()
+        self._capacity = {}
+        self._booked = defaultdict(Counter)
+        self._room_nights = Counter()
+        self._history = defaultdict(dict)
+        self._cancellations = Counter()
+        self._customer_cancellations = Counter()
+        self._no_shows = Counter()
+        self._customer_no_shows = Counter()
+        self._canceled_no_shows = set()
+
+    def set_capacity(self, hotel_id, rooms):
+        """Sets the number of rooms of a hotel."""
+        with self._lock:
+            self._capacity[hotel_id] = rooms
+
+    # Events
+
+    def _book(self, data, sign):
+        """Adds (sign 1) or removes (sign -1) the nights of a stay."""
+        nights = _nights(data)
+        booked = self._booked[data.get('hotel_id')]
+        for night in nights:
+            booked[night] += sign
+        self._room_nights[data.get('hotel_id')] += sign * len(nights)
+
+    def _set_status(self, data, status):
+        """Records a reservation in its customer's history with a status."""
+        entry = {field: data.get(field) for field in
+                 ('rez_id', 'hotel_id', 'room_num', 'start_date', 'end_date')}
+        entry['status'] = status
+        self._history[data.get('customer_id')][data.get('rez_id')] = entry
+
+    def _status(self, data):
+        """Returns the status of a reservation in its customer's history."""
+        entry = self._history.get(data.get('customer_id'), {}).get(data.get('rez_id'))
+        return None if entry is None else entry['status']
+
+    def reservation_created(self, reservation):
+        """Adds a new (or loaded) reservation to the rollups."""
+        data = _fields(reservation)
+        with self._lock:
+            status = self._status(data)
+            if status in (BOOKED, NO_SHOW):
+                return
+            self._book(data, 1)
+            self._set_status(data, BOOKED)
+
+    def reservation_canceled(self, reservation):
+        """Removes a canceled reservation (no-shows included, which keep
+        their no-show count) from the occupancy and counts the
+        cancellation."""
+        data = _fields(reservation)
+        with self._lock:
+            status = self._status(data)
+            if status not in (BOOKED, NO_SHOW):
+                return
+            if status == NO_SHOW:
+                self._canceled_no_shows.add((data.get('customer_id'), data.get('rez_id')))
+            self._book(data, -1)
+            self._set_status(data, CANCELED)
+            self._cancellations[data.get('hotel_id')] += 1
+            self._customer_cancellations[data.get('customer_id')] += 1
+
+    def reservation_no_show(self, reservation):
+        """Counts a reservation whose guest did not arrive. Its nights stay
+        booked, since the room was held."""
+        data = _fields(reservation)
+        with self._lock:
+            if self._status(data) != BOOKED:
+                return
+            self._set_status(data, NO_SHOW)
+            self._no_shows[data.get('hotel_id')] += 1
+            self._customer_no_shows[data.get('customer_id')] += 1
+
+    def revert_created(self, reservation):
+        """Forgets a reservation whose creation was rolled back."""
+        data = _fields(reservation)
+        with self._lock:
+            if self._status(data) != BOOKED:
+                return
+            self._book(data, -1)
+            del self._history[data.get('customer_id')][data.get('rez_id')]
+
+    def revert_canceled(self, reservation):
+        """Restores a reservation whose cancellation was rolled back, with
+        the status it had before."""
+        data = _fields(reservation)
+        with self._lock:
+            if self._status(data) != CANCELED:
+                return
+            key = (data.get('customer_id'), data.get('rez_id'))
+            self._book(data, 1)
+            self._set_status(data, NO_SHOW if key in self._canceled_no_shows else BOOKED)
+            self._canceled_no_shows.discard(key)
+            self._cancellations[data.get('hotel_id')] -= 1
+            self._customer_cancellations[data.get('customer_id')] -= 1
+
+    def rebuild(self, backend=None):
+        """Recomputes the occupancy and histories from the hotels and
+        reservations of a backend (the active one by default), reading one
+        record at a time. Returns the engine itself."""
+        backend = backend or get_backend()
+        with self._lock:
+            self._booked = defaultdict(Counter)
+            self._room_nights = Counter()
+            for customer_id, entries in list(self._history.items()):
+                self._history[customer_id] = {rez_id: entry for rez_id, entry in entries.items()
+                                              if entry['status'] in (CANCELED, NO_SHOW)}
+            for _, data in backend.scan(HOTEL):
+                self._capacity[data['name']] = len(data.get('rooms', []))
+            for _, data in backend.scan(RESERVATION):
+                self._book(data, 1)
+                if self._status(data) != NO_SHOW:
+                    self._set_status(data, BOOKED)
+        return self
+
+    # Reports
+
+    def occupancy(self, hotel_id, start_date, end_date):
+        """Returns the occupancy of a hotel for each night from start_date to
+        end_date (excluded), as dictionaries with the date, the booked rooms,
+        the hotel's rooms and the occupancy rate (None if the number of rooms
+        is unknown)."""
+        start, end = to_date(start_date).toordinal(), to_date(end_date).toordinal()
+        with self._lock:
+            booked = self._booked.get(hotel_id, Counter())
+            rooms = self._capacity.get(hotel_id)
+            return [{
+                'date': datetime.date.fromordinal(night).isoformat(),
+                'booked': booked[night],
+                'rooms': rooms,
+                'rate': booked[night] / rooms if rooms else None,
+            } for night in range(start, end)]
+
+    def occupancy_rate(self, hotel_id, date):
+        """Returns the occupancy rate of a hotel on a night."""
+        return self.occupancy(hotel_id, date, to_date(date) + datetime.timedelta(days=1))[0]['rate']
+
+    def room_nights(self, hotel_id):
+        """Returns the number of booked room nights of a hotel."""
+        with self._lock:
+            return self._room_nights[hotel_id]
+
+    def customer_history(self, customer_id):
+        """Returns the reservations of a customer, canceled ones included,
+        ordered by start date."""
+        with self._lock:
+            entries = [dict(entry) for entry in self._history.get(customer_id, {}).values()]
+        return sorted(entries, key=lambda entry: (entry['start_date'] or '', str(entry['rez_id'])))
+
+    def cancellations(self, hotel_id=None, customer_id=None):
+        """Returns the number of cancellations of a hotel or a customer, or
+        the total."""
+        with self._lock:
+            if customer_id is not None:
+                return self._customer_cancellations[customer_id]
+            if hotel_id is not None:
+                return self._cancellations[hotel_id]
+            return sum(self._cancellations.values())
+
+    def no_shows(self, hotel_id=None, customer_id=None):
+        """Returns the number of no-shows of a hotel or a customer, or the
+        total."""
+        with self._lock:
+            if customer_id is not None:
+                return self._customer_no_shows[customer_id]
+            if hotel_id is not None:
+                return self._no_shows[hotel_id]
+            return sum(self._no_shows.values())
+
+    def summary(self):
+        """Returns the rollups of every hotel as a dictionary that can be
+        saved as JSON for dashboards."""
+        with self._lock:
+            hotels = set(self._capacity) | set(self._room_nights) | set(self._cancellations)
+            return {str(hotel_id): {
+                'rooms': self._capacity.get(hotel_id),
+                'room_nights': self._room_nights[hotel_id],
+                'cancellations': self._cancellations[hotel_id],
+                'no_shows': self._no_shows[hotel_id],
+                'nights': {datetime.date.fromordinal(night).isoformat(): count
+                           for night, count in sorted(self._booked[hotel_id].items())
+                           if count},
+            } for hotel_id in hotels}
@@ -0,0 +1,272 @@
+"""
+Module for querying the hotel reservation system from memory.
+
+The Repository loads hotels, customers and reservations from a storage backend
+once and keeps dictionary indexes over them, so lookups by hotel name, customer
+ID, reservation ID or (hotel, room number) do not touch the storage. Every
+change is written through the system's active storage backend, which the
+repository only replaces when activate is called.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import threading
+from collections import defaultdict
+
+from customer.customer import Customer
+from hotel.hotel import BulkReservationError, Hotel
+from reservation.reservation import Reservation
+from storage import CUSTOMER, HOTEL, RESERVATION, get_backend, set_backend
+
+
+# In[2]:
+
+
+class Repository:
+    """
+    In-memory indexed view of the hotel reservation system.
+
+    Attributes:
+        backend (StorageBackend): Backend used to load and persist records.
+        hotels (dict): Hotels by name.
+        customers (dict): Customers by customer ID.
+        reservations (dict): Reservations by reservation ID.
+        reports (ReportingEngine): Rollups told about every reservation made
+            or canceled through the repository, or None.
+
+    Rooms are looked up by (hotel name, room number) through the hotel's own
+    room-number map.
+    """
+
+    def __init__(self, backend=None, reports=None):
+        """Initialization of an empty repository over a backend (the active
+        one by default). The active backend is not changed: Hotel, Customer
+        and Reservation persist through it, so a repository over another
+        backend should be activated before making changes."""
+        self.backend = backend if backend is not None else get_backend()
+        self.reports = reports
+        self.hotels = {}
+        self.customers = {}
+        self.reservations = {}
+        self._customer_rez = defaultdict(set)
+        self._hotel_rez = defaultdict(set)
+        self._claimed = set()
+        self._lock = threading.RLock()
+
+    def activate(self):
+        """Makes the repository's backend the system's active backend.
+        Returns the previously active backend."""
+        return set_backend(self.backend)
+
+    def load(self):
+        """Loading of every record from the backend and building of the
+        indexes. Returns the repository itself."""
+        for key, data in self.backend.scan(HOTEL):
+            self._index_hotel(Hotel.from_dict(data, hotel_key=key))
+        for _, data in self.backend.scan(CUSTOMER):
+            customer = Customer.from_dict(data)
+            self.customers[customer.customer_id] = customer
+        for _, data in self.backend.scan(RESERVATION):
+            reservation = Reservation.from_dict(data)
+            self.index_reservation(reservation)
+            self._report('reservation_created', reservation)
+        return self
+
+    def _index_hotel(self, hotel):
+        """Adds a hotel to the indexes."""
+        self.hotels[hotel.name] = hotel
+        if self.reports is not None:
+            self.reports.set_capacity(hotel.name, len(hotel.rooms))
+
+    def _report(self, event, reservation):
+        """Tells the reports about a reservation event."""
+        if self.reports is not None:
+            getattr(self.reports, event)(reservation)
+
+    def index_reservation(self, reservation):
+        """Adds a reservation to the indexes (it is not saved)."""
+        with self._lock:
+            self.reservations[reservation.rez_id] = reservation
+            self._customer_rez[reservation.customer_id].add(reservation.rez_id)
+            self._hotel_rez[reservation.hotel_id].add(reservation.rez_id)
+
+    def unindex_reservation(self, reservation):
+        """Removes a reservation from the indexes (it is not deleted)."""
+        with self._lock:
+            self.reservations.pop(reservation.rez_id, None)
+            self._customer_rez[reservation.customer_id].discard(reservation.rez_id)
+            self._hotel_rez[reservation.hotel_id].discard(reservation.rez_id)
+
+    # Hotels
+
+    def add_hotel(self, hotel):
+        """Adds a hotel (with its rooms) and saves it."""
+        self.backend.save(HOTEL, hotel.hotel_key, hotel.to_dict())
+        self._index_hotel(hotel)
+        return hotel
+
+    def get_hotel(self, name):
+        """Returns the hotel with the given name, or None."""
+        return self.hotels.get(name)
+
+    def remove_hotel(self, name):
+        """Deletes a hotel and its rooms."""
+        hotel = self.hotels.pop(name)
+        self.backend.delete(HOTEL, hotel.hotel_key)
+
+    def get_room(self, hotel_name, room_num):
+        """Returns a room of a hotel, or None."""
+        hotel = self.hotels.get(hotel_name)
+        return hotel.get_room(room_num) if hotel is not None else None
+
+    # Customers
+
+    def add_customer(self, customer):
+        """Adds a customer and saves it."""
+        self.backend.save(CUSTOMER, customer.customer_id, customer.to_dict())
+        self.customers[customer.customer_id] = customer
+        return customer
+
+    def get_customer(self, customer_id):
+        """Returns the customer with the given ID, or None."""
+        return self.customers.get(customer_id)
+
+    def remove_customer(self, customer_id):
+        """Deletes a customer."""
+        del self.customers[customer_id]
+        self.backend.delete(CUSTOMER, customer_id)
+
+    # Reservations
+
+    def get_reservation(self, rez_id):
+        """Returns the reservation with the given ID, or None."""
+        return self.reservations.get(rez_id)
+
+    def reservations_for_customer(self, customer_id):
+        """Returns the reservations made by a customer."""
+        return [self.reservations[rez_id] for rez_id in self._customer_rez.get(customer_id, ())]
+
+    def reservations_for_hotel(self, hotel_name):
+        """Returns the reservations made in a hotel."""
+        return [self.reservations[rez_id] for rez_id in self._hotel_rez.get(hotel_name, ())]
+
+    def reserve_room(self, hotel_name, rez_id, customer_id,   # pylint: disable=too-many-arguments
+                     customer_sts, room_num, start_date, end_date):
+        """Reservation of a room of a hotel if available. Returns the
+        reservation, or None if the room cannot be reserved."""
+        hotel = self.hotels.get(hotel_name)
+        if hotel is None:
+            return None
+        with self._lock:
+            if rez_id in self.reservations or rez_id in self._claimed:
+                return None
+            self._claimed.add(rez_id)
+        try:
+            reservation = hotel.book_room(rez_id, customer_id, customer_sts,
+                                          room_num, start_date, end_date)
+            if reservation is not None:
+                self.index_reservation(reservation)
+                self._report('reservation_created', reservation)
+        finally:
+            with self._lock:
+                self._claimed.discard(rez_id)
+        return reservation
+
+    def cancel_reservation(self, rez_id):
+        """Canceling of a reservation. Returns False if it does not exist."""
+        with self._lock:
+            reservation = self.reservations.get(rez_id)
+            if reservation is None or rez_id in self._claimed:
+                return False
+            self._claimed.add(rez_id)
+        try:
+            hotel = self.hotels.get(reservation.hotel_id)
+            if hotel is None or not hotel.release_room(reservation.room_num, rez_id):
+                return False
+            self.unindex_reservation(reservation)
+            self._report('reservation_canceled', reservation)
+            return True
+        finally:
+            with self._lock:
+                self._claimed.discard(rez_id)
+
+    def _claim(self, rez_ids, claim_indexed):
+        """Claims several reservation IDs at once. Returns the IDs that are
+        already indexed (when claim_indexed is False) or not indexed (when
+        True), or claimed by another operation; then nothing is claimed."""
+        with self._lock:
+            taken = [rez_id for rez_id in rez_ids
+                     if rez_id in self._claimed or
+                     (rez_id in self.reservations) != claim_indexed]
+            if not taken:
+                self._claimed.update(rez_ids)
+        return taken
+
+    def reserve_rooms_bulk(self, hotel_name, requests):
+        """Reservation of several rooms of a hotel in one group commit, all
+        or nothing. Raises BulkReservationError if any request is rejected
+        and KeyError if the hotel does not exist."""
+        hotel = self.hotels[hotel_name]
+        requests = list(requests)
+        rez_ids = [request['rez_id'] for request in requests]
+        taken = self._claim(rez_ids, False)
+        if taken:
+            raise BulkReservationError([(rez_id, "Duplicated reservation ID")
+                                        for rez_id in taken])
+        try:
+            reservations = hotel.reserve_rooms_bulk(requests)
+            for reservation in reservations:
+                self.index_reservation(reservation)
+                self._report('reservation_created', reservation)
+            return reservations
+        finally:
+            with self._lock:
+                self._claimed.difference_update(rez_ids)
+
+    def cancel_reservations_bulk(self, hotel_name, rez_ids):
+        """Canceling of several reservations of a hotel in one group commit,
+        all or nothing. Raises BulkReservationError, canceling nothing, if any
+        reservation does not exist or belongs to another hotel, and KeyError
+        if the hotel does not exist."""
+        hotel = self.hotels[hotel_name]
+        rez_ids = list(rez_ids)
+        taken = self._claim(rez_ids, True)
+        if taken:
+            raise BulkReservationError([(rez_id, "Reservation not found")
+                                        for rez_id in taken])
+        try:
+            elsewhere = [(rez_id, "Reservation of another hotel") for rez_id in rez_ids
+                         if self.reservations[rez_id].hotel_id != hotel_name]
+            if elsewhere:
+                raise BulkReservationError(elsewhere)
+            hotel.cancel_reservations_bulk(rez_ids)
+            for rez_id in rez_ids:
+                reservation = self.reservations[rez_id]
+                self.unindex_reservation(reservation)
+                self._report('reservation_canceled', reservation)
+            return True
+        finally:
+            with self._lock:
+                self._claimed.difference_update(rez_ids)
+
+    def revert_reservation(self, reservation):
+        """Forgets a reservation whose group commit failed."""
+        self.unindex_reservation(reservation)
+        self._report('revert_created', reservation)
+
+    def revert_cancellation(self, reservation):
+        """Restores a reservation whose cancellation failed to commit."""
+        self.index_reservation(reservation)
+        self._report('revert_canceled', reservation)
+
+    def record_no_show(self, rez_id):
+        """Records that the guest of a reservation did not arrive. Returns
+        False if the reservation does not exist."""
+        reservation = self.reservations.get(rez_id)
+        if reservation is None:
+            return False
+        self._report('reservation_no_show', reservation)
+        return True
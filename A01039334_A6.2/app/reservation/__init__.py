@@ -1 +1,2 @@
-
+from .reservation import Reservation, reserve
+from .table import DateColumn, DictionaryColumn, ReservationTable
@@ -10,8 +10,7 @@ Last Edited: 18/February/2024
 # In[1]:
 
 
-import json
-import os
+from storage import RESERVATION, get_backend
 
 
 # In[2]:
@@ -29,31 +28,45 @@ class Reservation:
         room_num (int): The room number that is being reserved.
         start_date (str): The starting date of the reservation.
         end_date (str): The ending date of the reservation.
+
+    Reservations are slotted records, without a per-instance __dict__, since
+    reporting keeps many of them in memory. FIELDS is the stored layout.
     """
 
+    FIELDS = ('customer_id', 'rez_id', 'customer_sts', 'hotel_id', 'room_num',
+              'start_date', 'end_date')
+    __slots__ = FIELDS
+
     def __init__(self, **kwargs):
-        """Initialization of a reservation in the hotel."""
-        self.customer_id = kwargs.get('customer_id')
-        self.rez_id = kwargs.get('rez_id')
-        self.customer_sts = kwargs.get('customer_sts')
-        self.hotel_id = kwargs.get('hotel_id')
-        self.room_num = kwargs.get('room_num')
-        self.start_date = kwargs.get('start_date')
-        self.end_date = kwargs.get('end_date')
+        """Initialization of a reservation in the hotel. Unknown fields are
+        ignored."""
+        for field in self.FIELDS:
+            setattr(self, field, kwargs.get(field))
+
+    def __repr__(self):
+        """Returns the reservation as a constructor call."""
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS)
+        return f"Reservation({fields})"
+
+    def to_dict(self):
+        """Returns the reservation information as a dictionary."""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a Reservation instance from a dictionary."""
+        return cls(**data)
 
     def save_data(self):
-        """Saving of reservation details to a JSON file."""
-        data = vars(self)
-        rez_file = f"reservation_{self.rez_id}.json"
-        with open(rez_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f)
+        """Saving of reservation details through the storage backend."""
+        get_backend().save(RESERVATION, self.rez_id, self.to_dict())
 
     def cancel_reservation(self, rez_id):
         """Canceling of a reservation in a hotel by removing
-        its information from a JSON file."""
-        rez_file = f"reservation_{rez_id}.json"
-        if os.path.exists(rez_file):
-            os.remove(rez_file)
+        its stored information."""
+        backend = get_backend()
+        if backend.exists(RESERVATION, rez_id):
+            backend.delete(RESERVATION, rez_id)
             print("Reservation canceled successfully.")
         else:
             print(f"Reservation with ID {rez_id} not found.")
@@ -0,0 +1,167 @@
+"""
+Module for keeping many reservations in memory as columns.
+
+A ReservationTable stores one array per reservation field instead of one
+object per reservation: repeated values (customer status, hotel, room) are
+dictionary encoded as small integer codes and dates are stored as day
+ordinals, so scans over millions of historical reservations (reports,
+occupancy) use a fraction of the memory of Reservation objects.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import datetime
+from array import array
+
+from availability.availability import to_date
+from storage import RESERVATION, get_backend
+from .reservation import Reservation
+
+
+# In[2]:
+
+
+class DictionaryColumn:
+    """
+    Column of repeated values stored as integer codes into a list of the
+    distinct values.
+
+    Attributes:
+        codes (array): Code of the value of each row.
+        values (list): Distinct values, indexed by code.
+    """
+
+    def __init__(self):
+        """Initialization of an empty column."""
+        self.codes = array('I')
+        self.values = []
+        self._code_of = {}
+
+    def __len__(self):
+        """Returns the number of rows."""
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        """Returns the value of a row."""
+        return self.values[self.codes[row]]
+
+    def code(self, value):
+        """Returns the code of a value, or None if no row has it."""
+        return self._code_of.get(value)
+
+    def append(self, value):
+        """Adds a row with the given value."""
+        code = self._code_of.get(value)
+        if code is None:
+            code = self._code_of[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def to_list(self):
+        """Returns the values of all the rows."""
+        values = self.values
+        return [values[code] for code in self.codes]
+
+
+class DateColumn:
+    """
+    Column of dates stored as day ordinals (0 for a missing date).
+
+    Attributes:
+        days (array): Ordinal of the date of each row.
+    """
+
+    def __init__(self):
+        """Initialization of an empty column."""
+        self.days = array('i')
+
+    def __len__(self):
+        """Returns the number of rows."""
+        return len(self.days)
+
+    def __getitem__(self, row):
+        """Returns the date of a row as an ISO string, or None."""
+        day = self.days[row]
+        return datetime.date.fromordinal(day).isoformat() if day else None
+
+    def append(self, value):
+        """Adds a row with the given date (ISO string, date or None)."""
+        self.days.append(0 if value is None else to_date(value).toordinal())
+
+    def to_list(self):
+        """Returns the dates of all the rows."""
+        return [self[row] for row in range(len(self.days))]
+
+
+class ReservationTable:
+    """
+    Columnar, append-only table of reservations.
+
+    Reservation IDs and customer IDs are kept as plain lists, customer status,
+    hotel and room number as DictionaryColumns and the dates as DateColumns.
+    Rows are read back as Reservation objects.
+
+    Attributes:
+        columns (dict): Column of each field of Reservation.FIELDS.
+    """
+
+    DICTIONARY_FIELDS = ('customer_sts', 'hotel_id', 'room_num')
+    DATE_FIELDS = ('start_date', 'end_date')
+
+    def __init__(self):
+        """Initialization of an empty table."""
+        self.columns = {}
+        for field in Reservation.FIELDS:
+            if field in self.DICTIONARY_FIELDS:
+                self.columns[field] = DictionaryColumn()
+            elif field in self.DATE_FIELDS:
+                self.columns[field] = DateColumn()
+            else:
+                self.columns[field] = []
+
+    def __len__(self):
+        """Returns the number of reservations."""
+        return len(self.columns['rez_id'])
+
+    def __getitem__(self, row):
+        """Returns the reservation of a row."""
+        return Reservation(**{field: column[row] for field, column in self.columns.items()})
+
+    def __iter__(self):
+        """Iterates over the reservations of the table."""
+        for row in range(len(self)):
+            yield self[row]
+
+    def append(self, reservation):
+        """Adds a reservation, given as a Reservation or a dictionary."""
+        if isinstance(reservation, Reservation):
+            reservation = reservation.to_dict()
+        for field, column in self.columns.items():
+            column.append(reservation.get(field))
+
+    def extend(self, reservations):
+        """Adds several reservations."""
+        for reservation in reservations:
+            self.append(reservation)
+
+    def column(self, field):
+        """Returns the values of a field for all the rows."""
+        column = self.columns[field]
+        return list(column) if isinstance(column, list) else column.to_list()
+
+    @classmethod
+    def from_records(cls, reservations):
+        """Creates a table from Reservation objects or dictionaries."""
+        table = cls()
+        table.extend(reservations)
+        return table
+
+    @classmethod
+    def from_backend(cls, backend=None):
+        """Creates a table with all the reservations of a storage backend
+        (the active one by default), read one record at a time."""
+        backend = backend or get_backend()
+        return cls.from_records(data for _, data in backend.scan(RESERVATION))
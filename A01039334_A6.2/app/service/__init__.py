@@ -0,0 +1 @@
+from .service import ReservationService
@@ -0,0 +1,173 @@
+"""
+Module with the asyncio API of the hotel reservation system.
+
+The ReservationService serves reservations from an in-memory Repository and
+runs all storage I/O in worker threads, off the event loop. Concurrent
+reservations and cancellations for the same hotel are queued and written
+together: while one group commit of a hotel is being written, new requests
+for that hotel wait for the next one. The number of requests in progress is
+bounded, so callers wait (backpressure) when the service is saturated.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import asyncio
+
+from customer.customer import Customer
+from repository.repository import Repository
+from storage import CUSTOMER, get_backend
+
+
+# In[2]:
+
+
+class ReservationService:
+    """
+    Asyncio API over a Repository.
+
+    Attributes:
+        repository (Repository): In-memory view of the system.
+        max_pending (int): Maximum number of requests in progress.
+        max_batch (int): Maximum number of requests in one group commit.
+    """
+
+    def __init__(self, repository, max_pending=1000, max_batch=500):
+        """Initialization of the service over a loaded repository."""
+        self.repository = repository
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.pending = 0
+        self.commits = 0
+        self._slots = asyncio.Semaphore(max_pending)
+        self._queues = {}
+        self._writers = {}
+
+    @classmethod
+    async def open(cls, backend=None, reports=None, **kwargs):
+        """Creates a service, loading the repository (and the reports, if
+        given) in a worker thread. A given backend is not activated: call
+        the repository's activate before serving requests."""
+        repository = await asyncio.to_thread(lambda: Repository(backend, reports).load())
+        return cls(repository, **kwargs)
+
+    def saturated(self):
+        """Checks whether new requests will have to wait."""
+        return self.pending >= self.max_pending
+
+    async def _submit(self, hotel_name, operation):
+        """Queues an operation for a hotel's next group commit and waits for
+        its result."""
+        async with self._slots:
+            self.pending += 1
+            try:
+                future = asyncio.get_running_loop().create_future()
+                self._queues.setdefault(hotel_name, []).append((operation, future))
+                if hotel_name not in self._writers:
+                    self._writers[hotel_name] = asyncio.create_task(self._write(hotel_name))
+                return await future
+            finally:
+                self.pending -= 1
+
+    async def _write(self, hotel_name):
+        """Writes the queued operations of a hotel, one group commit at a
+        time, until its queue is empty."""
+        try:
+            queue = self._queues[hotel_name]
+            while queue:
+                batch, queue[:] = queue[:self.max_batch], queue[self.max_batch:]
+                hotel = self.repository.get_hotel(hotel_name)
+                try:
+                    results = await asyncio.to_thread(self._run_batch, hotel, batch)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    results = [error] * len(batch)
+                self.commits += 1
+                for (_, future), result in zip(batch, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            del self._writers[hotel_name]
+            if not self._queues.get(hotel_name):
+                self._queues.pop(hotel_name, None)
+
+    def _run_batch(self, hotel, batch):
+        """Runs a hotel's operations in a worker thread and writes them in
+        one group commit. An operation that fails only fails its request;
+        if the commit fails, every request of the batch fails and the
+        repository indexes are restored."""
+        results = []
+        undo = []
+        try:
+            with hotel.batch():
+                for operation, _ in batch:
+                    try:
+                        results.append(operation(undo))
+                    except Exception as error:  # pylint: disable=broad-exception-caught
+                        results.append(error)
+        except BaseException:
+            for action in reversed(undo):
+                action()
+            raise
+        return results
+
+    async def reserve_room(self, hotel_name, rez_id,   # pylint: disable=too-many-arguments
+                           customer_id, customer_sts, room_num, start_date, end_date):
+        """Reservation of a room. Returns the reservation, or None if the
+        hotel or room does not exist or the stay is not free."""
+        if self.repository.get_hotel(hotel_name) is None:
+            return None
+
+        def operation(undo):
+            reservation = self.repository.reserve_room(
+                hotel_name, rez_id, customer_id, customer_sts, room_num, start_date, end_date)
+            if reservation is not None:
+                undo.append(lambda: self.repository.revert_reservation(reservation))
+            return reservation
+
+        return await self._submit(hotel_name, operation)
+
+    async def cancel_reservation(self, rez_id):
+        """Canceling of a reservation. Returns False if it does not exist."""
+        reservation = self.repository.get_reservation(rez_id)
+        if reservation is None:
+            return False
+
+        def operation(undo):
+            canceled = self.repository.cancel_reservation(rez_id)
+            if canceled:
+                undo.append(lambda: self.repository.revert_cancellation(reservation))
+            return canceled
+
+        return await self._submit(reservation.hotel_id, operation)
+
+    async def free_rooms(self, hotel_name, start_date, end_date):
+        """Returns the numbers of the rooms of a hotel that are free for a
+        stay (answered from memory)."""
+        hotel = self.repository.get_hotel(hotel_name)
+        if hotel is None:
+            return []
+        return [room.room_num for room in hotel.free_rooms_between(start_date, end_date)]
+
+    async def load_customer(self, customer_id):
+        """Returns a customer, from memory or else from storage. Raises
+        RecordNotFoundError if it does not exist."""
+        customer = self.repository.get_customer(customer_id)
+        if customer is None:
+            data = await asyncio.to_thread(get_backend().load, CUSTOMER, customer_id)
+            customer = Customer.from_dict(data)
+        return customer
+
+    async def save_customer(self, customer):
+        """Adds or updates a customer."""
+        await asyncio.to_thread(self.repository.add_customer, customer)
+        return customer
+
+    async def delete_customer(self, customer_id):
+        """Deletes a customer."""
+        await asyncio.to_thread(self.repository.remove_customer, customer_id)
@@ -0,0 +1,7 @@
+from .storage import (CUSTOMER, HOTEL, RESERVATION, JsonBackend, MemoryBackend,
+                      RecordNotFoundError, StorageBackend, VersionConflictError,
+                      get_backend, set_backend)
+from .sqlite_storage import SqliteBackend
+from .journal_storage import JournalBackend
+from .cache_storage import CachedBackend, LRUCache
+from .sharded_storage import ShardedJsonBackend
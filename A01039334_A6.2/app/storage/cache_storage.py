@@ -0,0 +1,244 @@
+"""
+Module for caching the records read from a storage backend.
+
+CachedBackend wraps another backend with a bounded read-through cache per
+record kind: loads are served from memory while the record is cached and not
+expired, and every write made through the wrapper (save, update, versioned
+save, delete) invalidates the cached copy. Each cache counts its hits, misses,
+evictions and expirations, so its size can be tuned against the real lookup
+traffic.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import contextlib
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from .storage import CUSTOMER, HOTEL, RESERVATION, StorageBackend
+
+
+# In[2]:
+
+
+class LRUCache:
+    """
+    Thread-safe cache of bounded size that drops the least recently used
+    entries, and optionally entries older than a time to live.
+
+    Attributes:
+        maxsize (int): Maximum number of entries.
+        ttl (float): Seconds an entry is valid, or None for no expiration.
+        hits, misses, evictions, expirations (int): Usage counters.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        """Initialization of an empty cache."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Returns the number of cached entries, expired or not."""
+        return len(self._entries)
+
+    def generation(self):
+        """Returns a number that changes on every invalidation. A value read
+        from the source is only stored if the generation did not change
+        meanwhile (see put)."""
+        return self._generation
+
+    def get(self, key, default=None):
+        """Returns the cached value of a key, or default on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self.clock() >= entry[1]:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, generation=None):
+        """Stores a value. With a generation, the value is discarded if the
+        cache was invalidated since that generation, because it may be older
+        than the write that caused the invalidation."""
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Removes a key from the cache."""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Removes all the entries from the cache."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Returns the counters and size of the cache as a dictionary."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+# In[3]:
+
+
+class CachedBackend(StorageBackend):
+    """
+    Storage backend that caches the records loaded from another backend.
+
+    Every record kind has its own LRUCache. Cached records are copied on
+    the way in and out, so callers can modify what they load. Records written
+    to the wrapped backend by other processes are only seen once their cached
+    copy expires, so a ttl should be set when the storage is shared.
+
+    Attributes:
+        backend (StorageBackend): Wrapped backend.
+        caches (dict): LRUCache of each cached kind.
+    """
+
+    def __init__(self, backend, maxsize=1024, ttl=None,
+                 kinds=(HOTEL, CUSTOMER, RESERVATION)):
+        """Initialization of the caches. maxsize is either one size for all
+        the kinds or a dictionary with the size of each kind."""
+        super().__init__()
+        self.backend = backend
+        self.caches = {kind: LRUCache(maxsize[kind] if isinstance(maxsize, dict) else maxsize, ttl)
+                       for kind in kinds}
+
+    def __getattr__(self, name):
+        """Gives access to the queries and methods specific to the wrapped
+        backend, such as SqliteBackend.reservations_for."""
+        if name == 'backend':
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def _invalidate(self, kind, key):
+        """Removes a record from the cache of its kind."""
+        cache = self.caches.get(kind)
+        if cache is not None:
+            cache.invalidate(str(key))
+
+    def clear(self):
+        """Removes all the cached records."""
+        for cache in self.caches.values():
+            cache.clear()
+
+    def stats(self):
+        """Returns the counters of the cache of each kind."""
+        return {kind: cache.stats() for kind, cache in self.caches.items()}
+
+    def save(self, kind, key, data):
+        """Saving of a record in the wrapped backend."""
+        try:
+            self.backend.save(kind, key, data)
+        finally:
+            self._invalidate(kind, key)
+
+    def save_versioned(self, kind, key, data, expected_version=None):
+        """Versioned saving of a record in the wrapped backend."""
+        try:
+            return self.backend.save_versioned(kind, key, data, expected_version)
+        finally:
+            self._invalidate(kind, key)
+
+    def update_versioned(self, kind, key, patch, snapshot, expected_version=None):
+        """Versioned partial update of a record in the wrapped backend."""
+        try:
+            return self.backend.update_versioned(kind, key, patch, snapshot, expected_version)
+        finally:
+            self._invalidate(kind, key)
+
+    def update(self, kind, key, patch, snapshot):
+        """Partial update of a record in the wrapped backend."""
+        try:
+            self.backend.update(kind, key, patch, snapshot)
+        finally:
+            self._invalidate(kind, key)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Transaction of the wrapped backend. If it is rolled back, the
+        caches are cleared, since they may hold records read inside it."""
+        try:
+            with self.backend.transaction():
+                yield self
+        except BaseException:
+            self.clear()
+            raise
+
+    def load(self, kind, key):
+        """Loading of a record, from the cache if possible."""
+        cache = self.caches.get(kind)
+        if cache is None:
+            return self.backend.load(kind, key)
+        data = cache.get(str(key))
+        if data is None:
+            generation = cache.generation()
+            data = self.backend.load(kind, key)
+            cache.put(str(key), copy.deepcopy(data), generation)
+            return data
+        return copy.deepcopy(data)
+
+    def delete(self, kind, key):
+        """Deletion of a record from the wrapped backend."""
+        try:
+            self.backend.delete(kind, key)
+        finally:
+            self._invalidate(kind, key)
+
+    def exists(self, kind, key):
+        """Checks whether a record exists, in the cache first."""
+        cache = self.caches.get(kind)
+        if cache is not None and cache.get(str(key)) is not None:
+            return True
+        return self.backend.exists(kind, key)
+
+    def scan(self, kind):
+        """Iterates over all records of a kind in the wrapped backend."""
+        return self.backend.scan(kind)
+
+    def close(self):
+        """Closing of the wrapped backend, if it needs it."""
+        self.clear()
+        close = getattr(self.backend, 'close', None)
+        if close is not None:
+            close()
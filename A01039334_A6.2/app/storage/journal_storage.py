@@ -0,0 +1,226 @@
+"""
+Module for persisting hotels as a snapshot plus an append-only journal.
+
+Every partial update of a hotel (a reserved or canceled room, new hotel
+information) is appended as one compact JSON line to the hotel's log instead
+of rewriting the whole hotel file. A background compactor folds long logs
+into a new snapshot, written atomically, and truncates them. Loading a hotel
+replays its log over the last snapshot.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import json
+import os
+import threading
+from collections import defaultdict
+
+from .storage import HOTEL, JsonBackend, RecordNotFoundError, apply_patch, write_json_atomic
+
+
+# In[2]:
+
+
+class JournalBackend(JsonBackend):
+    """
+    JSON storage backend with journaled hotel updates.
+
+    Hotels are stored as '{name}_data.json' (the snapshot) and
+    '{name}_data.log' (updates since the snapshot). Customers and reservations
+    are stored as in JsonBackend.
+
+    Attributes:
+        compact_every (int): Log records after which a hotel is compacted.
+        sync (bool): Whether each log append is flushed to disk with fsync.
+    """
+
+    def __init__(self, root='.', compact_every=1000, sync=False, background=True):
+        """Initialization of the backend. With background=False, hotels are
+        compacted in the writing thread instead of by the compactor thread."""
+        super().__init__(root)
+        self.compact_every = compact_every
+        self.sync = sync
+        self._guard = threading.Lock()
+        self._locks = defaultdict(threading.Lock)
+        self._log_sizes = {}
+        self._versions = {}
+        self._pending = set()
+        self._wakeup = threading.Condition(self._guard)
+        self._closed = False
+        self._compactor = None
+        if background:
+            self._compactor = threading.Thread(target=self._run_compactor, daemon=True)
+            self._compactor.start()
+
+    def log_path(self, key):
+        """Returns the path of the log of a hotel."""
+        return self.path(HOTEL, key)[:-len('.json')] + '.log'
+
+    def _lock(self, key):
+        """Returns the lock of a hotel."""
+        with self._guard:
+            return self._locks[str(key)]
+
+    def _read_log(self, key):
+        """Returns the records of a hotel's log. An incomplete last line, left
+        by a crash during an append, is ignored."""
+        try:
+            with open(self.log_path(key), 'r', encoding='utf-8') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+        return records
+
+    def _repair_log(self, key):
+        """Truncates a hotel's log after its last complete line, so that the
+        first append after a crash does not extend the incomplete record."""
+        try:
+            with open(self.log_path(key), 'rb+') as file:
+                content = file.read()
+                if content and not content.endswith(b'\n'):
+                    file.truncate(content.rfind(b'\n') + 1)
+        except FileNotFoundError:
+            pass
+
+    def save(self, kind, key, data):
+        """Saving of a record. A hotel is written as a new snapshot and its
+        log is truncated."""
+        if kind != HOTEL:
+            super().save(kind, key, data)
+            return
+        with self._lock(key):
+            self._write_snapshot(key, data)
+
+    def _write_snapshot(self, key, data):
+        """Writes a hotel snapshot atomically and truncates its log. Must be
+        called with the hotel's lock held."""
+        write_json_atomic(self.path(HOTEL, key), data, self.INDENT[HOTEL])
+        if os.path.exists(self.log_path(key)):
+            with open(self.log_path(key), 'w', encoding='utf-8'):
+                pass
+        with self._guard:
+            self._log_sizes[str(key)] = 0
+            self._versions[str(key)] = data.get('version', 0)
+            self._pending.discard(str(key))
+
+    def update(self, kind, key, patch, snapshot):
+        """Partial update of a record. A hotel update is appended to its log;
+        the first update of a new hotel writes its snapshot instead."""
+        if kind != HOTEL:
+            super().update(kind, key, patch, snapshot)
+            return
+        with self._lock(key):
+            if not os.path.exists(self.path(HOTEL, key)):
+                self._write_snapshot(key, snapshot())
+                return
+            with self._guard:
+                checked = str(key) in self._log_sizes
+            if not checked:
+                self._repair_log(key)
+            with open(self.log_path(key), 'a', encoding='utf-8') as file:
+                file.write(json.dumps(patch, separators=(',', ':')) + '\n')
+                if self.sync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            with self._guard:
+                if 'version' in patch:
+                    self._versions[str(key)] = patch['version']
+                size = self._log_sizes.get(str(key))
+                size = len(self._read_log(key)) if size is None else size + 1
+                self._log_sizes[str(key)] = size
+                due = size >= self.compact_every
+                if due and self._compactor is not None:
+                    self._pending.add(str(key))
+                    self._wakeup.notify()
+            if due and self._compactor is None:
+                self._write_snapshot(key, self._replay(key))
+
+    def _replay(self, key):
+        """Returns a hotel's snapshot with its log applied."""
+        data = super().load(HOTEL, key)
+        for patch in self._read_log(key):
+            apply_patch(HOTEL, data, patch)
+        return data
+
+    def load(self, kind, key):
+        """Loading of a record. A hotel is recovered from its snapshot and
+        log."""
+        if kind != HOTEL:
+            return super().load(kind, key)
+        with self._lock(key):
+            return self._replay(key)
+
+    def version(self, kind, key):
+        """Returns the stored version of a record. The version of a hotel is
+        remembered after it is written or replayed once."""
+        if kind != HOTEL:
+            return super().version(kind, key)
+        with self._guard:
+            version = self._versions.get(str(key))
+        if version is not None:
+            return version
+        with self._lock(key):
+            try:
+                version = self._replay(key).get('version', 0)
+            except RecordNotFoundError:
+                return 0
+            with self._guard:
+                self._versions[str(key)] = version
+            return version
+
+    def delete(self, kind, key):
+        """Deletion of a record, including a hotel's log."""
+        if kind != HOTEL:
+            super().delete(kind, key)
+            return
+        with self._lock(key):
+            super().delete(kind, key)
+            try:
+                os.remove(self.log_path(key))
+            except FileNotFoundError:
+                pass
+            with self._guard:
+                self._log_sizes.pop(str(key), None)
+                self._versions.pop(str(key), None)
+                self._pending.discard(str(key))
+
+    def compact(self, key):
+        """Folds a hotel's log into a new snapshot."""
+        with self._lock(key):
+            try:
+                data = self._replay(key)
+            except RecordNotFoundError:
+                return
+            self._write_snapshot(key, data)
+
+    def _run_compactor(self):
+        """Body of the compactor thread: compacts the hotels whose logs
+        reached compact_every records."""
+        while True:
+            with self._guard:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                key = self._pending.pop()
+            self.compact(key)
+
+    def close(self):
+        """Stops the compactor and compacts every hotel with a log."""
+        with self._guard:
+            self._closed = True
+            self._wakeup.notify()
+        if self._compactor is not None:
+            self._compactor.join()
+        for key in self.keys(HOTEL):
+            if os.path.exists(self.log_path(key)) and os.path.getsize(self.log_path(key)):
+                self.compact(key)
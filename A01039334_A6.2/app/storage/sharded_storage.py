@@ -0,0 +1,205 @@
+"""
+Module for storing records as JSON files spread over sharded directories.
+
+With one file per reservation, a flat data directory ends up holding millions
+of entries and every lookup or listing walks it. ShardedJsonBackend writes
+customers and reservations under '{root}/{kind}/{aa}/{bb}/', where 'aabb' is
+the start of the hash of the record key, and keeps a persistent index of the
+reservations (reservation ID to file, customer and hotel) in an SQLite
+database under the root. Existence checks and listing the reservations of a
+customer or hotel query the index instead of the file system.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+
+from .storage import CUSTOMER, HOTEL, RESERVATION, JsonBackend, RecordNotFoundError
+
+
+# In[2]:
+
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservation_index (
+    rez_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    customer_id TEXT,
+    hotel_id TEXT
+);
+CREATE INDEX IF NOT EXISTS reservation_index_customer ON reservation_index (customer_id);
+CREATE INDEX IF NOT EXISTS reservation_index_hotel ON reservation_index (hotel_id);
+"""
+
+
+def shard_of(key, levels=2):
+    """Returns the shard directories of a key: 'levels' pairs of hexadecimal
+    digits of the MD5 hash of the key."""
+    digest = hashlib.md5(str(key).encode('utf-8')).hexdigest()
+    return [digest[2 * level:2 * level + 2] for level in range(levels)]
+
+
+class ShardedJsonBackend(JsonBackend):
+    """
+    JSON storage backend with sharded directories and a reservation index.
+
+    Hotels, which are few, stay at the top of the data directory as in
+    JsonBackend. The index ('index.db' under the root) is updated after every
+    reservation file is written or removed; rebuild_index recreates it from
+    the files if it is lost or out of date.
+
+    Attributes:
+        root (str): Data directory.
+        levels (int): Number of shard directory levels.
+    """
+
+    SHARDED_KINDS = {CUSTOMER: 'customers', RESERVATION: 'reservations'}
+    INDEX_FILE = 'index.db'
+
+    def __init__(self, root='.', levels=2):
+        """Initialization of the backend, opening or creating its index."""
+        super().__init__(root)
+        self.levels = levels
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(root, self.INDEX_FILE),
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(INDEX_SCHEMA)
+
+    def close(self):
+        """Closing of the index database."""
+        self._conn.close()
+
+    def path(self, kind, key):
+        """Returns the path of the file of a record."""
+        if kind not in self.SHARDED_KINDS:
+            return super().path(kind, key)
+        prefix, suffix = self.FILE_NAMES[kind]
+        return os.path.join(self.root, self.SHARDED_KINDS[kind],
+                            *shard_of(key, self.levels), f"{prefix}{key}{suffix}")
+
+    def save(self, kind, key, data):
+        """Saving of the record into its JSON file, indexing reservations."""
+        if kind in self.SHARDED_KINDS:
+            os.makedirs(os.path.dirname(self.path(kind, key)), exist_ok=True)
+        super().save(kind, key, data)
+        if kind == RESERVATION:
+            self._index(key, data)
+
+    def delete(self, kind, key):
+        """Deletion of the JSON file of the record and its index entry."""
+        try:
+            super().delete(kind, key)
+        finally:
+            if kind == RESERVATION:
+                with self._lock:
+                    self._conn.execute("DELETE FROM reservation_index WHERE rez_id = ?",
+                                       (str(key),))
+
+    def exists(self, kind, key):
+        """Checks whether a record exists; reservations are looked up in the
+        index."""
+        if kind != RESERVATION:
+            return super().exists(kind, key)
+        return self.location(key) is not None
+
+    def keys(self, kind):
+        """Iterates over the keys of the records of a kind."""
+        if kind == RESERVATION:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rez_id FROM reservation_index ORDER BY rez_id").fetchall()
+            for (rez_id,) in rows:
+                yield rez_id
+        elif kind in self.SHARDED_KINDS:
+            yield from sorted(key for key, _ in self._walk(kind))
+        else:
+            yield from super().keys(kind)
+
+    def _walk(self, kind):
+        """Iterates over the (key, path) pairs of the files of a sharded kind
+        found on disk."""
+        prefix, suffix = self.FILE_NAMES[kind]
+        for folder, _, files in os.walk(os.path.join(self.root, self.SHARDED_KINDS[kind])):
+            for name in files:
+                if name.startswith(prefix) and name.endswith(suffix):
+                    yield name[len(prefix):-len(suffix)], os.path.join(folder, name)
+
+    def _index(self, rez_id, data):
+        """Adds or replaces the index entry of a reservation."""
+        path = os.path.relpath(self.path(RESERVATION, rez_id), self.root)
+        customer_id, hotel_id = data.get('customer_id'), data.get('hotel_id')
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reservation_index VALUES (?, ?, ?, ?)",
+                (str(rez_id), path,
+                 None if customer_id is None else str(customer_id),
+                 None if hotel_id is None else str(hotel_id)))
+
+    def location(self, rez_id):
+        """Returns the path of the file of a reservation according to the
+        index, or None if it is not indexed."""
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM reservation_index WHERE rez_id = ?",
+                                     (str(rez_id),)).fetchone()
+        return None if row is None else os.path.join(self.root, row[0])
+
+    def reservation_ids_for(self, customer_id=None, hotel_id=None):
+        """Returns the IDs of the reservations of a customer and/or a hotel,
+        from the index."""
+        query = "SELECT rez_id FROM reservation_index WHERE 1 = 1"
+        params = []
+        if customer_id is not None:
+            query += " AND customer_id = ?"
+            params.append(str(customer_id))
+        if hotel_id is not None:
+            query += " AND hotel_id = ?"
+            params.append(str(hotel_id))
+        with self._lock:
+            return [rez_id for (rez_id,) in self._conn.execute(query + " ORDER BY rez_id", params)]
+
+    def reservations_for(self, customer_id=None, hotel_id=None):
+        """Returns the reservations of a customer and/or a hotel, loading only
+        their files."""
+        reservations = []
+        for rez_id in self.reservation_ids_for(customer_id, hotel_id):
+            with contextlib.suppress(RecordNotFoundError):
+                reservations.append(self.load(RESERVATION, rez_id))
+        return reservations
+
+    def rebuild_index(self):
+        """Recreates the reservation index from the files on disk. Returns
+        the number of indexed reservations."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM reservation_index")
+                count = 0
+                for rez_id, _ in self._walk(RESERVATION):
+                    with contextlib.suppress(RecordNotFoundError):
+                        self._index(rez_id, self.load(RESERVATION, rez_id))
+                        count += 1
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return count
+
+    def import_from(self, backend):
+        """Copies every record of another backend (for instance a flat
+        JsonBackend) into this one. Returns the number of copied records."""
+        count = 0
+        for kind in (HOTEL, CUSTOMER, RESERVATION):
+            for key, data in backend.scan(kind):
+                self.save(kind, key, data)
+                count += 1
+        return count
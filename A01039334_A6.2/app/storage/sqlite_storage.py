@@ -0,0 +1,296 @@
+"""
+Module for persisting the hotel reservation system in an SQLite database.
+
+The database runs in WAL mode with one table per kind of record. Rooms have
+their own table, so reserving or canceling a room writes a single row, and
+reservations are indexed by customer and by hotel.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import contextlib
+import json
+import sqlite3
+import threading
+
+from .storage import CUSTOMER, HOTEL, RESERVATION, RecordNotFoundError, StorageBackend
+
+
+# In[2]:
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotels (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    location TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rooms (
+    hotel_key TEXT NOT NULL REFERENCES hotels(key) ON DELETE CASCADE,
+    room_number NOT NULL,
+    room_available INTEGER NOT NULL,
+    bookings TEXT NOT NULL DEFAULT '[]',
+    UNIQUE (hotel_key, room_number)
+);
+CREATE TABLE IF NOT EXISTS customers (
+    key TEXT PRIMARY KEY,
+    customer_id,
+    name TEXT,
+    email TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    key TEXT PRIMARY KEY,
+    rez_id,
+    customer_id,
+    customer_sts TEXT,
+    hotel_id TEXT,
+    room_num,
+    start_date TEXT,
+    end_date TEXT
+);
+CREATE INDEX IF NOT EXISTS reservations_customer ON reservations (customer_id);
+CREATE INDEX IF NOT EXISTS reservations_hotel ON reservations (hotel_id);
+"""
+
+CUSTOMER_FIELDS = ('customer_id', 'name', 'email')
+RESERVATION_FIELDS = ('rez_id', 'customer_id', 'customer_sts', 'hotel_id',
+                      'room_num', 'start_date', 'end_date')
+# Records read per query by scan (below SQLite's limit of 999 parameters).
+SCAN_CHUNK = 500
+
+
+def _with_version(data, version):
+    """Adds the version to a loaded record, unless it was never versioned."""
+    if version:
+        data['version'] = version
+    return data
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Storage backend on an SQLite database.
+
+    Keys are stored as text, so customer 5 and customer "5" are the same
+    record, as with the JSON files. The connection is shared by all threads
+    and guarded by a lock; a transaction holds the lock until it ends. Hotels
+    and customers keep their version in a column (0 if never versioned).
+
+    Attributes:
+        path (str): Path of the database file.
+    """
+
+    def __init__(self, path='reservations.db'):
+        """Opening of the database, creating the tables if needed."""
+        super().__init__()
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        """Closing of the database connection."""
+        self._conn.close()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Runs the writes inside the block as a single transaction. Nested
+        blocks join the outer transaction."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    def _save_rooms(self, key, rooms):
+        """Insertion or replacement of rooms of a hotel."""
+        self._conn.executemany(
+            "INSERT INTO rooms (hotel_key, room_number, room_available, bookings) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT (hotel_key, room_number) DO UPDATE SET "
+            "room_available = excluded.room_available, bookings = excluded.bookings",
+            [(key, room['room_number'], room.get('room_available', True),
+              json.dumps(room.get('bookings', []))) for room in rooms])
+
+    def save(self, kind, key, data):
+        """Saving of a record, replacing any previous version."""
+        key = str(key)
+        with self.transaction():
+            if kind == HOTEL:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hotels (key, name, location, version) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, data['name'], data['location'], data.get('version', 0)))
+                self._conn.execute("DELETE FROM rooms WHERE hotel_key = ?", (key,))
+                self._save_rooms(key, data['rooms'])
+            elif kind == CUSTOMER:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO customers (key, customer_id, name, email, version) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, *(data.get(f) for f in CUSTOMER_FIELDS), data.get('version', 0)))
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO reservations (key, rez_id, customer_id, "
+                    "customer_sts, hotel_id, room_num, start_date, end_date) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, *(data.get(f) for f in RESERVATION_FIELDS)))
+
+    def update(self, kind, key, patch, snapshot):
+        """Partial update of a record. Hotel rooms are written one row each;
+        a record that does not exist yet is saved from the snapshot."""
+        with self.transaction():
+            if not self.exists(kind, key):
+                self.save(kind, key, snapshot())
+            elif kind == HOTEL:
+                if 'name' in patch or 'location' in patch or 'version' in patch:
+                    self._conn.execute(
+                        "UPDATE hotels SET name = coalesce(?, name), "
+                        "location = coalesce(?, location), "
+                        "version = coalesce(?, version) WHERE key = ?",
+                        (patch.get('name'), patch.get('location'), patch.get('version'),
+                         str(key)))
+                self._save_rooms(str(key), patch.get('rooms', []))
+            else:
+                data = self.load(kind, key)
+                data.update(patch)
+                self.save(kind, key, data)
+
+    def _hotel_rooms(self, key):
+        """Returns the room dictionaries of a hotel."""
+        rows = self._conn.execute(
+            "SELECT room_number, room_available, bookings FROM rooms "
+            "WHERE hotel_key = ? ORDER BY rowid", (key,))
+        return [{'room_number': number, 'room_available': bool(available),
+                 'bookings': json.loads(bookings)} for number, available, bookings in rows]
+
+    def load(self, kind, key):
+        """Loading of a record. Raises RecordNotFoundError if missing."""
+        key = str(key)
+        with self._lock:
+            if kind == HOTEL:
+                row = self._conn.execute(
+                    "SELECT name, location, version FROM hotels WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    return _with_version({'name': row[0], 'location': row[1],
+                                          'rooms': self._hotel_rooms(key)}, row[2])
+            elif kind == CUSTOMER:
+                row = self._conn.execute(
+                    "SELECT customer_id, name, email, version FROM customers WHERE key = ?",
+                    (key,)).fetchone()
+                if row is not None:
+                    return _with_version(dict(zip(CUSTOMER_FIELDS, row)), row[3])
+            else:
+                row = self._conn.execute(
+                    "SELECT rez_id, customer_id, customer_sts, hotel_id, room_num, "
+                    "start_date, end_date FROM reservations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    return dict(zip(RESERVATION_FIELDS, row))
+        raise RecordNotFoundError(f"{kind} {key} not found")
+
+    def version(self, kind, key):
+        """Returns the stored version of a record from its version column."""
+        if kind == RESERVATION:
+            return 0
+        table = 'hotels' if kind == HOTEL else 'customers'
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT version FROM {table} WHERE key = ?", (str(key),)).fetchone()
+        return row[0] if row is not None else 0
+
+    def delete(self, kind, key):
+        """Deletion of a record. Raises RecordNotFoundError if missing."""
+        table = {HOTEL: 'hotels', CUSTOMER: 'customers', RESERVATION: 'reservations'}[kind]
+        with self.transaction():
+            cursor = self._conn.execute(f"DELETE FROM {table} WHERE key = ?", (str(key),))
+        if cursor.rowcount == 0:
+            raise RecordNotFoundError(f"{kind} {key} not found")
+
+    def exists(self, kind, key):
+        """Checks whether a record exists."""
+        table = {HOTEL: 'hotels', CUSTOMER: 'customers', RESERVATION: 'reservations'}[kind]
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT 1 FROM {table} WHERE key = ?", (str(key),)).fetchone() is not None
+
+    def _scan_chunks(self, table, columns, details=None):
+        """Iterates over the rows of a table in chunks of SCAN_CHUNK rows
+        ordered by key, with what details(keys) returns for each chunk. Each
+        chunk is a separate query, so the lock is only held while a chunk is
+        read and only one chunk is in memory."""
+        last = None
+        while True:
+            with self._lock:
+                if last is None:
+                    rows = self._conn.execute(
+                        f"SELECT key, {columns} FROM {table} ORDER BY key LIMIT ?",
+                        (SCAN_CHUNK,)).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        f"SELECT key, {columns} FROM {table} WHERE key > ? "
+                        "ORDER BY key LIMIT ?", (last, SCAN_CHUNK)).fetchall()
+                extra = details([row[0] for row in rows]) if details and rows else None
+            if not rows:
+                return
+            yield rows, extra
+            last = rows[-1][0]
+
+    def _chunk_rooms(self, keys):
+        """Returns the room dictionaries of several hotels by hotel key."""
+        rooms = {}
+        for key, number, available, bookings in self._conn.execute(
+                "SELECT hotel_key, room_number, room_available, bookings FROM rooms "
+                f"WHERE hotel_key IN ({', '.join('?' * len(keys))}) ORDER BY rowid", keys):
+            rooms.setdefault(key, []).append(
+                {'room_number': number, 'room_available': bool(available),
+                 'bookings': json.loads(bookings)})
+        return rooms
+
+    def scan(self, kind):
+        """Iterates over all records of a kind as (key, data) pairs, reading
+        them in chunks (hotels together with their rooms)."""
+        if kind == HOTEL:
+            for hotels, rooms in self._scan_chunks('hotels', 'name, location, version',
+                                                   self._chunk_rooms):
+                for key, name, location, version in hotels:
+                    yield key, _with_version({'name': name, 'location': location,
+                                              'rooms': rooms.get(key, [])}, version)
+        elif kind == CUSTOMER:
+            for rows, _ in self._scan_chunks('customers', 'customer_id, name, email, version'):
+                for row in rows:
+                    yield row[0], _with_version(dict(zip(CUSTOMER_FIELDS, row[1:4])), row[4])
+        else:
+            for rows, _ in self._scan_chunks('reservations', ', '.join(RESERVATION_FIELDS)):
+                for row in rows:
+                    yield row[0], dict(zip(RESERVATION_FIELDS, row[1:]))
+
+    def reservations_for(self, customer_id=None, hotel_id=None):
+        """Returns the reservations of a customer and/or a hotel using the
+        table's indexes."""
+        query = ("SELECT rez_id, customer_id, customer_sts, hotel_id, room_num, "
+                 "start_date, end_date FROM reservations WHERE 1 = 1")
+        params = []
+        if customer_id is not None:
+            query += " AND customer_id = ?"
+            params.append(customer_id)
+        if hotel_id is not None:
+            query += " AND hotel_id = ?"
+            params.append(hotel_id)
+        with self._lock:
+            return [dict(zip(RESERVATION_FIELDS, row))
+                    for row in self._conn.execute(query, params)]
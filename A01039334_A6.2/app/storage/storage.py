@@ -0,0 +1,309 @@
+"""
+Module for persisting records of the hotel reservation system.
+
+Hotels, customers and reservations are stored as plain dictionaries through a
+storage backend, addressed by a record kind and a key. The active backend is
+shared by the Hotel, Customer and Reservation classes and can be swapped with
+set_backend(). By default it is a JsonBackend on the directory named by the
+HOTEL_DATA_ROOT environment variable, or the current directory.
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import contextlib
+import copy
+import glob
+import json
+import os
+import tempfile
+import threading
+
+
+# In[2]:
+
+
+HOTEL = 'hotel'
+CUSTOMER = 'customer'
+RESERVATION = 'reservation'
+
+
+class RecordNotFoundError(FileNotFoundError):
+    """Raised when a record does not exist in the storage backend."""
+
+
+class VersionConflictError(Exception):
+    """Raised when a record was changed by someone else since it was loaded."""
+
+
+def apply_patch(kind, data, patch):
+    """Applies a partial update (see StorageBackend) to a record in place
+    and returns it."""
+    if kind != HOTEL:
+        data.update(patch)
+        return data
+    for field in ('name', 'location', 'version'):
+        if field in patch:
+            data[field] = patch[field]
+    if patch.get('rooms'):
+        positions = {room['room_number']: pos for pos, room in enumerate(data['rooms'])}
+        for room in patch['rooms']:
+            pos = positions.get(room['room_number'])
+            if pos is None:
+                positions[room['room_number']] = len(data['rooms'])
+                data['rooms'].append(room)
+            else:
+                data['rooms'][pos] = room
+    return data
+
+
+def write_json_atomic(path, data, indent=None):
+    """Writes a JSON file through a temporary file and a rename, so readers
+    never see a partially written file."""
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=indent)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+class StorageBackend:
+    """
+    Interface of a storage backend.
+
+    Records are dictionaries identified by their kind (HOTEL, CUSTOMER or
+    RESERVATION) and a key (hotel name, customer ID or reservation ID).
+
+    Besides whole-record saves, a backend receives partial updates. For hotels
+    the patch may hold 'name', 'location', 'version' and 'rooms', a list of room
+    dictionaries to insert or replace by room number; for other kinds it holds
+    fields to replace. Backends that cannot apply a patch save the snapshot.
+
+    Records saved with save_versioned or update_versioned carry a 'version'
+    number that is checked and increased on every such write (optimistic
+    concurrency control).
+    """
+
+    def __init__(self):
+        """Initialization of the per-record locks."""
+        self._record_locks = {}
+        self._record_locks_guard = threading.Lock()
+
+    def _record_lock(self, kind, key):
+        """Returns the lock that serializes versioned saves of a record."""
+        with self._record_locks_guard:
+            return self._record_locks.setdefault((kind, str(key)), threading.Lock())
+
+    def save_versioned(self, kind, key, data, expected_version=None):
+        """Saving of a record only if its stored version is expected_version
+        (records without one count as version 0). Raises VersionConflictError
+        otherwise. With expected_version None the record is saved anyway.
+        Returns the new version, which is also stored in the record."""
+        with self._record_lock(kind, key), self.transaction():
+            current = self._check_version(kind, key, expected_version)
+            self.save(kind, key, dict(data, version=current + 1))
+            return current + 1
+
+    def update_versioned(self, kind, key, patch, snapshot, expected_version=None):
+        """Partial update of a record (see update) checked like
+        save_versioned. The new version is written with the patch and
+        returned."""
+        with self._record_lock(kind, key), self.transaction():
+            version = self._check_version(kind, key, expected_version) + 1
+            self.update(kind, key, dict(patch, version=version),
+                        lambda: dict(snapshot(), version=version))
+            return version
+
+    def _check_version(self, kind, key, expected_version):
+        """Returns the stored version of a record, raising
+        VersionConflictError if it is not expected_version."""
+        current = self.version(kind, key)
+        if expected_version is not None and current != expected_version:
+            raise VersionConflictError(
+                f"{kind} {key} is at version {current}, expected {expected_version}")
+        return current
+
+    def version(self, kind, key):
+        """Returns the stored version of a record (0 if it does not exist or
+        was never versioned)."""
+        try:
+            return self.load(kind, key).get('version', 0)
+        except RecordNotFoundError:
+            return 0
+
+    def save(self, kind, key, data):
+        """Saving of a record, replacing any previous version."""
+        raise NotImplementedError
+
+    def update(self, kind, key, patch, snapshot):
+        """Partial update of a record. snapshot is a function that returns
+        the whole updated record, called only if the backend needs it."""
+        del patch
+        self.save(kind, key, snapshot())
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Context manager that groups several writes. Backends without
+        transactions run them one by one."""
+        yield self
+
+    def load(self, kind, key):
+        """Loading of a record. Raises RecordNotFoundError if missing."""
+        raise NotImplementedError
+
+    def delete(self, kind, key):
+        """Deletion of a record. Raises RecordNotFoundError if missing."""
+        raise NotImplementedError
+
+    def exists(self, kind, key):
+        """Checks whether a record exists."""
+        try:
+            self.load(kind, key)
+        except RecordNotFoundError:
+            return False
+        return True
+
+    def scan(self, kind):
+        """Iterates over all records of a kind as (key, data) pairs."""
+        raise NotImplementedError
+
+
+class MemoryBackend(StorageBackend):
+    """Storage backend that keeps records in memory (nothing is persisted)."""
+
+    def __init__(self):
+        """Initialization of an empty in-memory store."""
+        super().__init__()
+        self.records = {HOTEL: {}, CUSTOMER: {}, RESERVATION: {}}
+
+    def save(self, kind, key, data):
+        """Saving of a copy of the record."""
+        self.records[kind][key] = copy.deepcopy(data)
+
+    def update(self, kind, key, patch, snapshot):
+        """Partial update of the stored record in place, copying only the
+        patch; a record that does not exist yet is saved from the snapshot."""
+        record = self.records[kind].get(key)
+        if record is None:
+            self.save(kind, key, snapshot())
+        else:
+            apply_patch(kind, record, copy.deepcopy(patch))
+
+    def load(self, kind, key):
+        """Loading of a copy of the record."""
+        try:
+            return copy.deepcopy(self.records[kind][key])
+        except KeyError:
+            raise RecordNotFoundError(f"{kind} {key} not found") from None
+
+    def delete(self, kind, key):
+        """Deletion of the record."""
+        try:
+            del self.records[kind][key]
+        except KeyError:
+            raise RecordNotFoundError(f"{kind} {key} not found") from None
+
+    def version(self, kind, key):
+        """Returns the stored version of a record without copying it."""
+        return self.records[kind].get(key, {}).get('version', 0)
+
+    def exists(self, kind, key):
+        """Checks whether the record is in memory."""
+        return key in self.records[kind]
+
+    def scan(self, kind):
+        """Iterates over copies of all records of a kind."""
+        for key, data in list(self.records[kind].items()):
+            yield key, copy.deepcopy(data)
+
+
+class JsonBackend(StorageBackend):
+    """
+    Storage backend that writes one JSON file per record. Files are replaced
+    atomically, so a reader never sees a partially written record.
+
+    Attributes:
+        root (str): Directory where the files are written.
+    """
+
+    FILE_NAMES = {
+        HOTEL: ('', '_data.json'),
+        CUSTOMER: ('customer_', '.json'),
+        RESERVATION: ('reservation_', '.json'),
+    }
+    INDENT = {HOTEL: 2, CUSTOMER: 2, RESERVATION: None}
+
+    def __init__(self, root='.'):
+        """Initialization of the backend on a data directory."""
+        super().__init__()
+        self.root = root
+
+    def path(self, kind, key):
+        """Returns the path of the file of a record."""
+        prefix, suffix = self.FILE_NAMES[kind]
+        return os.path.join(self.root, f"{prefix}{key}{suffix}")
+
+    def save(self, kind, key, data):
+        """Saving of the record into its JSON file."""
+        write_json_atomic(self.path(kind, key), data, self.INDENT[kind])
+
+    def load(self, kind, key):
+        """Loading of the record from its JSON file."""
+        try:
+            with open(self.path(kind, key), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise RecordNotFoundError(f"{kind} {key} not found") from None
+
+    def delete(self, kind, key):
+        """Deletion of the JSON file of the record."""
+        try:
+            os.remove(self.path(kind, key))
+        except FileNotFoundError:
+            raise RecordNotFoundError(f"{kind} {key} not found") from None
+
+    def exists(self, kind, key):
+        """Checks whether the JSON file of the record exists."""
+        return os.path.exists(self.path(kind, key))
+
+    def keys(self, kind):
+        """Iterates over the keys of the JSON files of a kind."""
+        prefix, suffix = self.FILE_NAMES[kind]
+        pattern = os.path.join(glob.escape(self.root), f"{prefix}*{suffix}")
+        for path in sorted(glob.glob(pattern)):
+            yield os.path.basename(path)[len(prefix):-len(suffix)]
+
+    def scan(self, kind):
+        """Iterates over all JSON files of a kind in the data directory."""
+        for key in self.keys(kind):
+            try:
+                yield key, self.load(kind, key)
+            except RecordNotFoundError:
+                continue
+
+
+# In[3]:
+
+
+DATA_ROOT_VARIABLE = 'HOTEL_DATA_ROOT'
+
+_backend = JsonBackend(os.environ.get(DATA_ROOT_VARIABLE, '.'))
+
+
+def get_backend():
+    """Returns the storage backend used by the reservation system."""
+    return _backend
+
+
+def set_backend(backend):
+    """Replaces the storage backend and returns the previous one."""
+    global _backend  # pylint: disable=global-statement
+    previous, _backend = _backend, backend
+    return previous
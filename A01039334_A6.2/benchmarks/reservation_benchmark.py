@@ -0,0 +1,230 @@
+"""
+reservation_benchmark.py - Load test and micro-benchmarks of the reservation
+system.
+
+Fills each storage backend with a synthetic hotel and customers, then
+measures the latency and throughput of Customer.save_data,
+Customer.load_customer, Hotel.reserve_room and Hotel.cancel_reservation with
+several numbers of concurrent threads. Results are written as JSON; with
+--baseline, operations whose throughput dropped more than --tolerance against
+an earlier run are reported and the exit status is 1.
+
+Usage:
+    python benchmarks/reservation_benchmark.py --backends memory sqlite \\
+        --rooms 10000 --customers 1000000 --threads 1 4 16 --output results.json
+    python benchmarks/reservation_benchmark.py --customers 10000 --operations 2000 \\
+        --baseline results.json
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+# pylint: disable=wrong-import-position
+from customer import Customer
+from hotel import Hotel, Room
+from storage import CUSTOMER, set_backend
+from service_benchmark import make_backend, percentile
+
+
+# In[2]:
+
+
+BACKENDS = ('memory', 'json', 'journal', 'sharded', 'sqlite')
+OPERATIONS = ('save_data', 'load_customer', 'reserve_room', 'cancel_reservation')
+FIRST_DAY = datetime.date(2024, 1, 1)
+# Results of the operations that can be rejected: a booking whose room is
+# taken for its nights, or the cancellation of a reservation that was not made.
+REJECTED = {
+    'reserve_room': lambda reserved: not reserved,
+    'cancel_reservation': lambda canceled: not canceled,
+}
+
+
+def populate(backend, rooms, customers):
+    """Saves a hotel with the given number of rooms and the customers, in one
+    transaction where the backend supports it. Returns the hotel."""
+    hotel = Hotel("Benchmark Hotel", "Benchmark")
+    hotel.rooms.extend(Room(number) for number in range(rooms))
+    hotel.save_data()
+    with backend.transaction():
+        for customer_id in range(customers):
+            backend.save(CUSTOMER, customer_id, {
+                'name': f"Customer {customer_id}",
+                'email': f"customer{customer_id}@example.com",
+                'customer_id': customer_id,
+            })
+    return hotel
+
+
+def measure(operation, count, threads, rejected=None):
+    """Runs operation(i) for i in range(count) on a pool of threads and
+    returns its throughput and latency percentiles. With rejected, a function
+    of an operation's result, the succeeded and rejected operations are also
+    counted, since both are timed together."""
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+
+    def work(first):
+        timings = []
+        failed = 0
+        for i in range(first, count, threads):
+            started = time.perf_counter()
+            result = operation(i)
+            timings.append(time.perf_counter() - started)
+            if rejected is not None and rejected(result):
+                failed += 1
+        with lock:
+            latencies.extend(timings)
+            failures.append(failed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(work, range(threads)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        'count': count,
+        'elapsed_s': elapsed,
+        'ops_per_s': count / elapsed if elapsed else None,
+        'latency_ms': {name: percentile(latencies, fraction) * 1000
+                       for name, fraction in (('p50', 0.5), ('p90', 0.9),
+                                              ('p99', 0.99), ('max', 1.0))},
+    }
+    if rejected is not None:
+        result['succeeded'] = count - sum(failures)
+        result['rejected'] = sum(failures)
+    return result
+
+
+def stays(count, rooms, seed):
+    """Returns count random (room, start, end) stays of one to seven nights
+    within a year."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        start = FIRST_DAY + datetime.timedelta(days=rng.randrange(365))
+        end = start + datetime.timedelta(days=rng.randint(1, 7))
+        result.append((rng.randrange(rooms), start.isoformat(), end.isoformat()))
+    return result
+
+
+def run_backend(name, args):
+    """Benchmarks every operation on one backend and returns the results."""
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        backend = make_backend(name, data_dir)
+        previous = set_backend(backend)
+        try:
+            started = time.perf_counter()
+            hotel = populate(backend, args.rooms, args.customers)
+            populate_s = time.perf_counter() - started
+            for threads in args.threads:
+                rng = random.Random(threads)
+                customer_ids = [rng.randrange(args.customers) for _ in range(args.operations)]
+                booking = stays(args.operations, args.rooms, threads)
+                rez_ids = [f"t{threads}-{i}" for i in range(args.operations)]
+                operations = {
+                    'save_data': lambda i: Customer(
+                        f"Customer {customer_ids[i]}", f"updated{i}@example.com",
+                        customer_ids[i]).save_data(),
+                    'load_customer': lambda i: Customer(None, None, None).load_customer(
+                        customer_ids[i]),
+                    'reserve_room': lambda i: hotel.reserve_room(
+                        rez_ids[i], customer_ids[i], "Gold", *booking[i]),
+                    'cancel_reservation': lambda i: hotel.cancel_reservation(rez_ids[i]),
+                }
+                for operation in args.operations_to_run:
+                    result = measure(operations[operation], args.operations, threads,
+                                     REJECTED.get(operation))
+                    results.append({'backend': name, 'operation': operation,
+                                    'threads': threads, 'populate_s': populate_s, **result})
+                    print(f"{name:8} {operation:18} threads={threads:<3} "
+                          f"{result['ops_per_s']:12.1f} ops/s  "
+                          f"p99={result['latency_ms']['p99']:.3f} ms"
+                          + (f"  succeeded={result['succeeded']} rejected={result['rejected']}"
+                             if 'rejected' in result else ""), file=sys.stderr)
+        finally:
+            set_backend(previous)
+            if hasattr(backend, 'close'):
+                backend.close()
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Returns the results whose throughput is lower than (1 - tolerance)
+    times the one of the same backend, operation and threads in the
+    baseline."""
+    reference = {(row['backend'], row['operation'], row['threads']): row['ops_per_s']
+                 for row in baseline['results']}
+    slower = []
+    for row in results:
+        before = reference.get((row['backend'], row['operation'], row['threads']))
+        if before and row['ops_per_s'] < before * (1 - tolerance):
+            slower.append(dict(row, baseline_ops_per_s=before))
+    return slower
+
+
+def main():
+    """Parses the arguments, runs the benchmarks and writes the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--rooms', type=int, default=10000)
+    parser.add_argument('--customers', type=int, default=1000000)
+    parser.add_argument('--operations', type=int, default=10000,
+                        help="Operations measured per backend, operation and thread count")
+    parser.add_argument('--only', nargs='+', choices=OPERATIONS, default=list(OPERATIONS),
+                        dest='operations_to_run', help="Operations to measure")
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 4, 16])
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="Compare with the results of an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed throughput drop against the baseline (fraction)")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.backends:
+        results.extend(run_backend(name, args))
+    report = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'rooms': args.rooms, 'customers': args.customers,
+                       'operations': args.operations, 'threads': args.threads},
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            report['regressions'] = regressions(results, json.load(file), args.tolerance)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        print(text)
+    if report.get('regressions'):
+        for row in report['regressions']:
+            print(f"Regression: {row['backend']} {row['operation']} threads={row['threads']} "
+                  f"{row['ops_per_s']:.1f} ops/s (baseline {row['baseline_ops_per_s']:.1f})",
+                  file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+service_benchmark.py - Load generator for the asyncio ReservationService.
+
+Creates a hotel with synthetic rooms on the chosen storage backend, then runs
+a number of concurrent clients that reserve random stays (and cancel some of
+them) through the service. Reports requests per second and the latency
+percentiles as JSON.
+
+Usage:
+    python benchmarks/service_benchmark.py --backend sqlite --rooms 1000 \\
+        --clients 100 --requests 20000
+"""
+
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+# pylint: disable=wrong-import-position
+from hotel import Hotel, Room
+from service import ReservationService
+from storage import (JournalBackend, JsonBackend, MemoryBackend, ShardedJsonBackend,
+                     SqliteBackend)
+
+
+# In[2]:
+
+
+def make_backend(name, data_dir):
+    """Creates the storage backend to benchmark."""
+    if name == 'memory':
+        return MemoryBackend()
+    if name == 'json':
+        return JsonBackend(data_dir)
+    if name == 'journal':
+        return JournalBackend(data_dir)
+    if name == 'sharded':
+        return ShardedJsonBackend(data_dir)
+    return SqliteBackend(os.path.join(data_dir, 'reservations.db'))
+
+
+def percentile(sorted_values, fraction):
+    """Returns a percentile of a sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def client(service, worker, requests, rooms, latencies, stats):
+    """Runs one client: reserves random stays and cancels about a fifth of
+    them."""
+    rng = random.Random(worker)
+    first_day = datetime.date(2024, 1, 1)
+    booked = []
+    for attempt in range(requests):
+        started = time.perf_counter()
+        if booked and rng.random() < 0.2:
+            await service.cancel_reservation(booked.pop(rng.randrange(len(booked))))
+            stats['cancellations'] += 1
+        else:
+            start = first_day + datetime.timedelta(days=rng.randrange(365))
+            end = start + datetime.timedelta(days=rng.randint(1, 7))
+            rez_id = f"c{worker}-{attempt}"
+            reservation = await service.reserve_room(
+                "Benchmark Hotel", rez_id, worker, "Gold", rng.randrange(rooms),
+                start.isoformat(), end.isoformat())
+            if reservation is not None:
+                booked.append(rez_id)
+                stats['reservations'] += 1
+            else:
+                stats['rejected'] += 1
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(args, data_dir):
+    """Runs the benchmark and returns its results."""
+    backend = make_backend(args.backend, data_dir)
+    hotel = Hotel("Benchmark Hotel", "Benchmark")
+    hotel.rooms.extend(Room(number) for number in range(args.rooms))
+    service = await ReservationService.open(backend, max_pending=args.max_pending)
+    service.repository.activate()
+    await asyncio.to_thread(service.repository.add_hotel, hotel)
+    latencies = []
+    stats = {'reservations': 0, 'cancellations': 0, 'rejected': 0}
+    per_client = max(1, args.requests // args.clients)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(service, worker, per_client, args.rooms, latencies, stats)
+                           for worker in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    if hasattr(backend, 'close'):
+        backend.close()
+    latencies.sort()
+    return {
+        'backend': args.backend,
+        'rooms': args.rooms,
+        'clients': args.clients,
+        'requests': len(latencies),
+        'elapsed_s': elapsed,
+        'requests_per_s': len(latencies) / elapsed,
+        'latency_ms': {name: percentile(latencies, fraction) * 1000
+                       for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))},
+        'group_commits': service.commits,
+        **stats,
+    }
+
+
+def main():
+    """Parses the arguments, runs the benchmark and prints the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('--backend', choices=('memory', 'json', 'journal', 'sharded', 'sqlite'),
+                        default='memory')
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--max-pending', type=int, default=1000)
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as data_dir:
+        results = asyncio.run(run(args, data_dir))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
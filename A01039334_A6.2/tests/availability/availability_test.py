@@ -0,0 +1,62 @@
+"""
+Unit tests for the IntervalIndex class.
+
+This module contains tests that verify the date-range index used to decide
+whether a room is free for a stay.
+"""
+
+import unittest
+import datetime
+from availability import IntervalIndex
+
+
+class TestIntervalIndex(unittest.TestCase):
+    """Tests for functionality of the IntervalIndex class."""
+    def setUp(self):
+        """Setup method to create an index with two reservations."""
+        self.index = IntervalIndex()
+        self.index.add("2024-03-01", "2024-03-05", "r1")
+        self.index.add("2024-03-10", "2024-03-12", "r2")
+
+    def test_is_free(self):
+        """Test overlap checks against the reservations."""
+        self.assertTrue(self.index.is_free("2024-03-05", "2024-03-10"))
+        self.assertTrue(self.index.is_free("2024-02-20", "2024-03-01"))
+        self.assertTrue(self.index.is_free("2024-03-12", "2024-03-20"))
+        self.assertFalse(self.index.is_free("2024-03-04", "2024-03-06"))
+        self.assertFalse(self.index.is_free("2024-03-09", "2024-03-11"))
+        self.assertFalse(self.index.is_free("2024-02-01", "2024-04-01"))
+        self.assertFalse(self.index.is_free(datetime.date(2024, 3, 2), datetime.date(2024, 3, 3)))
+
+    def test_add_overlapping(self):
+        """Test an overlapping or repeated reservation is not added."""
+        self.assertFalse(self.index.add("2024-03-03", "2024-03-11", "r3"))
+        self.assertFalse(self.index.add("2024-04-01", "2024-04-02", "r1"))
+        self.assertEqual(len(self.index), 2)
+
+    def test_invalid_range(self):
+        """Test an empty or reversed range is rejected."""
+        with self.assertRaises(ValueError):
+            self.index.is_free("2024-03-05", "2024-03-05")
+        with self.assertRaises(ValueError):
+            self.index.add("2024-03-07", "2024-03-06", "r3")
+
+    def test_remove(self):
+        """Test removing a reservation frees its dates."""
+        self.assertTrue(self.index.remove("r1"))
+        self.assertFalse(self.index.remove("r1"))
+        self.assertNotIn("r1", self.index)
+        self.assertTrue(self.index.is_free("2024-03-01", "2024-03-10"))
+        self.assertEqual(self.index.get("r2"),
+                         (datetime.date(2024, 3, 10), datetime.date(2024, 3, 12)))
+
+    def test_list_round_trip(self):
+        """Test converting the index to lists and back keeps the order."""
+        self.index.add("2024-02-01", "2024-02-03", "r0")
+        bookings = self.index.to_list()
+        self.assertEqual([rez_id for _, _, rez_id in bookings], ["r0", "r1", "r2"])
+        self.assertEqual(IntervalIndex.from_list(bookings).to_list(), bookings)
+
+
+if __name__ == '__main__':
+    unittest.main()
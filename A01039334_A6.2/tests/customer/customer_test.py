@@ -10,6 +10,7 @@ import os
 import io
 from unittest.mock import patch
 from customer import Customer
+from storage import VersionConflictError
 
 
 class TestCustomer(unittest.TestCase):
@@ -74,6 +75,18 @@ class TestCustomer(unittest.TestCase):
         # Cleanup: Delete the customer file to clean up test environment
         os.remove(f"customer_{customer_id}.json")
 
+    def test_concurrent_modification(self):
+        """Test saving a customer loaded before another change is rejected."""
+        customer_id = "cust1004"
+        Customer.create_customer(self, "Ana Ruiz", "aruiz@example.com", customer_id)
+        first = Customer.load_customer(self, customer_id)
+        second = Customer.load_customer(self, customer_id)
+        first.modify_customer_information(email="ana@example.com")
+        with self.assertRaises(VersionConflictError):
+            second.modify_customer_information(name="Ana R.")
+        self.assertEqual(Customer.load_customer(self, customer_id).email, "ana@example.com")
+        os.remove(f"customer_{customer_id}.json")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,157 @@
+"""
+Stress tests for concurrent reservations in the Hotel class.
+
+This module contains tests that reserve and cancel rooms from many threads at
+once and verify that no room is ever double-booked and that the stored hotel
+file is always complete.
+"""
+
+import unittest
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from hotel import Hotel, Room
+from storage import HOTEL, RESERVATION, JsonBackend, MemoryBackend, SqliteBackend, set_backend
+
+
+class TestConcurrentReservations(unittest.TestCase):
+    """Stress tests for reservations made from many threads."""
+    THREADS = 16
+    ATTEMPTS = 150
+
+    def setUp(self):
+        """Setup method to create a hotel with a few rooms, so that threads
+        compete for the same rooms and dates. Threads are switched as often
+        as possible to provoke races."""
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.backend = JsonBackend(self.tmp_dir.name)
+        self.previous = set_backend(self.backend)
+        self.hotel = Hotel("Stress Hotel", "Test Location")
+        self.hotel.rooms.extend(Room(number) for number in range(101, 106))
+        self.hotel.save_data()
+
+    def tearDown(self):
+        """Restoring of the previous backend and removal of the files."""
+        sys.setswitchinterval(self.switch_interval)
+        set_backend(self.previous)
+        self.tmp_dir.cleanup()
+
+    def book(self, worker):
+        """Attempts random reservations; returns the ones that succeeded."""
+        rng = random.Random(worker)
+        booked = []
+        for attempt in range(self.ATTEMPTS):
+            day = rng.randint(1, 20)
+            stay = (f"2024-03-{day:02d}", f"2024-03-{day + rng.randint(1, 5):02d}")
+            rez_id = f"w{worker}-{attempt}"
+            room_num = rng.randint(101, 105)
+            if self.hotel.reserve_room(rez_id, worker, "Gold", room_num, *stay):
+                booked.append((room_num, stay, rez_id))
+                if rng.random() < 0.2:
+                    self.assertTrue(self.hotel.cancel_reservation(rez_id))
+                    booked.pop()
+        return booked
+
+    def assert_no_overlaps(self, bookings):
+        """Checks that no two bookings of a room overlap."""
+        by_room = {}
+        for room_num, stay, _ in bookings:
+            by_room.setdefault(room_num, []).append(stay)
+        for stays in by_room.values():
+            stays.sort()
+            for (_, end), (start, _) in zip(stays, stays[1:]):
+                self.assertLessEqual(end, start, "Room was double-booked")
+
+    def test_no_double_booking(self):
+        """Test concurrent reservations never overlap, in memory or on disk."""
+        with ThreadPoolExecutor(self.THREADS) as pool:
+            bookings = [b for result in pool.map(self.book, range(self.THREADS)) for b in result]
+        self.assertTrue(bookings)
+        self.assert_no_overlaps(bookings)
+        stored = Hotel("Stress Hotel", "")
+        stored.load_from_file()
+        stored_bookings = [(room.room_num, (start, end), rez_id)
+                           for room in stored.rooms
+                           for start, end, rez_id in room.bookings.to_list()]
+        self.assertEqual(sorted(stored_bookings), sorted(bookings))
+        self.assertEqual(sorted(key for key, _ in self.backend.scan(RESERVATION)),
+                         sorted(rez_id for _, _, rez_id in bookings))
+
+    def test_single_winner(self):
+        """Test only one of many threads reserving the same stay succeeds."""
+        barrier = threading.Barrier(self.THREADS)
+
+        def attempt(worker):
+            barrier.wait()
+            return self.hotel.reserve_room(f"r{worker}", worker, "Gold", 101,
+                                           "2024-04-01", "2024-04-03")
+
+        backend = MemoryBackend()
+        backend.save(HOTEL, self.hotel.hotel_key, self.hotel.to_dict())
+        set_backend(backend)
+        with ThreadPoolExecutor(self.THREADS) as pool:
+            results = list(pool.map(attempt, range(self.THREADS)))
+        self.assertEqual(results.count(True), 1)
+
+    def test_concurrent_cancels(self):
+        """Test only one of many threads canceling the same reservation
+        succeeds, and that they do not deadlock on the SQLite backend's lock
+        and the room's lock."""
+        backend = SqliteBackend(os.path.join(self.tmp_dir.name, 'stress.db'))
+        backend.save(HOTEL, self.hotel.hotel_key, self.hotel.to_dict())
+        set_backend(backend)
+        try:
+            for rez_id in range(200):
+                self.assertTrue(self.hotel.reserve_room(
+                    rez_id, 1, "Gold", 101, "2024-04-01", "2024-04-03"))
+                barrier = threading.Barrier(8)
+                results = []
+
+                def cancel(rez_id=rez_id, barrier=barrier, results=results):
+                    barrier.wait()
+                    results.append(self.hotel.cancel_reservation(rez_id))
+
+                threads = [threading.Thread(target=cancel, daemon=True) for _ in range(8)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join(10)
+                self.assertFalse(any(thread.is_alive() for thread in threads), "Deadlock")
+                self.assertEqual(results.count(True), 1)
+                self.assertFalse(backend.exists(RESERVATION, rez_id))
+        finally:
+            backend.close()
+
+    def test_readers_see_complete_files(self):
+        """Test the hotel file is always complete while it is being rewritten."""
+        done = threading.Event()
+        errors = []
+        path = self.backend.path("hotel", "Stress Hotel")
+
+        def read():
+            while not done.is_set():
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        json.load(f)
+                except json.JSONDecodeError as error:
+                    errors.append(error)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            with ThreadPoolExecutor(4) as pool:
+                list(pool.map(self.book, range(4)))
+        finally:
+            done.set()
+            reader.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,9 @@ ensuring that all methods behave as expected under various conditions.
 
 import unittest
 import os
-from hotel import Hotel, Room
-from reservation.Reservation import reserve
+from hotel import BulkReservationError, Hotel, Room
+from reservation.reservation import reserve
+from storage import RESERVATION, MemoryBackend, VersionConflictError, get_backend, set_backend
 
 
 class TestHotel(unittest.TestCase):
@@ -111,5 +112,148 @@ class TestHotel(unittest.TestCase):
         self.assertTrue(room.room_av, "The room should be available after canceling the reservation.")
 
 
+    def test_get_room(self):
+        """Test rooms are found by their number."""
+        self.hotel.rooms.extend([Room(153), Room(154)])
+        self.assertIs(self.hotel.get_room(152), self.room)
+        self.assertEqual(self.hotel.get_room(154).room_num, 154)
+        self.assertIsNone(self.hotel.get_room(999))
+
+    def test_available_rooms(self):
+        """Test the free-room index follows reservations and cancellations."""
+        self.hotel.rooms.extend(Room(number) for number in range(153, 160))
+        self.assertEqual(self.hotel.available_count(), 8)
+        self.assertEqual(len(self.hotel.available_rooms(3)), 3)
+        self.room.res_room()
+        self.hotel.get_room(153).room_av = False
+        self.assertEqual(self.hotel.available_count(), 6)
+        self.assertNotIn(self.room, self.hotel.available_rooms())
+        self.room.cancel_room()
+        self.assertIn(self.room, self.hotel.available_rooms())
+
+    def test_remove_room(self):
+        """Test removing a room removes it from the indexes."""
+        self.hotel.rooms.remove(self.room)
+        self.assertIsNone(self.hotel.get_room(152))
+        self.assertEqual(self.hotel.available_count(), 0)
+        # The removed room no longer updates the hotel
+        self.room.cancel_room()
+        self.assertEqual(self.hotel.available_rooms(), [])
+
+    def test_replace_rooms(self):
+        """Test assigning a new room list rebuilds the indexes."""
+        self.hotel.rooms = [Room(201, False), Room(202)]
+        self.assertIsNone(self.hotel.get_room(152))
+        self.assertEqual([room.room_num for room in self.hotel.available_rooms()], [202])
+
+
+    def test_reserve_overlapping_dates(self):
+        """Test a room can be reserved again only for stays that do not overlap."""
+        self.assertTrue(self.hotel.reserve_room("r1", "c1", "Gold", 152,
+                                                "2023-01-01", "2023-01-05"))
+        self.assertFalse(self.hotel.reserve_room("r2", "c2", "Gold", 152,
+                                                 "2023-01-04", "2023-01-08"))
+        self.assertTrue(self.hotel.reserve_room("r3", "c3", "Gold", 152,
+                                                "2023-01-05", "2023-01-08"))
+        self.assertFalse(self.hotel.is_room_free(152, "2022-12-30", "2023-01-02"))
+        self.assertTrue(self.hotel.is_room_free(152, "2022-12-30", "2023-01-01"))
+        self.hotel.cancel_reservation("r1")
+        self.assertFalse(self.room.room_av, "The room still has the r3 booking")
+        self.assertTrue(self.hotel.is_room_free(152, "2023-01-02", "2023-01-05"))
+        self.hotel.cancel_reservation("r3")
+        self.assertTrue(self.room.room_av)
+
+    def test_reserve_duplicated_rez_id(self):
+        """Test a reservation ID booked in one room cannot be booked in
+        another, so canceling it frees the first room."""
+        self.hotel.rooms.append(Room(153))
+        stay = ("2023-01-01", "2023-01-05")
+        self.assertTrue(self.hotel.reserve_room("r1", "c1", "Gold", 152, *stay))
+        self.assertFalse(self.hotel.reserve_room("r1", "c2", "Gold", 153, *stay))
+        self.assertTrue(self.hotel.get_room(153).room_av)
+        self.assertIs(self.hotel.find_reservation_room("r1"), self.room)
+        self.assertTrue(self.hotel.cancel_reservation("r1"))
+        self.assertTrue(self.room.room_av)
+
+    def test_free_rooms_between(self):
+        """Test searching the rooms that are free in a date range."""
+        self.hotel.rooms.extend([Room(153), Room(154, room_available=False)])
+        self.hotel.reserve_room("r1", "c1", "Gold", 152, "2023-01-01", "2023-01-05")
+        free = [room.room_num for room in self.hotel.free_rooms_between("2023-01-03", "2023-01-04")]
+        self.assertEqual(free, [153])
+        free = [room.room_num for room in self.hotel.free_rooms_between("2023-01-05", "2023-01-06")]
+        self.assertEqual(free, [152, 153])
+
+    def test_bookings_round_trip(self):
+        """Test the bookings of a room are kept when saved as a dictionary."""
+        self.room.res_room("r1", "2023-01-01", "2023-01-05")
+        room = Room.from_dict(self.room.to_dict())
+        self.assertFalse(room.room_av)
+        self.assertFalse(room.is_free("2023-01-02", "2023-01-03"))
+        self.assertTrue(room.is_free("2023-01-05", "2023-01-06"))
+
+    def test_reserve_rooms_bulk(self):
+        """Test several rooms are reserved at once and found by reservation ID."""
+        self.hotel.rooms.append(Room(153))
+        reservations = self.hotel.reserve_rooms_bulk([
+            {"rez_id": "r1", "customer_id": "c1", "customer_sts": "Gold",
+             "room_num": 152, "start_date": "2023-01-01", "end_date": "2023-01-05"},
+            {"rez_id": "r2", "customer_id": "c2", "customer_sts": "Gold",
+             "room_num": 152, "start_date": "2023-01-05", "end_date": "2023-01-08"},
+            {"rez_id": "r3", "customer_id": "c1", "customer_sts": "Gold",
+             "room_num": 153, "start_date": "2023-01-01", "end_date": "2023-01-05"},
+        ])
+        self.assertEqual([rez.rez_id for rez in reservations], ["r1", "r2", "r3"])
+        self.assertIs(self.hotel.find_reservation_room("r3"), self.hotel.get_room(153))
+        self.assertTrue(self.hotel.cancel_reservations_bulk(["r1", "r3"]))
+        self.assertIsNone(self.hotel.find_reservation_room("r1"))
+        self.assertTrue(self.hotel.get_room(153).room_av)
+        self.assertFalse(self.room.room_av)
+        self.hotel.cancel_reservation("r2")
+
+    def test_bulk_is_all_or_nothing(self):
+        """Test a bulk request with a rejected entry books and cancels nothing."""
+        self.hotel.reserve_room("r1", "c1", "Gold", 152, "2023-01-01", "2023-01-05")
+        with self.assertRaises(BulkReservationError) as context:
+            self.hotel.reserve_rooms_bulk([
+                {"rez_id": "r2", "customer_id": "c2", "customer_sts": "Gold",
+                 "room_num": 152, "start_date": "2023-01-05", "end_date": "2023-01-08"},
+                {"rez_id": "r3", "customer_id": "c3", "customer_sts": "Gold",
+                 "room_num": 152, "start_date": "2023-01-04", "end_date": "2023-01-06"},
+            ])
+        self.assertIn("r3", [rez_id for rez_id, _ in context.exception.errors])
+        self.assertIsNone(self.hotel.find_reservation_room("r2"))
+        self.assertTrue(self.hotel.is_room_free(152, "2023-01-05", "2023-01-08"))
+        with self.assertRaises(BulkReservationError):
+            self.hotel.cancel_reservations_bulk(["r1", "missing"])
+        self.assertIs(self.hotel.find_reservation_room("r1"), self.room)
+        self.hotel.cancel_reservation("r1")
+
+    def test_stale_hotel_cannot_book(self):
+        """Test a booking through a hotel loaded before another booking raises
+        VersionConflictError instead of overwriting it."""
+        previous = set_backend(MemoryBackend())
+        try:
+            self.hotel.rooms.append(Room(153))
+            self.hotel.save_data()
+            first, second = Hotel("Test Hotel", ""), Hotel("Test Hotel", "")
+            first.load_from_file()
+            second.load_from_file()
+            self.assertTrue(first.reserve_room("r1", 1, "Gold", 152, "2024-01-01", "2024-01-02"))
+            with self.assertRaises(VersionConflictError):
+                second.reserve_room("r2", 2, "Gold", 153, "2024-01-01", "2024-01-02")
+            with self.assertRaises(VersionConflictError):
+                second.save_data()
+            self.assertIsNone(second.find_reservation_room("r2"))
+            self.assertFalse(get_backend().exists(RESERVATION, "r2"))
+            stored = Hotel("Test Hotel", "")
+            stored.load_from_file()
+            self.assertEqual(stored.find_reservation_room("r1").room_num, 152)
+            self.assertIsNone(stored.find_reservation_room("r2"))
+            self.assertEqual(stored.version, first.version)
+        finally:
+            set_backend(previous)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Unit tests for the ReportingEngine class.
+
+This module contains tests that verify the occupancy, history and
+cancellation rollups are kept up to date by the repository and can be
+rebuilt from storage.
+"""
+
+import unittest
+from hotel import Hotel, Room
+from reporting import ReportingEngine
+from repository import Repository
+from storage import MemoryBackend, set_backend
+
+
+class TestReportingEngine(unittest.TestCase):
+    """Tests for functionality of the ReportingEngine class."""
+    def setUp(self):
+        """Setup method to create a repository with a four-room hotel and
+        reports."""
+        self.previous = set_backend(MemoryBackend())
+        self.reports = ReportingEngine()
+        self.repository = Repository(reports=self.reports)
+        hotel = Hotel("Palm Beach Resorts", "Miami")
+        hotel.rooms.extend([Room(101), Room(102), Room(103), Room(104)])
+        self.repository.add_hotel(hotel)
+        self.repository.reserve_room(
+            "Palm Beach Resorts", 1, 501, "Gold", 101, "2024-03-01", "2024-03-03")
+        self.repository.reserve_room(
+            "Palm Beach Resorts", 2, 502, "Gold", 102, "2024-03-02", "2024-03-04")
+
+    def tearDown(self):
+        """Restoring of the previous storage backend."""
+        set_backend(self.previous)
+
+    def test_occupancy(self):
+        """Test booked rooms and rates are computed per night."""
+        nights = self.reports.occupancy("Palm Beach Resorts", "2024-03-01", "2024-03-05")
+        self.assertEqual([night['booked'] for night in nights], [1, 2, 1, 0])
+        self.assertEqual(self.reports.occupancy_rate("Palm Beach Resorts", "2024-03-02"), 0.5)
+        self.assertEqual(self.reports.room_nights("Palm Beach Resorts"), 4)
+
+    def test_cancellations_and_no_shows(self):
+        """Test cancellations free the nights and are counted, and no-shows
+        are counted."""
+        self.repository.cancel_reservation(1)
+        self.assertTrue(self.repository.record_no_show(2))
+        self.assertEqual(self.reports.occupancy_rate("Palm Beach Resorts", "2024-03-01"), 0)
+        self.assertEqual(self.reports.cancellations(customer_id=501), 1)
+        self.assertEqual(self.reports.no_shows("Palm Beach Resorts"), 1)
+        self.assertEqual([entry['status'] for entry in self.reports.customer_history(501)],
+                         ['canceled'])
+
+    def test_rebuild(self):
+        """Test the rollups rebuilt from storage match the incremental ones."""
+        self.repository.cancel_reservation(2)
+        summary = self.reports.summary()
+        rebuilt = self.reports.rebuild()
+        self.assertEqual(rebuilt.summary(), summary)
+        fresh = ReportingEngine().rebuild()
+        self.assertEqual(fresh.occupancy("Palm Beach Resorts", "2024-03-01", "2024-03-03"),
+                         self.reports.occupancy("Palm Beach Resorts", "2024-03-01", "2024-03-03"))
+        self.assertEqual(fresh.cancellations(), 0, "Canceled reservations are not stored")
+
+    def test_rebuild_keeps_no_shows(self):
+        """Test a rebuild keeps the no-show status, so the no-show is not
+        counted again."""
+        self.assertTrue(self.repository.record_no_show(2))
+        self.reports.rebuild()
+        self.assertEqual([entry['status'] for entry in self.reports.customer_history(502)],
+                         ['no_show'])
+        self.assertTrue(self.repository.record_no_show(2))
+        self.assertEqual(self.reports.no_shows("Palm Beach Resorts"), 1)
+        self.assertEqual(self.reports.room_nights("Palm Beach Resorts"), 4)
+
+    def test_cancel_no_show(self):
+        """Test canceling a no-show frees its nights, so the rollups match a
+        rebuild, and a reverted cancellation restores the no-show."""
+        self.assertTrue(self.repository.record_no_show(2))
+        reservation = self.repository.get_reservation(2)
+        self.assertTrue(self.repository.cancel_reservation(2))
+        self.assertEqual(self.reports.room_nights("Palm Beach Resorts"), 2)
+        self.assertEqual(self.reports.cancellations(customer_id=502), 1)
+        self.assertEqual(self.reports.no_shows(customer_id=502), 1)
+        self.assertEqual([entry['status'] for entry in self.reports.customer_history(502)],
+                         ['canceled'])
+        summary = self.reports.summary()
+        self.assertEqual(self.reports.rebuild().summary(), summary)
+        self.repository.revert_cancellation(reservation)
+        self.assertEqual([entry['status'] for entry in self.reports.customer_history(502)],
+                         ['no_show'])
+        self.assertEqual(self.reports.room_nights("Palm Beach Resorts"), 4)
+
+    def test_revert(self):
+        """Test reverted events leave the rollups unchanged."""
+        summary = self.reports.summary()
+        reservation = self.repository.get_reservation(1)
+        self.repository.cancel_reservation(1)
+        self.repository.revert_cancellation(reservation)
+        self.assertEqual(self.reports.summary(), summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
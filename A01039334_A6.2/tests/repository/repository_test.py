@@ -0,0 +1,131 @@
+"""
+Unit tests for the Repository class.
+
+This module contains tests that verify the in-memory indexes of the Repository
+class and that its changes are persisted through the storage backend.
+"""
+
+import unittest
+from customer import Customer
+from hotel import BulkReservationError, Hotel, Room
+from repository import Repository
+from storage import (CUSTOMER, HOTEL, RESERVATION, MemoryBackend, get_backend,
+                     set_backend)
+
+
+class TestRepository(unittest.TestCase):
+    """Tests for functionality of the Repository class."""
+    def setUp(self):
+        """Setup method to create a repository with a hotel and a customer."""
+        self.backend = MemoryBackend()
+        self.previous = set_backend(self.backend)
+        self.repository = Repository()
+        hotel = Hotel("Palm Beach Resorts", "Miami")
+        hotel.rooms.extend([Room(101), Room(102)])
+        self.repository.add_hotel(hotel)
+        self.repository.add_customer(Customer("Jay Lewis", "jaylewis@example.com", 501))
+
+    def tearDown(self):
+        """Restoring of the previous storage backend."""
+        set_backend(self.previous)
+
+    def test_lookups(self):
+        """Test hotels, rooms and customers are found by their keys."""
+        self.assertEqual(self.repository.get_hotel("Palm Beach Resorts").location, "Miami")
+        self.assertEqual(self.repository.get_room("Palm Beach Resorts", 102).room_num, 102)
+        self.assertIsNone(self.repository.get_room("Palm Beach Resorts", 103))
+        self.assertEqual(self.repository.get_customer(501).name, "Jay Lewis")
+        self.assertTrue(self.backend.exists(CUSTOMER, 501))
+
+    def test_reserve_room(self):
+        """Test a reservation is indexed by ID, customer and hotel, and persisted."""
+        reservation = self.repository.reserve_room(
+            "Palm Beach Resorts", 496, 501, "Gold", 101, "2024-03-01", "2024-03-09")
+        self.assertIsNotNone(reservation)
+        self.assertIs(self.repository.get_reservation(496), reservation)
+        self.assertEqual(self.repository.reservations_for_customer(501), [reservation])
+        self.assertEqual(self.repository.reservations_for_hotel("Palm Beach Resorts"),
+                         [reservation])
+        self.assertFalse(self.repository.get_room("Palm Beach Resorts", 101).room_av)
+        self.assertTrue(self.backend.exists(RESERVATION, 496))
+        # The room is already reserved
+        self.assertIsNone(self.repository.reserve_room(
+            "Palm Beach Resorts", 497, 501, "Gold", 101, "2024-03-01", "2024-03-09"))
+
+    def test_cancel_reservation(self):
+        """Test canceling a reservation frees the room and removes it from the indexes."""
+        self.repository.reserve_room(
+            "Palm Beach Resorts", 496, 501, "Gold", 101, "2024-03-01", "2024-03-09")
+        self.assertTrue(self.repository.cancel_reservation(496))
+        self.assertIsNone(self.repository.get_reservation(496))
+        self.assertEqual(self.repository.reservations_for_customer(501), [])
+        self.assertTrue(self.repository.get_room("Palm Beach Resorts", 101).room_av)
+        self.assertFalse(self.backend.exists(RESERVATION, 496))
+        self.assertFalse(self.repository.cancel_reservation(496))
+
+    def test_load(self):
+        """Test a new repository rebuilds the indexes from the backend."""
+        self.repository.reserve_room(
+            "Palm Beach Resorts", 496, 501, "Gold", 102, "2024-03-01", "2024-03-09")
+        loaded = Repository().load()
+        self.assertEqual(sorted(loaded.hotels), ["Palm Beach Resorts"])
+        self.assertFalse(loaded.get_room("Palm Beach Resorts", 102).room_av)
+        self.assertEqual(loaded.get_customer(501).email, "jaylewis@example.com")
+        self.assertEqual([r.rez_id for r in loaded.reservations_for_customer(501)], [496])
+
+    def test_remove_hotel(self):
+        """Test removing a hotel deletes it and its rooms."""
+        self.repository.remove_hotel("Palm Beach Resorts")
+        self.assertIsNone(self.repository.get_hotel("Palm Beach Resorts"))
+        self.assertIsNone(self.repository.get_room("Palm Beach Resorts", 101))
+        self.assertFalse(self.backend.exists(HOTEL, "Palm Beach Resorts"))
+
+    def test_bulk_reservations(self):
+        """Test bulk reservations are indexed and persisted, and bulk
+        cancellations remove them."""
+        requests = [{"rez_id": rez_id, "customer_id": 501, "customer_sts": "Gold",
+                     "room_num": room_num, "start_date": "2024-03-01",
+                     "end_date": "2024-03-09"} for rez_id, room_num in ((496, 101), (497, 102))]
+        self.repository.reserve_rooms_bulk("Palm Beach Resorts", requests)
+        self.assertEqual(len(self.repository.reservations_for_customer(501)), 2)
+        self.assertTrue(self.backend.exists(RESERVATION, 497))
+        with self.assertRaises(BulkReservationError):
+            self.repository.reserve_rooms_bulk("Palm Beach Resorts", requests[:1])
+        with self.assertRaises(BulkReservationError):
+            self.repository.cancel_reservations_bulk("Palm Beach Resorts", [496, 498])
+        self.assertTrue(self.repository.cancel_reservations_bulk("Palm Beach Resorts",
+                                                                 [496, 497]))
+        self.assertEqual(self.repository.reservations_for_customer(501), [])
+        self.assertFalse(self.backend.exists(RESERVATION, 496))
+        self.assertTrue(self.repository.get_room("Palm Beach Resorts", 102).room_av)
+
+    def test_bulk_cancel_is_limited_to_one_hotel(self):
+        """Test a bulk cancellation including another hotel's reservation
+        cancels nothing."""
+        other = Hotel("Ocean View", "Cancun")
+        other.rooms.append(Room(201))
+        self.repository.add_hotel(other)
+        self.repository.reserve_room("Palm Beach Resorts", 496, 501, "Gold", 101,
+                                     "2024-03-01", "2024-03-09")
+        self.repository.reserve_room("Ocean View", 497, 501, "Gold", 201,
+                                     "2024-03-01", "2024-03-09")
+        with self.assertRaises(BulkReservationError) as context:
+            self.repository.cancel_reservations_bulk("Palm Beach Resorts", [496, 497])
+        self.assertEqual(context.exception.errors, [(497, "Reservation of another hotel")])
+        self.assertEqual(len(self.repository.reservations_for_customer(501)), 2)
+        self.assertFalse(self.repository.get_room("Palm Beach Resorts", 101).room_av)
+        self.assertTrue(self.backend.exists(RESERVATION, 496))
+
+    def test_activate(self):
+        """Test a repository over another backend leaves the active backend
+        unchanged until it is activated."""
+        other = MemoryBackend()
+        repository = Repository(other)
+        self.assertIs(repository.backend, other)
+        self.assertIs(get_backend(), self.backend)
+        self.assertIs(repository.activate(), self.backend)
+        self.assertIs(get_backend(), other)
+
+
+if __name__ == '__main__':
+    unittest.main()
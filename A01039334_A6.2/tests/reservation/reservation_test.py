@@ -6,8 +6,9 @@ ensuring that all methods behave as expected under various conditions.
 """
 
 import unittest
+import datetime
 import os
-from reservation import Reservation, reserve
+from reservation import Reservation, ReservationTable, reserve
 
 
 class TestReservation(unittest.TestCase):
@@ -60,6 +61,33 @@ class TestReservation(unittest.TestCase):
         expected_filename = f"reservation_{self.reservation.rez_id}.json"
         self.assertTrue(os.path.exists(expected_filename))
 
+    def test_record_layout(self):
+        """Test reservations have no per-instance dictionary and serialise
+        exactly their fields."""
+        self.assertFalse(hasattr(self.reservation, '__dict__'))
+        self.assertEqual(self.reservation.to_dict(), self.reservation_data)
+        stored = dict(self.reservation_data, version=3)
+        self.assertEqual(Reservation.from_dict(stored).to_dict(), self.reservation_data)
+
+
+class TestReservationTable(unittest.TestCase):
+    """Tests for the columnar ReservationTable."""
+    def test_round_trip(self):
+        """Test reservations read back from the table equal the ones added."""
+        records = [
+            {'rez_id': 1, 'customer_id': 501, 'customer_sts': 'Gold', 'hotel_id': 'A',
+             'room_num': 101, 'start_date': '2024-03-01', 'end_date': '2024-03-09'},
+            {'rez_id': 2, 'customer_id': 502, 'customer_sts': 'Gold', 'hotel_id': 'A',
+             'room_num': 102, 'start_date': None, 'end_date': None},
+        ]
+        table = ReservationTable.from_records([records[0], Reservation(**records[1])])
+        self.assertEqual(len(table), 2)
+        self.assertEqual([rez.to_dict() for rez in table], records)
+        self.assertEqual(table.column('hotel_id'), ['A', 'A'])
+        self.assertEqual(table.columns['hotel_id'].values, ['A'])
+        self.assertEqual(table.columns['start_date'].days[0],
+                         datetime.date(2024, 3, 1).toordinal())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+"""
+Unit tests for the ReservationService class.
+
+This module contains tests that verify the asyncio API of the reservation
+system, including the grouping of concurrent writes and backpressure.
+"""
+
+import asyncio
+import unittest
+from customer import Customer
+from hotel import Hotel, Room
+from service import ReservationService
+from storage import CUSTOMER, RESERVATION, MemoryBackend, RecordNotFoundError, set_backend
+
+
+class TestReservationService(unittest.IsolatedAsyncioTestCase):
+    """Tests for functionality of the ReservationService class."""
+    async def asyncSetUp(self):
+        """Setup method to store a hotel with 100 rooms and open a service."""
+        self.backend = MemoryBackend()
+        self.previous = set_backend(self.backend)
+        hotel = Hotel("Palm Beach Resorts", "Miami")
+        hotel.rooms.extend(Room(number) for number in range(100))
+        hotel.save_data()
+        self.service = await ReservationService.open()
+
+    async def asyncTearDown(self):
+        """Restoring of the previous storage backend."""
+        set_backend(self.previous)
+
+    async def test_reserve_and_cancel(self):
+        """Test a reservation is saved and can be canceled."""
+        reservation = await self.service.reserve_room(
+            "Palm Beach Resorts", 496, 501, "Gold", 7, "2024-03-01", "2024-03-09")
+        self.assertEqual(reservation.room_num, 7)
+        self.assertTrue(self.backend.exists(RESERVATION, 496))
+        self.assertNotIn(7, await self.service.free_rooms("Palm Beach Resorts",
+                                                          "2024-03-02", "2024-03-03"))
+        self.assertTrue(await self.service.cancel_reservation(496))
+        self.assertFalse(self.backend.exists(RESERVATION, 496))
+        self.assertFalse(await self.service.cancel_reservation(496))
+        self.assertIsNone(await self.service.reserve_room(
+            "Unknown Hotel", 497, 501, "Gold", 7, "2024-03-01", "2024-03-09"))
+
+    async def test_concurrent_writes_are_grouped(self):
+        """Test concurrent reservations of a hotel share group commits."""
+        results = await asyncio.gather(*(
+            self.service.reserve_room("Palm Beach Resorts", f"r{n}", n, "Gold", n,
+                                      "2024-03-01", "2024-03-09") for n in range(100)))
+        self.assertTrue(all(results))
+        self.assertLess(self.service.commits, 100)
+        self.assertEqual(len(self.backend.records[RESERVATION]), 100)
+
+    async def test_single_winner(self):
+        """Test only one of several concurrent requests for a stay succeeds."""
+        results = await asyncio.gather(*(
+            self.service.reserve_room("Palm Beach Resorts", f"r{n}", n, "Gold", 1,
+                                      "2024-03-01", "2024-03-09") for n in range(10)))
+        self.assertEqual(sum(result is not None for result in results), 1)
+
+    async def test_failed_request(self):
+        """Test an invalid request fails without affecting the rest of its batch."""
+        results = await asyncio.gather(
+            self.service.reserve_room("Palm Beach Resorts", "r1", 1, "Gold", 1,
+                                      "2024-03-09", "2024-03-01"),
+            self.service.reserve_room("Palm Beach Resorts", "r2", 1, "Gold", 2,
+                                      "2024-03-01", "2024-03-09"),
+            return_exceptions=True)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(results[1].rez_id, "r2")
+
+    async def test_backpressure(self):
+        """Test the service reports saturation when max_pending is reached."""
+        service = ReservationService(self.service.repository, max_pending=2)
+        tasks = [asyncio.create_task(service.reserve_room(
+            "Palm Beach Resorts", f"r{n}", n, "Gold", n, "2024-03-01", "2024-03-09"))
+            for n in range(5)]
+        await asyncio.sleep(0)
+        self.assertTrue(service.saturated())
+        await asyncio.gather(*tasks)
+        self.assertFalse(service.saturated())
+
+    async def test_customers(self):
+        """Test saving, loading and deleting customers."""
+        await self.service.save_customer(Customer("Jay Lewis", "jaylewis@example.com", 501))
+        self.backend.save(CUSTOMER, 502,
+                          {'name': 'Ana', 'email': 'a@example.com', 'customer_id': 502})
+        self.assertEqual((await self.service.load_customer(501)).name, "Jay Lewis")
+        self.assertEqual((await self.service.load_customer(502)).name, "Ana")
+        await self.service.delete_customer(501)
+        with self.assertRaises(RecordNotFoundError):
+            await self.service.load_customer(501)
+
+
+if __name__ == '__main__':
+    unittest.main()
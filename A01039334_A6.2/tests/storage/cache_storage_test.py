@@ -0,0 +1,95 @@
+"""
+Unit tests for the cached storage backend.
+
+This module contains tests that verify records are served from the cache,
+invalidated by writes, and dropped when the cache is full or expired.
+"""
+
+import unittest
+import tempfile
+from customer import Customer
+from storage import (CUSTOMER, RESERVATION, CachedBackend, JsonBackend, LRUCache,
+                     MemoryBackend, set_backend)
+from .storage_test import BackendTests
+
+
+class TestCachedBackend(BackendTests, unittest.TestCase):
+    """Tests for the cached storage backend."""
+    def setUp(self):
+        """Setup method to create a cached backend over a JSON backend on a
+        temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.backend = CachedBackend(JsonBackend(self.tmp_dir.name), maxsize=2)
+
+    def tearDown(self):
+        """Removal of the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_hits_and_misses(self):
+        """Test repeated loads are served from the cache and copied."""
+        self.backend.save(CUSTOMER, 5, {'name': 'Jay', 'customer_id': 5})
+        self.backend.load(CUSTOMER, 5)['name'] = 'Changed'
+        self.assertEqual(self.backend.load(CUSTOMER, 5)['name'], 'Jay')
+        stats = self.backend.stats()[CUSTOMER]
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_write_invalidates(self):
+        """Test saves and deletes made through the customer are seen at once."""
+        previous = set_backend(self.backend)
+        try:
+            customer = Customer("Jay Lewis", "jay@example.com", 5)
+            customer.save_data()
+            customer.load_customer(5)
+            customer.modify_customer_information(name="Jay L.")
+            self.assertEqual(Customer(None, None, None).load_customer(5).name, "Jay L.")
+            customer.delete_customer(5)
+            self.assertFalse(self.backend.exists(CUSTOMER, 5))
+        finally:
+            set_backend(previous)
+
+    def test_eviction(self):
+        """Test the least recently used record is dropped when full."""
+        for rez_id in ('r1', 'r2', 'r3'):
+            self.backend.save(RESERVATION, rez_id, {'rez_id': rez_id})
+            self.backend.load(RESERVATION, rez_id)
+        stats = self.backend.stats()[RESERVATION]
+        self.assertEqual((stats['size'], stats['evictions']), (2, 1))
+
+    def test_backend_queries(self):
+        """Test methods of the wrapped backend are reachable."""
+        self.assertEqual(self.backend.path(CUSTOMER, 5), self.backend.backend.path(CUSTOMER, 5))
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests for the LRUCache class."""
+    def test_ttl(self):
+        """Test entries expire after their time to live."""
+        now = [0.0]
+        cache = LRUCache(maxsize=4, ttl=10, clock=lambda: now[0])
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        now[0] = 10.0
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_stale_fill_is_discarded(self):
+        """Test a value read before an invalidation is not cached."""
+        cache = LRUCache()
+        generation = cache.generation()
+        cache.invalidate('a')
+        cache.put('a', 'old', generation)
+        self.assertIsNone(cache.get('a'))
+
+    def test_transaction_rollback_clears(self):
+        """Test a failed transaction empties the cache."""
+        backend = CachedBackend(MemoryBackend())
+        backend.save(CUSTOMER, 1, {'name': 'Ana'})
+        backend.load(CUSTOMER, 1)
+        with self.assertRaises(RuntimeError):
+            with backend.transaction():
+                raise RuntimeError("rollback")
+        self.assertEqual(backend.stats()[CUSTOMER]['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Unit tests for the journaled storage backend.
+
+This module contains tests that verify hotel updates are appended to a log,
+recovered on load and folded into snapshots by the compactor.
+"""
+
+import unittest
+import json
+import os
+import tempfile
+from hotel import Hotel
+from storage import HOTEL, JournalBackend, set_backend
+from .storage_test import BackendTests
+
+
+def room(number, available=True):
+    """Returns a room dictionary."""
+    return {'room_number': number, 'room_available': available, 'bookings': []}
+
+
+class TestJournalBackend(BackendTests, unittest.TestCase):
+    """Tests for the journaled storage backend."""
+    def setUp(self):
+        """Setup method to create a backend on a temporary directory, with
+        compaction in the writing thread."""
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.backend = JournalBackend(self.tmp_dir.name, compact_every=3, background=False)
+
+    def save_hotel(self):
+        """Saves a hotel with two rooms."""
+        self.backend.save(HOTEL, 'H',
+                          {'name': 'H', 'location': 'X', 'rooms': [room(101), room(102)]})
+
+    def tearDown(self):
+        """Removal of the temporary directory."""
+        self.backend.close()
+        self.tmp_dir.cleanup()
+
+    def snapshot(self):
+        """Returns the hotel snapshot as written on disk."""
+        with open(self.backend.path(HOTEL, 'H'), 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def test_update_appends_to_log(self):
+        """Test an update is appended to the log and recovered on load."""
+        self.save_hotel()
+        self.backend.update(HOTEL, 'H', {'rooms': [room(102, False)]}, self.fail)
+        self.assertTrue(self.snapshot()['rooms'][1]['room_available'])
+        with open(self.backend.log_path('H'), 'r', encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), 1)
+        data = self.backend.load(HOTEL, 'H')
+        self.assertFalse(data['rooms'][1]['room_available'])
+        self.backend.update(HOTEL, 'H', {'location': 'Y', 'rooms': [room(103)]}, self.fail)
+        data = self.backend.load(HOTEL, 'H')
+        self.assertEqual(data['location'], 'Y')
+        self.assertEqual([r['room_number'] for r in data['rooms']], [101, 102, 103])
+
+    def test_compaction(self):
+        """Test the log is folded into the snapshot after compact_every updates."""
+        self.save_hotel()
+        for available in (False, True, False):
+            self.backend.update(HOTEL, 'H', {'rooms': [room(101, available)]}, self.fail)
+        self.assertFalse(self.snapshot()['rooms'][0]['room_available'])
+        self.assertEqual(os.path.getsize(self.backend.log_path('H')), 0)
+
+    def test_torn_log_line(self):
+        """Test an incomplete last log line, left by a crash, is ignored."""
+        self.save_hotel()
+        self.backend.update(HOTEL, 'H', {'rooms': [room(101, False)]}, self.fail)
+        with open(self.backend.log_path('H'), 'a', encoding='utf-8') as file:
+            file.write('{"rooms":[{"room_num')
+        data = JournalBackend(self.tmp_dir.name, background=False).load(HOTEL, 'H')
+        self.assertFalse(data['rooms'][0]['room_available'])
+
+    def test_torn_log_line_then_append(self):
+        """Test updates appended after a torn log line are recovered."""
+        self.save_hotel()
+        with open(self.backend.log_path('H'), 'a', encoding='utf-8') as file:
+            file.write('{"rooms":[{"room_num')
+        backend = JournalBackend(self.tmp_dir.name, compact_every=10, background=False)
+        backend.update(HOTEL, 'H', {'rooms': [room(101, False)]}, self.fail)
+        backend.update(HOTEL, 'H', {'rooms': [room(102, False)]}, self.fail)
+        data = JournalBackend(self.tmp_dir.name, background=False).load(HOTEL, 'H')
+        self.assertEqual([r['room_available'] for r in data['rooms']], [False, False])
+        backend.compact('H')
+        self.assertEqual([r['room_available'] for r in self.snapshot()['rooms']], [False, False])
+
+    def test_background_compactor(self):
+        """Test the compactor thread and close() fold the logs."""
+        self.save_hotel()
+        backend = JournalBackend(self.tmp_dir.name, compact_every=2)
+        for number in (103, 104, 105):
+            backend.update(HOTEL, 'H', {'rooms': [room(number)]}, self.fail)
+        backend.close()
+        self.assertEqual(len(self.snapshot()['rooms']), 5)
+        self.assertEqual(os.path.getsize(backend.log_path('H')), 0)
+
+    def test_hotel_reservation(self):
+        """Test a reservation through the Hotel class is journaled."""
+        self.save_hotel()
+        previous = set_backend(self.backend)
+        try:
+            hotel = Hotel('H', 'X')
+            hotel.load_from_file()
+            self.assertTrue(hotel.reserve_room(496, 501, "Gold", 101, "2024-03-01", "2024-03-09"))
+            self.assertTrue(self.snapshot()['rooms'][0]['room_available'])
+            loaded = Hotel('H', 'X')
+            loaded.load_from_file()
+            self.assertFalse(loaded.is_room_free(101, "2024-03-02", "2024-03-03"))
+        finally:
+            set_backend(previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
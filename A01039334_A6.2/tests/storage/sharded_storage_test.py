@@ -0,0 +1,81 @@
+"""
+Unit tests for the sharded JSON storage backend.
+
+This module contains tests that verify records are written under sharded
+directories and that the reservation index answers lookups and survives
+being rebuilt.
+"""
+
+import unittest
+import os
+import tempfile
+from storage import (CUSTOMER, HOTEL, RESERVATION, JsonBackend, ShardedJsonBackend)
+from .storage_test import BackendTests
+
+
+def reservation(rez_id, customer_id, hotel_id):
+    """Returns a reservation dictionary."""
+    return {'rez_id': rez_id, 'customer_id': customer_id, 'hotel_id': hotel_id,
+            'room_num': 101, 'start_date': '2024-03-01', 'end_date': '2024-03-09'}
+
+
+class TestShardedJsonBackend(BackendTests, unittest.TestCase):
+    """Tests for the sharded JSON storage backend."""
+    def setUp(self):
+        """Setup method to create a backend on a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.backend = ShardedJsonBackend(self.tmp_dir.name)
+
+    def tearDown(self):
+        """Removal of the temporary directory."""
+        self.backend.close()
+        self.tmp_dir.cleanup()
+
+    def test_sharded_paths(self):
+        """Test customers and reservations are written under shard directories."""
+        self.backend.save(RESERVATION, 'r1', reservation('r1', 5, 'A'))
+        path = self.backend.path(RESERVATION, 'r1')
+        self.assertTrue(os.path.exists(path))
+        parts = os.path.relpath(path, self.tmp_dir.name).split(os.sep)
+        self.assertEqual(parts[0], 'reservations')
+        self.assertEqual([len(part) for part in parts[1:3]], [2, 2])
+        self.assertEqual(self.backend.location('r1'), path)
+
+    def test_index_queries(self):
+        """Test the reservations of a customer or hotel come from the index."""
+        self.backend.save(RESERVATION, 'r1', reservation('r1', 5, 'A'))
+        self.backend.save(RESERVATION, 'r2', reservation('r2', 5, 'B'))
+        self.backend.save(RESERVATION, 'r3', reservation('r3', 6, 'A'))
+        self.assertEqual(self.backend.reservation_ids_for(customer_id=5), ['r1', 'r2'])
+        self.assertEqual(self.backend.reservation_ids_for(hotel_id='A'), ['r1', 'r3'])
+        self.backend.delete(RESERVATION, 'r1')
+        self.assertEqual([rez['rez_id'] for rez in self.backend.reservations_for(hotel_id='A')],
+                         ['r3'])
+
+    def test_index_persists_and_rebuilds(self):
+        """Test the index is kept on disk and can be rebuilt from the files."""
+        self.backend.save(RESERVATION, 'r1', reservation('r1', 5, 'A'))
+        self.backend.close()
+        os.remove(os.path.join(self.tmp_dir.name, ShardedJsonBackend.INDEX_FILE))
+        self.backend = ShardedJsonBackend(self.tmp_dir.name)
+        self.assertFalse(self.backend.exists(RESERVATION, 'r1'))
+        self.assertEqual(self.backend.rebuild_index(), 1)
+        self.assertEqual(self.backend.reservation_ids_for(customer_id=5), ['r1'])
+        self.backend.close()
+        self.backend = ShardedJsonBackend(self.tmp_dir.name)
+        self.assertTrue(self.backend.exists(RESERVATION, 'r1'))
+
+    def test_import_from_flat_layout(self):
+        """Test the records of a flat JSON directory are copied and indexed."""
+        with tempfile.TemporaryDirectory() as flat_dir:
+            flat = JsonBackend(flat_dir)
+            flat.save(HOTEL, 'A', {'name': 'A', 'location': 'X', 'rooms': []})
+            flat.save(CUSTOMER, 5, {'name': 'Ana', 'email': 'a@example.com', 'customer_id': 5})
+            flat.save(RESERVATION, 'r1', reservation('r1', 5, 'A'))
+            self.assertEqual(self.backend.import_from(flat), 3)
+        self.assertEqual(list(self.backend.keys(CUSTOMER)), ['5'])
+        self.assertEqual(self.backend.reservation_ids_for(hotel_id='A'), ['r1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
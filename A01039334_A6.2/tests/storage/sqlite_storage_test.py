@@ -0,0 +1,106 @@
+"""
+Unit tests for the SQLite storage backend.
+
+This module contains tests that verify the SQLite backend behaves like the other
+storage backends, and that partial updates and transactions only write what
+they should.
+"""
+
+import unittest
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+from hotel import Hotel, Room
+from storage import CUSTOMER, HOTEL, RESERVATION, SqliteBackend, set_backend
+from .storage_test import BackendTests
+
+
+class TestSqliteBackend(BackendTests, unittest.TestCase):
+    """Tests for the SQLite storage backend."""
+    def setUp(self):
+        """Setup method to create a backend on a temporary database."""
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.backend = SqliteBackend(os.path.join(self.tmp_dir.name, 'test.db'))
+
+    def tearDown(self):
+        """Closing and removal of the temporary database."""
+        self.backend.close()
+        self.tmp_dir.cleanup()
+
+    def test_wal_mode(self):
+        """Test the database runs in WAL mode."""
+        conn = self.backend._conn  # pylint: disable=protected-access
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_keys_are_text(self):
+        """Test numeric and text keys address the same record."""
+        self.backend.save(CUSTOMER, 5, {'name': 'Jay', 'email': 'j@example.com', 'customer_id': 5})
+        self.assertEqual(self.backend.load(CUSTOMER, "5")['customer_id'], 5)
+        self.backend.delete(CUSTOMER, "5")
+        self.assertFalse(self.backend.exists(CUSTOMER, 5))
+
+    def test_update_rooms(self):
+        """Test a room update only changes that room."""
+        rooms = [{'room_number': n, 'room_available': True, 'bookings': []} for n in (101, 102)]
+        self.backend.save(HOTEL, 'H', {'name': 'H', 'location': 'X', 'rooms': rooms})
+        patch = {'rooms': [{'room_number': 102, 'room_available': False,
+                            'bookings': [['2024-03-01', '2024-03-02', 'r1']]}]}
+        self.backend.update(HOTEL, 'H', patch, lambda: self.fail("snapshot not needed"))
+        data = self.backend.load(HOTEL, 'H')
+        self.assertEqual([room['room_number'] for room in data['rooms']], [101, 102])
+        self.assertTrue(data['rooms'][0]['room_available'])
+        self.assertFalse(data['rooms'][1]['room_available'])
+        self.assertEqual(data['rooms'][1]['bookings'], [['2024-03-01', '2024-03-02', 'r1']])
+
+    def test_scan_in_chunks(self):
+        """Test a scan reads every record in chunks, with the rooms of each
+        hotel, and lets other threads write between chunks."""
+        for number in range(5):
+            rooms = [{'room_number': 100 + n, 'room_available': True, 'bookings': []}
+                     for n in range(number)]
+            self.backend.save(HOTEL, f'H{number}', {'name': f'H{number}', 'location': 'X',
+                                                    'rooms': rooms})
+            self.backend.save(RESERVATION, number, {'rez_id': number})
+        with patch('storage.sqlite_storage.SCAN_CHUNK', 2):
+            hotels = self.backend.scan(HOTEL)
+            self.assertEqual(next(hotels)[0], 'H0')
+            writer = threading.Thread(
+                target=self.backend.save, args=(RESERVATION, 9, {'rez_id': 9}))
+            writer.start()
+            writer.join(5)
+            self.assertFalse(writer.is_alive())
+            rest = dict(hotels)
+            reservations = [key for key, _ in self.backend.scan(RESERVATION)]
+        self.assertEqual([len(rest[f'H{n}']['rooms']) for n in range(1, 5)], [1, 2, 3, 4])
+        self.assertEqual(reservations, ['0', '1', '2', '3', '4', '9'])
+
+    def test_transaction_rollback(self):
+        """Test the writes of a failed transaction are discarded."""
+        with self.assertRaises(RuntimeError):
+            with self.backend.transaction():
+                self.backend.save(RESERVATION, 'r1', {'rez_id': 'r1'})
+                raise RuntimeError
+        self.assertFalse(self.backend.exists(RESERVATION, 'r1'))
+
+    def test_hotel_reservation(self):
+        """Test reserving and canceling through the Hotel class."""
+        previous = set_backend(self.backend)
+        try:
+            hotel = Hotel("Palm Beach Resorts", "Miami")
+            hotel.rooms.extend([Room(101), Room(102)])
+            hotel.save_data()
+            self.assertTrue(hotel.reserve_room(496, 501, "Gold", 101, "2024-03-01", "2024-03-09"))
+            self.assertEqual(len(self.backend.reservations_for(customer_id=501)), 1)
+            loaded = Hotel("Palm Beach Resorts", "")
+            loaded.load_from_file()
+            self.assertFalse(loaded.is_room_free(101, "2024-03-02", "2024-03-03"))
+            self.assertTrue(loaded.cancel_reservation(496))
+            self.assertEqual(self.backend.reservations_for(hotel_id="Palm Beach Resorts"), [])
+        finally:
+            set_backend(previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Unit tests for the storage backends.
+
+This module contains tests that verify the in-memory and JSON storage backends,
+ensuring that records are saved, loaded, deleted and scanned consistently.
+"""
+
+import unittest
+import os
+import tempfile
+from storage import (CUSTOMER, HOTEL, RESERVATION, JsonBackend, MemoryBackend,
+                     RecordNotFoundError, VersionConflictError, get_backend, set_backend)
+
+
+class BackendTests:
+    """Tests shared by every storage backend."""
+
+    def test_save_and_load(self):
+        """Test a saved record can be loaded back."""
+        data = {'name': 'Jay Lewis', 'email': 'jaylewis@example.com', 'customer_id': 5}
+        self.backend.save(CUSTOMER, 5, data)
+        self.assertEqual(self.backend.load(CUSTOMER, 5), data)
+        self.assertTrue(self.backend.exists(CUSTOMER, 5))
+
+    def test_load_missing_record(self):
+        """Test loading a missing record raises a FileNotFoundError."""
+        with self.assertRaises(RecordNotFoundError):
+            self.backend.load(RESERVATION, 'missing')
+        with self.assertRaises(FileNotFoundError):
+            self.backend.delete(RESERVATION, 'missing')
+        self.assertFalse(self.backend.exists(RESERVATION, 'missing'))
+
+    def test_delete(self):
+        """Test deleting a record removes it."""
+        self.backend.save(RESERVATION, 'r1', {'rez_id': 'r1', 'room_num': 101})
+        self.backend.delete(RESERVATION, 'r1')
+        self.assertFalse(self.backend.exists(RESERVATION, 'r1'))
+
+    def test_scan(self):
+        """Test scanning returns every record of a kind with its key."""
+        self.backend.save(HOTEL, 'Hotel A', {'name': 'Hotel A', 'location': 'X', 'rooms': []})
+        self.backend.save(HOTEL, 'Hotel B', {'name': 'Hotel B', 'location': 'Y', 'rooms': []})
+        self.backend.save(CUSTOMER, 7, {'name': 'Ana', 'email': 'a@example.com', 'customer_id': 7})
+        hotels = dict(self.backend.scan(HOTEL))
+        self.assertEqual(sorted(hotels), ['Hotel A', 'Hotel B'])
+        self.assertEqual(hotels['Hotel B']['location'], 'Y')
+
+    def test_save_versioned(self):
+        """Test versioned saves reject writes based on an old version."""
+        data = {'name': 'Ana', 'email': 'a@example.com', 'customer_id': 7}
+        self.assertEqual(self.backend.save_versioned(CUSTOMER, 7, data, 0), 1)
+        self.assertEqual(self.backend.save_versioned(CUSTOMER, 7, data, 1), 2)
+        with self.assertRaises(VersionConflictError):
+            self.backend.save_versioned(CUSTOMER, 7, data, 1)
+        self.assertEqual(self.backend.load(CUSTOMER, 7)['version'], 2)
+        self.assertEqual(self.backend.save_versioned(CUSTOMER, 7, data), 3)
+
+    def test_update_versioned(self):
+        """Test versioned partial updates check and store the version."""
+        hotel = {'name': 'H', 'location': 'X', 'rooms': [
+            {'room_number': 1, 'room_available': True, 'bookings': []}]}
+        self.backend.save(HOTEL, 'H', hotel)
+        hotel['rooms'][0]['room_available'] = False
+        self.assertEqual(self.backend.update_versioned(
+            HOTEL, 'H', {'rooms': hotel['rooms']}, lambda: hotel, 0), 1)
+        self.assertEqual(self.backend.version(HOTEL, 'H'), 1)
+        with self.assertRaises(VersionConflictError):
+            self.backend.update_versioned(HOTEL, 'H', {'location': 'Y'},
+                                          lambda: dict(hotel, location='Y'), 0)
+        data = self.backend.load(HOTEL, 'H')
+        self.assertEqual((data['version'], data['location']), (1, 'X'))
+        self.assertFalse(data['rooms'][0]['room_available'])
+        self.assertEqual(self.backend.update_versioned(
+            HOTEL, 'H', {'location': 'Y'}, lambda: dict(hotel, location='Y'), 1), 2)
+        self.assertEqual(self.backend.load(HOTEL, 'H')['version'], 2)
+
+
+class TestMemoryBackend(BackendTests, unittest.TestCase):
+    """Tests for the in-memory storage backend."""
+    def setUp(self):
+        """Setup method to create an empty backend before each test."""
+        self.backend = MemoryBackend()
+
+    def test_records_are_copied(self):
+        """Test changing a saved dictionary does not change the stored record."""
+        data = {'rez_id': 'r1', 'room_num': 101}
+        self.backend.save(RESERVATION, 'r1', data)
+        data['room_num'] = 102
+        self.assertEqual(self.backend.load(RESERVATION, 'r1')['room_num'], 101)
+
+
+    def test_update_in_place(self):
+        """Test a partial update patches the stored record without building
+        a snapshot, and keeps a copy of the patch."""
+        rooms = [{'room_number': n, 'room_available': True, 'bookings': []} for n in (1, 2)]
+        self.backend.save(HOTEL, 'H', {'name': 'H', 'location': 'X', 'rooms': rooms})
+        patch = {'rooms': [{'room_number': 2, 'room_available': False, 'bookings': []}]}
+        self.backend.update(HOTEL, 'H', patch, lambda: self.fail("snapshot not needed"))
+        patch['rooms'][0]['room_available'] = True
+        data = self.backend.load(HOTEL, 'H')
+        self.assertEqual([room['room_available'] for room in data['rooms']], [True, False])
+        self.backend.update(CUSTOMER, 7, {'name': 'Ana'}, lambda: {'name': 'Ana'})
+        self.assertEqual(self.backend.load(CUSTOMER, 7), {'name': 'Ana'})
+
+class TestJsonBackend(BackendTests, unittest.TestCase):
+    """Tests for the JSON file storage backend."""
+    def setUp(self):
+        """Setup method to create a backend on a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.backend = JsonBackend(self.tmp_dir.name)
+
+    def tearDown(self):
+        """Removal of the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_file_names(self):
+        """Test records are written to the system's file names."""
+        self.backend.save(HOTEL, 'Test Hotel', {'name': 'Test Hotel', 'location': 'X', 'rooms': []})
+        self.backend.save(CUSTOMER, 5, {'name': 'Jay', 'email': 'j@example.com', 'customer_id': 5})
+        self.backend.save(RESERVATION, 496, {'rez_id': 496})
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)),
+                         ['Test Hotel_data.json', 'customer_5.json', 'reservation_496.json'])
+
+
+class TestActiveBackend(unittest.TestCase):
+    """Tests for the selection of the active backend."""
+    def test_set_backend(self):
+        """Test replacing the active backend returns the previous one."""
+        backend = MemoryBackend()
+        previous = set_backend(backend)
+        try:
+            self.assertIs(get_backend(), backend)
+        finally:
+            set_backend(previous)
+        self.assertIs(get_backend(), previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
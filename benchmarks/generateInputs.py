@@ -0,0 +1,175 @@
+"""
+generateInputs.py - Generador de entradas sintéticas para las pruebas de
+rendimiento de computeStatistics, convertNumbers, wordCount y computeSales.
+
+Cada generador escribe el archivo por bloques, de modo que se pueden crear
+entradas desde 10^3 hasta 10^8 registros sin tenerlas completas en memoria.
+Los datos dependen solamente de la semilla, así que dos ejecuciones con los
+mismos parámetros producen exactamente los mismos archivos. Se controla la
+proporción de valores repetidos y de líneas inválidas:
+
+    python benchmarks/generateInputs.py numbers datos.txt 1000000 --invalid 0.01
+    python benchmarks/generateInputs.py words palabras.txt 1000000 --duplicates 0.9
+    python benchmarks/generateInputs.py sales ventas/ 1000000 --jsonl
+"""
+
+#!/usr/bin/env python
+# coding: utf-8
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import argparse
+import json
+import os
+import random
+import string
+
+# In[2]:
+
+
+BLOCK = 65536
+INVALID_NUMBERS = ("abc", "1.2.3", "12a", "--5", "NaNo", "0x1G", "uno")
+INVALID_WORDS = ("abc123", "hello-world", "42", "e-mail", "x_y", "año2024")
+
+
+def _write_lines(path, lines):
+    """Escritura de un iterable de líneas en bloques de BLOCK líneas."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        block = []
+        for line in lines:
+            block.append(line)
+            if len(block) == BLOCK:
+                file.write("\n".join(block) + "\n")
+                block = []
+        if block:
+            file.write("\n".join(block) + "\n")
+
+
+def _values(count, rng, duplicates, invalid, new_value, invalid_values):
+    """
+    Generación de count valores: con probabilidad "invalid" un valor inválido,
+    con probabilidad "duplicates" uno ya generado y, si no, un valor nuevo.
+    """
+    seen = []
+    for _ in range(count):
+        draw = rng.random()
+        if draw < invalid:
+            yield rng.choice(invalid_values)
+        elif seen and draw < invalid + duplicates:
+            yield seen[rng.randrange(len(seen))]
+        else:
+            value = new_value()
+            if len(seen) < 1000000:
+                seen.append(value)
+            yield value
+
+
+def generate_numbers(path, count, integers=False, duplicates=0.3, invalid=0.01, seed=0):
+    """
+    Archivo con un número por línea (flotantes, o enteros con y sin signo para
+    convertNumbers).
+    """
+    rng = random.Random(seed)
+    if integers:
+        def new_value():
+            return str(rng.randint(-(2 ** 31), 2 ** 31 - 1))
+    else:
+        def new_value():
+            return repr(round(rng.uniform(-1e6, 1e6), rng.randint(0, 6)))
+    _write_lines(path, _values(count, rng, duplicates, invalid, new_value, INVALID_NUMBERS))
+    return path
+
+
+def generate_words(path, count, duplicates=0.9, invalid=0.01, seed=0):
+    """
+    Archivo con una palabra por línea. Con "duplicates" alto el vocabulario es
+    pequeño y las palabras se repiten mucho.
+    """
+    rng = random.Random(seed)
+
+    def new_value():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+    _write_lines(path, _values(count, rng, duplicates, invalid, new_value, INVALID_WORDS))
+    return path
+
+
+def generate_sales(directory, count, products=1000, unknown=0.01, jsonl=False, seed=0):
+    """
+    Catálogo de precios (products productos) y archivo de ventas con count
+    ventas en el formato de los casos de prueba TC1-TC3. Una proporción
+    "unknown" de las ventas usa productos que no están en el catálogo.
+    Regresa las rutas del catálogo y de las ventas.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    titles = [f"Product {number}" for number in range(products)]
+    catalogue = [{"title": title, "type": "synthetic", "price": round(rng.uniform(1, 100), 2)}
+                 for title in titles]
+    catalogue_path = os.path.join(directory, "ProductList.json")
+    with open(catalogue_path, 'w', encoding='utf-8') as file:
+        json.dump(catalogue, file)
+
+    def sales():
+        for number in range(count):
+            product = (f"Unknown {rng.randrange(100)}" if rng.random() < unknown
+                       else titles[rng.randrange(products)])
+            yield json.dumps({"SALE_ID": number // 3 + 1, "SALE_Date": "01/12/23",
+                              "Product": product, "Quantity": rng.randint(1, 10)})
+
+    if jsonl:
+        sales_path = os.path.join(directory, "Sales.jsonl")
+        _write_lines(sales_path, sales())
+    else:
+        sales_path = os.path.join(directory, "Sales.json")
+        lines = sales()
+        with open(sales_path, 'w', encoding='utf-8') as file:
+            file.write("[\n")
+            first = next(lines, None)
+            if first is not None:
+                file.write(first)
+                for line in lines:
+                    file.write(",\n" + line)
+            file.write("\n]\n")
+    return catalogue_path, sales_path
+
+# In[3]:
+
+
+def main():
+    """
+    Operación principal cuando se ejecuta el script: genera el tipo de entrada
+    pedido con la cantidad de registros indicada.
+    """
+    parser = argparse.ArgumentParser(description="Generador de entradas sintéticas")
+    parser.add_argument("kind", choices=("numbers", "integers", "words", "sales"))
+    parser.add_argument("path", help="Archivo (o directorio, para sales) de salida")
+    parser.add_argument("count", type=float, help="Número de registros, p. ej. 1e6")
+    parser.add_argument("--duplicates", type=float, default=None)
+    parser.add_argument("--invalid", type=float, default=0.01)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--jsonl", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    count = int(args.count)
+    if args.kind == "sales":
+        print(generate_sales(args.path, count, args.products, args.invalid,
+                             args.jsonl, args.seed))
+        return
+    if args.kind == "words":
+        duplicates = 0.9 if args.duplicates is None else args.duplicates
+        generate_words(args.path, count, duplicates, args.invalid, args.seed)
+    else:
+        duplicates = 0.3 if args.duplicates is None else args.duplicates
+        generate_numbers(args.path, count, args.kind == "integers", duplicates,
+                         args.invalid, args.seed)
+    print(args.path)
+
+if __name__ == "__main__":
+    main()
+
+# In[4]:
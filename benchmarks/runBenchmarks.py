@@ -0,0 +1,315 @@
+"""
+runBenchmarks.py - Pruebas de rendimiento de computeStatistics, convertNumbers,
+wordCount y computeSales.
+
+Para cada script y cada tamaño de entrada se genera (o se reutiliza) una
+entrada sintética con generateInputs.py y se ejecutan las funciones
+principales del script dentro de Python, sin pasar por la consola: primero
+"warmup" ejecuciones que no se miden y luego "repeats" ejecuciones medidas.
+Cada tamaño se mide en un proceso nuevo, de modo que el pico de memoria
+residente (RSS) corresponde solamente a esa medición.
+
+El resultado es un JSON con el tiempo (mínimo, mediana y media), el número de
+registros por segundo y el pico de RSS de cada tamaño, junto con la curva de
+escalamiento: el exponente k de tiempo ~ n^k entre tamaños consecutivos (1
+para un algoritmo lineal, 2 para uno cuadrático). Cuando un tamaño tarda más
+de --max-seconds, los tamaños mayores de ese script se omiten.
+
+computeSales se mide de tres formas: "computeSales" lee las ventas como un
+arreglo JSON completo (el camino original, que no es viable con 10^8
+registros); "computeSalesCached" lee el catálogo desde su caché binario y las
+ventas en JSON Lines en un solo proceso; y "computeSalesSharded" divide las
+ventas JSON Lines en rangos de bytes que se suman en --workers procesos.
+
+    python benchmarks/runBenchmarks.py --sizes 1e3 1e4 1e5 1e6 --output base.json
+    python benchmarks/runBenchmarks.py --scripts computeSalesSharded --sizes 1e6 1e7 1e8 \\
+        --repeats 1 --workers 8 --data-dir /tmp/entradas
+"""
+
+#!/usr/bin/env python
+# coding: utf-8
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import argparse
+import contextlib
+import datetime
+import functools
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+# pylint: disable=wrong-import-position
+import generateInputs
+
+# In[2]:
+
+
+ROOT = os.path.dirname(BENCHMARKS_DIR)
+SCRIPTS = {
+    "computeStatistics": os.path.join(ROOT, "A01039334_A4.2", "ComputeStatistics",
+                                      "computeStatistics.py"),
+    "convertNumbers": os.path.join(ROOT, "A01039334_A4.2", "ConvertNumbers",
+                                   "convertNumbers.py"),
+    "wordCount": os.path.join(ROOT, "A01039334_A4.2", "CountWords", "wordCount.py"),
+    "computeSales": os.path.join(ROOT, "A01039334_A5.2", "computeSales.py"),
+    "computeSalesCached": os.path.join(ROOT, "A01039334_A5.2", "computeSales.py"),
+    "computeSalesSharded": os.path.join(ROOT, "A01039334_A5.2", "computeSales.py"),
+}
+
+
+def load_script(name):
+    """
+    Importación de un script por su ruta, sin ejecutar su main. Se importa con
+    su propio nombre para que los procesos que crea puedan encontrar sus
+    funciones.
+    """
+    path = SCRIPTS[name]
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+
+
+def prepare_input(name, size, data_dir, seed):
+    """
+    Generación de la entrada de un script para un tamaño, reutilizando la que
+    ya exista en data_dir con los mismos parámetros. Regresa sus rutas.
+    """
+    if name.startswith("computeSales"):
+        jsonl = name != "computeSales"
+        base = os.path.join(data_dir, f"computeSales{'Jsonl' if jsonl else ''}_{size}_{seed}")
+        paths = (os.path.join(base, "ProductList.json"),
+                 os.path.join(base, "Sales.jsonl" if jsonl else "Sales.json"))
+        if not all(os.path.exists(path) for path in paths):
+            paths = generateInputs.generate_sales(base, size, jsonl=jsonl, seed=seed)
+        return paths
+    base = os.path.join(data_dir, f"{name}_{size}_{seed}")
+    path = base + ".txt"
+    if not os.path.exists(path):
+        if name == "wordCount":
+            generateInputs.generate_words(path + ".tmp", size, seed=seed)
+        else:
+            generateInputs.generate_numbers(path + ".tmp", size,
+                                            integers=name == "convertNumbers", seed=seed)
+        os.replace(path + ".tmp", path)
+    return (path,)
+
+
+# In[3]:
+
+
+def run_computeStatistics(module, path):
+    """Cálculo de las estadísticas como en computeStatistics.main."""
+    data = module.open_file(path)
+    amount = len(data)
+    mean = module.calculate_mean(data, amount)
+    module.calculate_mode(data)
+    module.calculate_median(data, amount)
+    module.calculate_sd(module.calculate_variance(data, mean, amount))
+
+
+def run_convertNumbers(module, path):
+    """Conversión de los números como en convertNumbers.main."""
+    data = module.open_file(path)
+    module.convert_all(data, module.find_max_bit(data))
+
+
+def run_wordCount(module, path):
+    """Conteo de las palabras como en wordCount.main."""
+    module.count_words(module.open_file(path))
+
+
+def run_computeSales(module, catalogue_path, sales_path):
+    """
+    Suma de las ventas como en computeSales.main con un solo archivo JSON y
+    --no-cache.
+    """
+    index = module.build_index(module.open_file(catalogue_path))
+    module.sum_cost(index, module.open_file(sales_path))
+
+
+def run_computeSalesCached(module, catalogue_path, sales_path):
+    """
+    Suma de las ventas JSON Lines en un solo proceso, con el índice del
+    catálogo leído desde su caché binario (compilado en la primera ejecución).
+    """
+    index = module.load_catalogue_index(catalogue_path)
+    module.total_sales(module.read_sales(sales_path), index)
+
+
+def run_computeSalesSharded(module, catalogue_path, sales_path, workers=None):
+    """
+    Suma de las ventas JSON Lines como en computeSales.main con --shards y
+    --workers: un rango de bytes por proceso.
+    """
+    index = module.load_catalogue_index(catalogue_path)
+    tasks = module.plan_tasks([sales_path], workers or os.cpu_count() or 1)
+    module.parallel_sum_cost(index, tasks, workers)
+
+
+RUNNERS = {
+    "computeStatistics": run_computeStatistics,
+    "convertNumbers": run_convertNumbers,
+    "wordCount": run_wordCount,
+    "computeSales": run_computeSales,
+    "computeSalesCached": run_computeSalesCached,
+    "computeSalesSharded": run_computeSalesSharded,
+}
+# Runners que reciben el número de procesos (--workers).
+PARALLEL_RUNNERS = {"computeSalesSharded"}
+
+
+def peak_rss():
+    """Pico de memoria residente del proceso en bytes (None si no se conoce)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(name, paths, warmup, repeats, workers=None):
+    """
+    Ejecución de un script sobre una entrada: warmup ejecuciones sin medir y
+    repeats medidas. Los mensajes que imprimen los scripts se descartan.
+    """
+    module = load_script(name)
+    runner = RUNNERS[name]
+    if name in PARALLEL_RUNNERS:
+        runner = functools.partial(runner, workers=workers)
+    times = []
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            for run in range(warmup + repeats):
+                start = time.perf_counter()
+                runner(module, *paths)
+                if run >= warmup:
+                    times.append(time.perf_counter() - start)
+    return {"times_s": times, "peak_rss_bytes": peak_rss()}
+
+
+def measure_isolated(name, paths, warmup, repeats, workers=None):
+    """
+    Medición en un proceso nuevo para que el pico de RSS sea solo suyo (sin
+    contar los procesos que cree el script).
+    """
+    with ProcessPoolExecutor(max_workers=1,
+                             mp_context=multiprocessing.get_context()) as pool:
+        return pool.submit(measure, name, paths, warmup, repeats, workers).result()
+
+
+# In[4]:
+
+
+def scaling(points):
+    """
+    Exponente k de tiempo ~ n^k entre cada par de tamaños consecutivos
+    medidos.
+    """
+    curve = []
+    for before, after in zip(points, points[1:]):
+        if before["median_s"] > 0 and after["median_s"] > 0:
+            exponent = (math.log(after["median_s"] / before["median_s"])
+                        / math.log(after["size"] / before["size"]))
+            curve.append({"from": before["size"], "to": after["size"],
+                          "exponent": round(exponent, 3)})
+    return curve
+
+
+def benchmark_script(name, args, data_dir):
+    """Medición de un script en todos los tamaños pedidos."""
+    points = []
+    skipped = []
+    for size in args.sizes:
+        if points and points[-1]["median_s"] > args.max_seconds:
+            skipped.append(size)
+            continue
+        paths = prepare_input(name, size, data_dir, args.seed)
+        if args.no_isolate:
+            result = measure(name, paths, args.warmup, args.repeats, args.workers)
+        else:
+            result = measure_isolated(name, paths, args.warmup, args.repeats, args.workers)
+        times = result["times_s"]
+        median = statistics.median(times)
+        points.append({
+            "size": size,
+            "input_bytes": sum(os.path.getsize(path) for path in paths),
+            "min_s": min(times),
+            "median_s": median,
+            "mean_s": statistics.mean(times),
+            "records_per_s": size / median if median else None,
+            "peak_rss_bytes": result["peak_rss_bytes"],
+            "times_s": times,
+        })
+        print(f"{name:18} n={size:<10} {median:10.4f} s  "
+              f"{points[-1]['records_per_s'] or 0:14.1f} registros/s", file=sys.stderr)
+    return {"script": name, "points": points, "scaling": scaling(points),
+            "skipped_sizes": skipped}
+
+
+def main():
+    """
+    Operación principal cuando se ejecuta el script: mide los scripts pedidos y
+    escribe los resultados en formato JSON.
+    """
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de los scripts")
+    parser.add_argument("--scripts", nargs="+", choices=sorted(SCRIPTS), default=list(SCRIPTS))
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5],
+                        help="Números de registros, de 1e3 a 1e8")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=60,
+                        help="Tiempo tras el cual se omiten los tamaños mayores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos de computeSalesSharded (por omisión, uno por CPU)")
+    parser.add_argument("--data-dir", help="Directorio donde se guardan las entradas")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="Medir en este proceso (el pico de RSS es acumulado)")
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+    args.sizes = sorted(int(size) for size in args.sizes)
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(data_dir, exist_ok=True)
+        results = [benchmark_script(name, args, data_dir) for name in args.scripts]
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "parameters": {"sizes": args.sizes, "warmup": args.warmup,
+                       "repeats": args.repeats, "seed": args.seed, "workers": args.workers,
+                       "isolated": not args.no_isolate},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
+
+# In[5]:
@@ -0,0 +1,234 @@
+"""
+numberParser.py - Lectura por bloques de archivos con un número por línea,
+compartida por computeStatistics (float) y convertNumbers (int).
+
+El resultado es el mismo que leer el archivo línea por línea, quitar los
+espacios con strip(), saltar las líneas en blanco y convertir las demás con la
+función de conversión, contando como inválidas las que no se pueden convertir.
+Para que sea rápido, cada bloque se convierte de una sola vez con map() sobre
+los bytes, y solo las líneas con formato irregular se revisan una por una.
+Las líneas inválidas se cuentan y solo se guardan las primeras, con su número
+de línea. Con workers > 1 los archivos grandes se dividen en rangos de bytes
+que se convierten en varios procesos.
+
+La conversión debe aceptar bytes ASCII igual que texto, como float() e int().
+Para otras funciones todas las líneas se revisan una por una.
+"""
+
+#!/usr/bin/env python
+# coding: utf-8
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# In[2]:
+
+
+# Líneas que float() acepta con certeza: un número decimal ASCII.
+FLOAT = rb"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+# Líneas que int() acepta con certeza: un entero ASCII de hasta 640 dígitos (el
+# mínimo del límite de int() para textos largos).
+INTEGER = rb"[+-]?[0-9]{1,640}"
+
+
+def _other_line(number):
+    """
+    Patrón de las líneas que no son un número simple con espacios opcionales.
+    Cuando un bloque tiene espacios dentro de las líneas, líneas en blanco o
+    saltos "\\r" sueltos, el patrón encuentra estas líneas, que se revisan una
+    por una con la conversión como antes.
+    """
+    return re.compile(
+        rb"^(?![ \t\x0b\x0c]*(?:" + number + rb")?[ \t\x0b\x0c]*\r?$).*$", re.MULTILINE)
+
+
+OTHER_LINES = {float: _other_line(FLOAT), int: _other_line(INTEGER)}
+# Para otras conversiones, todas las líneas.
+ANY_LINE = re.compile(rb"^.+$", re.MULTILINE)
+# Datos que se regresan de los procesos como array, que se copia más rápido.
+ARRAY_CODES = {float: "d"}
+NEWLINES = re.compile("\r\n|\r|\n")
+SPACES = (b" ", b"\t", b"\x0b", b"\x0c")
+BLOCK_SIZE = 1 << 22
+INVALID_SAMPLES = 10
+PARALLEL_MIN_SIZE = 1 << 24
+
+
+def _check_line(text, line, convert, data, found, samples):
+    """
+    Conversión de una línea con las reglas originales (strip y convert).
+    Regresa 1 si la línea no es un número y 0 si no.
+    """
+    stripped_data = text.strip()
+    if not stripped_data:
+        return 0
+    try:
+        data.append(convert(stripped_data))
+    except ValueError:
+        if len(found) < samples:
+            found.append((line, stripped_data))
+        return 1
+    return 0
+
+
+def _parse_lines(block, convert, first_line, samples):
+    """
+    Conversión de un bloque con formato irregular: los tramos de líneas que son
+    un número simple se convierten juntos y las demás líneas por separado.
+    """
+    data = []
+    invalid = 0
+    found = []
+    newlines = 0
+    extra = 0
+    pos = 0
+    for match in OTHER_LINES.get(convert, ANY_LINE).finditer(block):
+        data.extend(map(convert, block[pos:match.start()].split()))
+        newlines += block.count(b"\n", pos, match.start())
+        text = match.group()
+        if text.endswith(b"\r") and block[match.end():match.end() + 1] == b"\n":
+            text = text[:-1]
+        parts = NEWLINES.split(text.decode("utf-8"))
+        for offset, part in enumerate(parts):
+            invalid += _check_line(part, first_line + newlines + extra + offset,
+                                   convert, data, found, samples)
+        extra += len(parts) - 1
+        pos = match.end()
+    data.extend(map(convert, block[pos:].split()))
+    return data, block.count(b"\n") + extra, invalid, found
+
+
+def parse_block(block, convert, first_line=1, samples=INVALID_SAMPLES):
+    """
+    Conversión de un bloque de líneas completas (bytes). Regresa los datos, el
+    número de líneas del bloque, el número de líneas inválidas y las primeras
+    "samples" de ellas como (número de línea, texto).
+
+    En el caso común, una palabra por línea, todo el bloque se convierte con
+    map(convert, ...); cuando una palabra no es válida, la conversión se
+    detiene en ella, se revisa sola y continúa con el resto.
+    """
+    tail = 1 if block and not block.endswith(b"\n") else 0
+    tokens = block.split()
+    lines = block.count(b"\n") + tail
+    if (convert not in OTHER_LINES or len(tokens) != lines
+            or any(space in block for space in SPACES)
+            or b"\r" in block and block.count(b"\r") != block.count(b"\r\n")):
+        data, lines, invalid, found = _parse_lines(block, convert, first_line, samples)
+        return data, lines + tail, invalid, found
+    data = []
+    invalid = 0
+    found = []
+    remaining = iter(tokens)
+    pos = 0
+    while True:
+        converted = len(data)
+        try:
+            data.extend(map(convert, remaining))
+            break
+        except ValueError:
+            pos += len(data) - converted
+            token = tokens[pos]
+            text = token.decode("utf-8")
+            # bytes.split() no separa en "\x1c"-"\x1f" ni en los espacios que no
+            # son ASCII, pero strip() sí los quita.
+            if not token.isascii() or text.strip() != text:
+                invalid += _check_line(text, first_line + pos, convert,
+                                       data, found, samples)
+            else:
+                # La conversión acepta lo mismo en bytes que en texto ASCII.
+                invalid += 1
+                if len(found) < samples:
+                    found.append((first_line + pos, text))
+            pos += 1
+    return data, lines, invalid, found
+
+
+def parse_range(path, convert, start=0, end=None, samples=INVALID_SAMPLES):
+    """
+    Lectura por bloques de las líneas que comienzan dentro de [start, end) del
+    archivo (todo el archivo si end es None). Regresa lo mismo que parse_block,
+    con los números de línea contados desde el inicio del rango.
+    """
+    data = []
+    lines = 0
+    invalid = 0
+    found = []
+    with open(path, 'rb') as file:
+        if start:
+            file.seek(start - 1)
+            file.readline()
+        carry = b""
+        while end is None or file.tell() < end:
+            chunk = file.read(BLOCK_SIZE if end is None else min(BLOCK_SIZE, end - file.tell()))
+            if not chunk:
+                break
+            if end is not None and file.tell() >= end and not chunk.endswith(b"\n"):
+                chunk += file.readline()
+            block = carry + chunk
+            cut = block.rfind(b"\n") + 1
+            carry = block[cut:]
+            part = parse_block(block[:cut], convert, lines + 1, samples - len(found))
+            data.extend(part[0])
+            lines += part[1]
+            invalid += part[2]
+            found.extend(part[3])
+        part = parse_block(carry, convert, lines + 1, samples - len(found))
+        data.extend(part[0])
+        return data, lines + part[1], invalid + part[2], found + part[3]
+
+
+def _parse_task(task):
+    """Conversión de un rango del archivo dentro de un proceso del pool."""
+    data, lines, invalid, found = parse_range(*task)
+    code = ARRAY_CODES.get(task[1])
+    return (data if code is None else array(code, data)), lines, invalid, found
+
+
+def parse_file(path, convert, workers=1, samples=INVALID_SAMPLES):
+    """
+    Conversión de todos los números del archivo. Con workers > 1 y un archivo
+    grande, el archivo se divide en rangos de bytes que se procesan en un
+    conjunto de procesos. Regresa los datos y un resumen de las líneas
+    inválidas: {"invalid": número, "samples": [(número de línea, texto), ...]}.
+    """
+    size = os.path.getsize(path)
+    if workers > 1 and size >= PARALLEL_MIN_SIZE:
+        step = -(-size // workers)
+        tasks = [(path, convert, start, min(start + step, size), samples)
+                 for start in range(0, size, step)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_parse_task, tasks))
+    else:
+        parts = [parse_range(path, convert, 0, None, samples)]
+    data = parts[0][0] if len(parts) == 1 else []
+    invalid = 0
+    found = []
+    offset = 0
+    for part_data, lines, part_invalid, part_found in parts:
+        if part_data is not data:
+            data.extend(part_data)
+        invalid += part_invalid
+        found.extend((line + offset, text) for line, text in part_found)
+        offset += lines
+    return data, {"invalid": invalid, "samples": found[:samples]}
+
+
+def print_invalid(report):
+    """
+    Impresión del resumen de las líneas que no son números: las primeras con su
+    número de línea y cuántas más se omitieron.
+    """
+    for line, text in report["samples"]:
+        print(f"Warning: line {line}: {text} is not a number and "
+              "will not be taken into account for the conversion.")
+    hidden = report["invalid"] - len(report["samples"])
+    if hidden > 0:
+        print(f"Warning: {hidden} more lines are not numbers and "
+              "will not be taken into account for the conversion.")
@@ -0,0 +1,235 @@
+"""
+profiler.py - Instrumentación opcional de los scripts computeStatistics,
+convertNumbers, wordCount y computeSales.
+
+Los scripts cargan este módulo solo cuando se pide el perfilado, con la opción
+--profile o con la variable de entorno SCRIPT_PROFILE, así que sin ella no
+tiene ningún costo. El valor indica qué se registra además de los tiempos:
+
+    python computeStatistics.py TC1.txt --profile
+    python computeStatistics.py TC1.txt --profile=cprofile,stacks
+    SCRIPT_PROFILE=stacks python wordCount.py TC1.txt
+
+Las funciones del script se reemplazan por versiones instrumentadas. Las
+fases (lectura, cálculos, impresión y escritura de resultados) registran el
+tiempo de reloj y de CPU, los bytes y bloques asignados según tracemalloc y el
+pico de memoria. Las funciones que se llaman una vez por dato
+(decimal_binary, count_occurrences...) solo acumulan llamadas y tiempos, para
+no distorsionar la medición. Con "cprofile" se guarda además el perfil de
+cProfile (.prof, legible con pstats) y con "stacks" una muestra de las pilas
+de llamadas en formato colapsado (.folded) para generar flame graphs.
+
+Los resultados se escriben en JSON junto al archivo de resultados del script,
+por ejemplo StatisticsResults.profile.json. Los procesos del pool de
+computeSales no se perfilan; su tiempo aparece dentro de parallel_sum_cost.
+"""
+
+#!/usr/bin/env python
+# coding: utf-8
+# pylint: disable=invalid-name
+
+# In[1]:
+
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# In[2]:
+
+
+ENV_VARIABLE = "SCRIPT_PROFILE"
+MODES = ("cprofile", "stacks")
+
+
+def requested_modes(argv):
+    """
+    Modos pedidos en la línea de comandos (--profile[=modo,...]) o en la variable
+    de entorno. Regresa None si no se pidió el perfilado.
+    """
+    value = os.environ.get(ENV_VARIABLE)
+    for arg in argv[1:]:
+        if arg == "--profile":
+            value = value or "1"
+        elif arg.startswith("--profile="):
+            value = arg.split("=", 1)[1] or "1"
+    if not value or value.lower() in ("0", "off", "no", "false"):
+        return None
+    return {mode for mode in value.lower().split(",") if mode in MODES}
+
+
+def strip_profile_args(argv):
+    """Eliminación de las opciones --profile de argv, en el mismo objeto."""
+    argv[:] = [arg for arg in argv if arg != "--profile" and not arg.startswith("--profile=")]
+
+
+class StackSampler(threading.Thread):
+    """
+    Hilo que toma muestras periódicas de la pila del hilo principal y las
+    cuenta en formato colapsado ("modulo:funcion;modulo:funcion ...").
+    """
+
+    def __init__(self, interval=0.001):
+        """Inicialización del muestreo sobre el hilo que lo crea."""
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.target_id = threading.get_ident()
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """Toma de muestras hasta que se detiene el muestreo."""
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_id)  # pylint: disable=protected-access
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        """Fin del muestreo."""
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Registro de las fases y llamadas instrumentadas de un script.
+
+    Atributos:
+        script (str): Nombre del script.
+        modes (set): Modos adicionales ("cprofile", "stacks").
+        phases (dict): Estadísticas de cada función instrumentada como fase.
+        calls (dict): Estadísticas de cada función instrumentada por llamada.
+    """
+
+    def __init__(self, script, modes=()):
+        """Inicio del perfilado: tracemalloc, cProfile y muestreo de pilas."""
+        self.script = script
+        self.modes = set(modes)
+        self.phases = {}
+        self.calls = {}
+        self._stack = []
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        tracemalloc.start()
+        self._cprofile = cProfile.Profile() if "cprofile" in self.modes else None
+        self._sampler = StackSampler() if "stacks" in self.modes else None
+        if self._sampler is not None:
+            self._sampler.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def _phase(self, name, func, *args, **kwargs):
+        """Ejecución de una fase midiendo tiempos y memoria."""
+        start_snapshot = tracemalloc.take_snapshot()
+        current = tracemalloc.get_traced_memory()[0]
+        if self._stack:
+            parent = self._stack[-1]
+            parent["max"] = max(parent["max"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        frame = {"max": current}
+        self._stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            end, peak = tracemalloc.get_traced_memory()
+            self._stack.pop()
+            frame["max"] = max(frame["max"], peak)
+            if self._stack:
+                self._stack[-1]["max"] = max(self._stack[-1]["max"], frame["max"])
+            blocks = sum(stat.count_diff for stat in
+                         tracemalloc.take_snapshot().compare_to(start_snapshot, "filename"))
+            stats = self.phases.setdefault(name, {
+                "calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "allocated_bytes": 0,
+                "allocated_blocks": 0, "peak_bytes": 0})
+            stats["calls"] += 1
+            stats["wall_s"] += wall
+            stats["cpu_s"] += cpu
+            stats["allocated_bytes"] += end - current
+            stats["allocated_blocks"] += blocks
+            stats["peak_bytes"] = max(stats["peak_bytes"], frame["max"] - current)
+
+    def _call(self, name, func, *args, **kwargs):
+        """Ejecución de una función frecuente midiendo solo sus tiempos."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats = self.calls.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            stats["calls"] += 1
+            stats["wall_s"] += time.perf_counter() - wall
+            stats["cpu_s"] += time.process_time() - cpu
+
+    def hook(self, namespace, phases=(), calls=()):
+        """
+        Reemplazo de las funciones del espacio de nombres (globals() del script)
+        por versiones instrumentadas: "phases" como fases y "calls" por llamada.
+        Los nombres que no existen se ignoran. Regresa el propio Profiler.
+        """
+        for names, measure in ((phases, self._phase), (calls, self._call)):
+            for name in names:
+                func = namespace.get(name)
+                if callable(func):
+                    namespace[name] = functools.wraps(func)(
+                        functools.partial(measure, name, func))
+        return self
+
+    def finish(self, results_path):
+        """
+        Fin del perfilado y escritura de los resultados junto a results_path.
+        Regresa la ruta del JSON.
+        """
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        total_wall = time.perf_counter() - self._wall
+        total_cpu = time.process_time() - self._cpu
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        base = os.path.splitext(results_path)[0]
+        report = {
+            "script": self.script,
+            "argv": sys.argv,
+            "modes": sorted(self.modes),
+            "total": {"wall_s": total_wall, "cpu_s": total_cpu,
+                      "traced_bytes": current, "traced_peak_bytes": peak},
+            "phases": self.phases,
+            "calls": self.calls,
+        }
+        if self._cprofile is not None:
+            report["cprofile"] = base + ".prof"
+            self._cprofile.dump_stats(report["cprofile"])
+        if self._sampler is not None:
+            report["stacks"] = base + ".folded"
+            with open(report["stacks"], 'w', encoding='utf-8') as file:
+                for stack, count in self._sampler.stacks.most_common():
+                    file.write(f"{stack} {count}\n")
+        path = base + ".profile.json"
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        return path
+
+
+def start(script, argv, namespace, phases=(), calls=()):
+    """
+    Inicio del perfilado de un script si se pidió. Quita las opciones
+    --profile de argv y regresa el Profiler, o None.
+    """
+    modes = requested_modes(argv)
+    strip_profile_args(argv)
+    if modes is None:
+        return None
+    return Profiler(script, modes).hook(namespace, phases, calls)
@@ -0,0 +1,166 @@
+"""
+Pruebas de numberParser.py.
+
+Se comparan los bloques, los rangos de bytes y la lectura en varios procesos
+con la lectura original línea por línea (strip y conversión). Se ejecutan con
+tools en PYTHONPATH:
+
+    PYTHONPATH=tools python -m unittest discover -s tools/tests -p "*_test.py"
+"""
+
+# pylint: disable=invalid-name
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numberParser
+
+
+LINES = ["1", "-2.5", "+.5", "1e5", "", "  ", " 7 ", "\t8\x0b", "abc", "1 2",
+         "\xa09\xa0", "\x1c", "\x1c5", "5\x1f", "1\x1d2", "--5", "1_000", "0x10"]
+
+
+def read_lines(text, convert):
+    """Lectura original: cada línea (con los saltos de open()) con strip() y
+    la conversión."""
+    data = []
+    invalid = []
+    for line, raw in enumerate(io.StringIO(text, newline=None).readlines(), start=1):
+        stripped_data = raw.strip()
+        if stripped_data:
+            try:
+                data.append(convert(stripped_data))
+            except ValueError:
+                invalid.append((line, stripped_data))
+    return data, invalid
+
+
+class TestParseBlock(unittest.TestCase):
+    """Pruebas de la conversión de un bloque."""
+
+    def check(self, text, convert):
+        """Compara parse_block con la lectura original."""
+        data, invalid = read_lines(text, convert)
+        block = text.encode("utf-8")
+        parsed, _, count, found = numberParser.parse_block(block, convert, samples=100)
+        self.assertEqual(parsed, data)
+        self.assertEqual(count, len(invalid))
+        self.assertEqual(found, invalid)
+
+    def test_one_number_per_line(self):
+        """Prueba del caso común, con líneas inválidas entre los números."""
+        self.check("1\n2.5\nabc\n-3e2\n4\n", float)
+        self.check("1\n2.5\nabc\n-3\n4", int)
+
+    def test_irregular_lines(self):
+        """Prueba de líneas con espacios, en blanco y saltos de Windows y Mac."""
+        for convert in (float, int):
+            for newline in ("\n", "\r\n", "\r"):
+                self.check(newline.join(LINES) + newline, convert)
+
+    def test_separators_stripped(self):
+        """Prueba de los caracteres "\\x1c"-"\\x1f" que strip() quita: una
+        línea con solo ellos está en blanco y no es inválida."""
+        self.check("\x1c\n\x1c5\n5\x1f\n\x1e\x1e\n1\x1d2\n", float)
+        self.check("\x1c\n\x1c5\n5\x1f\n\x1e\x1e\n1\x1d2\n", int)
+
+    def test_first_line(self):
+        """Prueba de los números de línea de las líneas inválidas."""
+        _, _, count, found = numberParser.parse_block(b"1\nabc\n2\nx\n", float, 10, 1)
+        self.assertEqual(count, 2)
+        self.assertEqual(found, [(11, "abc")])
+
+    def test_other_converter(self):
+        """Prueba de una conversión sin patrón: se revisa línea por línea."""
+        def convert(text):
+            return float(text) * 2
+        self.check("1\n abc\n\n2\n", convert)
+
+
+class TestParseRange(unittest.TestCase):
+    """Pruebas de la lectura por rangos de bytes."""
+
+    def setUp(self):
+        """Escritura de un archivo de prueba y bloques pequeños."""
+        self.text = "\n".join(LINES * 20) + "\n"
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+            file.write(self.text)
+        self.block_size = numberParser.BLOCK_SIZE
+        numberParser.BLOCK_SIZE = 7
+
+    def tearDown(self):
+        """Borrado del archivo de prueba."""
+        numberParser.BLOCK_SIZE = self.block_size
+        os.remove(self.path)
+
+    def test_whole_file(self):
+        """Prueba de la lectura de todo el archivo en bloques."""
+        data, invalid = read_lines(self.text, float)
+        parsed, lines, count, found = numberParser.parse_range(self.path, float, samples=1000)
+        self.assertEqual(parsed, data)
+        self.assertEqual(lines, len(LINES) * 20)
+        self.assertEqual((count, found), (len(invalid), invalid))
+
+    def test_ranges(self):
+        """Prueba de que los rangos juntos tienen cada línea una sola vez."""
+        data, invalid = read_lines(self.text, int)
+        size = os.path.getsize(self.path)
+        for step in (1, 5, 64, size):
+            parsed = []
+            found = []
+            offset = 0
+            for start in range(0, size, step):
+                part = numberParser.parse_range(self.path, int, start,
+                                                min(start + step, size), 1000)
+                parsed.extend(part[0])
+                found.extend((line + offset, text) for line, text in part[3])
+                offset += part[1]
+            self.assertEqual(parsed, data)
+            self.assertEqual(found, invalid)
+
+
+class TestParseFile(unittest.TestCase):
+    """Pruebas de la lectura de un archivo en uno o varios procesos."""
+
+    def setUp(self):
+        """Escritura de un archivo de prueba y conversión en paralelo aun en
+        archivos pequeños."""
+        self.text = "\r\n".join(LINES * 50) + "\r\n"
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+            file.write(self.text)
+        self.min_size = numberParser.PARALLEL_MIN_SIZE
+        numberParser.PARALLEL_MIN_SIZE = 1
+
+    def tearDown(self):
+        """Borrado del archivo de prueba."""
+        numberParser.PARALLEL_MIN_SIZE = self.min_size
+        os.remove(self.path)
+
+    def test_workers(self):
+        """Prueba de que con varios procesos el resultado es el mismo."""
+        for convert in (float, int):
+            data, invalid = read_lines(self.text, convert)
+            for workers in (1, 3):
+                parsed, report = numberParser.parse_file(self.path, convert, workers, 5)
+                self.assertEqual(list(parsed), data)
+                self.assertEqual(report, {"invalid": len(invalid), "samples": invalid[:5]})
+
+    def test_print_invalid(self):
+        """Prueba del resumen de las líneas inválidas."""
+        _, report = numberParser.parse_file(self.path, float, samples=1)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            numberParser.print_invalid(report)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "Warning: line 9: abc is not a number and "
+                                   "will not be taken into account for the conversion.")
+        self.assertTrue(lines[1].startswith(f"Warning: {report['invalid'] - 1} more lines"))
+
+
+if __name__ == '__main__':
+    unittest.main()